@@ -11,6 +11,10 @@ class AdministrationConfig(AppConfig):
     name = "apps.administration"
     verbose_name = "Administração"
 
+    def ready(self):
+        """Importa signals quando o app estiver pronto"""
+        import apps.administration.signals  # noqa: F401
+
 
 
 
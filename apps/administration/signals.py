@@ -0,0 +1,74 @@
+"""
+Signals do app Administration
+Mantém os contadores do dashboard administrativo (apps.administration.stats)
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .stats import (
+    ACTIVE_USERS,
+    GROUPS,
+    PROPERTIES,
+    SITES,
+    adjust_stat,
+    forget_site,
+    invalidate_stat,
+    refresh_site_active_properties,
+)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def update_user_stats_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Usuário novo ativo soma 1; alterações que podem mudar is_active recontam na próxima leitura"""
+    if created:
+        if instance.is_active:
+            adjust_stat(ACTIVE_USERS, 1)
+    elif update_fields is None or "is_active" in update_fields:
+        invalidate_stat(ACTIVE_USERS)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def update_user_stats_on_delete(sender, instance, **kwargs):
+    if instance.is_active:
+        adjust_stat(ACTIVE_USERS, -1)
+
+
+@receiver(post_save, sender=Group)
+def update_group_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_stat(GROUPS, 1)
+
+
+@receiver(post_delete, sender=Group)
+def update_group_stats_on_delete(sender, instance, **kwargs):
+    adjust_stat(GROUPS, -1)
+
+
+@receiver(post_save, sender="landings.Site")
+def update_site_stats_on_save(sender, instance, created, **kwargs):
+    if created:
+        adjust_stat(SITES, 1)
+
+
+@receiver(post_delete, sender="landings.Site")
+def update_site_stats_on_delete(sender, instance, **kwargs):
+    adjust_stat(SITES, -1)
+    forget_site(instance.pk)
+
+
+@receiver(post_save, sender="properties.Property")
+def update_property_stats_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Imóvel novo soma 1 ao total; o contador de ativos do site é recontado pelo índice"""
+    if created:
+        adjust_stat(PROPERTIES, 1)
+    if created or update_fields is None or "is_active" in update_fields:
+        refresh_site_active_properties(instance.site_id)
+
+
+@receiver(post_delete, sender="properties.Property")
+def update_property_stats_on_delete(sender, instance, **kwargs):
+    adjust_stat(PROPERTIES, -1)
+    refresh_site_active_properties(instance.site_id)
@@ -0,0 +1,193 @@
+"""
+Contadores do dashboard administrativo, mantidos no Redis.
+
+O dashboard lê os totais (usuários ativos, grupos, sites, imóveis e imóveis
+ativos por site) direto do cache, sem COUNT(*) nas tabelas a cada acesso:
+
+- criação e remoção ajustam o contador com INCR/DECR atômico após o commit;
+- alterações que podem mudar um total sem que se saiba o delta (ex: usuário
+  ativado/desativado) descartam o contador, recontado na próxima leitura;
+- os imóveis ativos de um site são recontados pelo índice (site, is_active)
+  quando um imóvel do site muda - custo proporcional ao site, não à tabela;
+- a tarefa reconcile_dashboard_stats (Celery Beat) reconta tudo e corrige
+  eventuais desvios (ex: bulk_create, cache reiniciado, transações concorrentes).
+"""
+
+import logging
+from collections.abc import Callable, Iterable
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_USERS = "active_users"
+GROUPS = "groups"
+SITES = "sites"
+PROPERTIES = "properties"
+
+
+def _count_active_users() -> int:
+    return get_user_model().objects.filter(is_active=True).count()
+
+
+def _count_groups() -> int:
+    return Group.objects.count()
+
+
+def _count_sites() -> int:
+    from apps.landings.models import Site
+
+    return Site.objects.count()
+
+
+def _count_properties() -> int:
+    from apps.properties.models import Property
+
+    return Property.objects.count()
+
+
+# Contador -> contagem no banco (usada na primeira leitura e na reconciliação)
+COUNTERS: dict[str, Callable[[], int]] = {
+    ACTIVE_USERS: _count_active_users,
+    GROUPS: _count_groups,
+    SITES: _count_sites,
+    PROPERTIES: _count_properties,
+}
+
+
+def _stat_key(name: str) -> str:
+    return f"stats:{name}"
+
+
+def _site_key(site_id: int) -> str:
+    return f"stats:site:{site_id}:active_properties"
+
+
+def _count_site_active_properties(site_id: int) -> int:
+    from apps.properties.models import Property
+
+    return Property.objects.filter(site_id=site_id, is_active=True).count()
+
+
+def get_stats(names: Iterable[str]) -> dict[str, int]:
+    """Valores dos contadores (uma leitura no Redis; os ausentes são contados no banco)"""
+    names = list(names)
+    keys = {name: _stat_key(name) for name in names}
+    try:
+        cached = cache.get_many(list(keys.values()))
+    except Exception as e:
+        logger.warning(f"Erro ao ler contadores do cache: {e}")
+        cached = {}
+
+    stats = {}
+    for name, key in keys.items():
+        value = cached.get(key)
+        if value is None:
+            value = COUNTERS[name]()
+            _store(key, value)
+        stats[name] = int(value)
+    return stats
+
+
+def get_stat(name: str) -> int:
+    """Valor de um contador"""
+    return get_stats([name])[name]
+
+
+def get_site_active_properties(site_id: int) -> int:
+    """Imóveis ativos do site"""
+    key = _site_key(site_id)
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Erro ao ler contador do site {site_id}: {e}")
+        value = None
+    if value is None:
+        value = _count_site_active_properties(site_id)
+        _store(key, value)
+    return int(value)
+
+
+def _store(key: str, value: int) -> None:
+    try:
+        # add(): não sobrescreve um valor já ajustado por outro processo
+        cache.add(key, value, timeout=None)
+    except Exception as e:
+        logger.warning(f"Erro ao gravar contador {key}: {e}")
+
+
+def adjust_stat(name: str, delta: int) -> None:
+    """Soma delta ao contador após o commit (contador ainda não carregado: nada a fazer)"""
+
+    def _adjust():
+        try:
+            cache.incr(_stat_key(name), delta)
+        except ValueError:
+            # Chave ausente: será contada na próxima leitura
+            pass
+        except Exception as e:
+            logger.warning(f"Erro ao ajustar contador {name}: {e}")
+            invalidate_stat(name)
+
+    transaction.on_commit(_adjust)
+
+
+def invalidate_stat(name: str) -> None:
+    """Descarta o contador; a próxima leitura reconta no banco"""
+    try:
+        cache.delete(_stat_key(name))
+    except Exception as e:
+        logger.warning(f"Erro ao invalidar contador {name}: {e}")
+
+
+def refresh_site_active_properties(site_id: int | None) -> None:
+    """Reconta os imóveis ativos do site após o commit"""
+    if not site_id:
+        return
+
+    def _refresh():
+        try:
+            cache.set(_site_key(site_id), _count_site_active_properties(site_id), timeout=None)
+        except Exception as e:
+            logger.warning(f"Erro ao atualizar contador do site {site_id}: {e}")
+
+    transaction.on_commit(_refresh)
+
+
+def forget_site(site_id: int) -> None:
+    """Remove o contador de um site excluído (após as recontagens agendadas pela remoção dos imóveis)"""
+
+    def _forget():
+        try:
+            cache.delete(_site_key(site_id))
+        except Exception as e:
+            logger.warning(f"Erro ao remover contador do site {site_id}: {e}")
+
+    transaction.on_commit(_forget)
+
+
+def reconcile_stats() -> dict[str, int]:
+    """
+    Reconta todos os contadores no banco e grava os valores corretos.
+
+    Returns:
+        Contadores corrigidos (nome -> diferença encontrada)
+    """
+    from apps.landings.models import Site
+
+    values = {_stat_key(name): count() for name, count in COUNTERS.items()}
+    sites = Site.objects.annotate(active=Count("properties", filter=Q(properties__is_active=True)))
+    values.update({_site_key(site_id): active for site_id, active in sites.values_list("pk", "active").iterator()})
+
+    try:
+        cached = cache.get_many(list(values))
+    except Exception:
+        cached = {}
+    drift = {key: value - int(cached[key]) for key, value in values.items() if key in cached and cached[key] != value}
+
+    cache.set_many(values, timeout=None)
+    return drift
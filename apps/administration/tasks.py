@@ -0,0 +1,24 @@
+"""
+Tarefas assíncronas do Celery do app Administration
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_dashboard_stats():
+    """
+    Reconta os contadores do dashboard administrativo e corrige desvios no Redis
+
+    Agendada de hora em hora no Celery Beat (CELERY_BEAT_SCHEDULE).
+    """
+    from apps.administration.stats import reconcile_stats
+
+    drift = reconcile_stats()
+    if drift:
+        logger.warning(f"📊 Contadores do dashboard corrigidos: {drift}")
+    return {"corrected": len(drift)}
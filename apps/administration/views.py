@@ -13,6 +13,7 @@ from django.db.models import Q
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.translation import gettext_lazy as _
 
+from apps.administration import stats
 from apps.administration.forms import GroupForm, UserCreateForm, UserUpdateForm
 from apps.core.permissions import format_permission_label, is_displayable_permission
 
@@ -22,28 +23,25 @@ User = get_user_model()
 @login_required
 def dashboard(request):
     """Dashboard administrativo com estatísticas do sistema"""
-    # Estatísticas básicas
-    total_users = User.objects.filter(is_active=True).count() if request.user.has_perm("core.view_user") else 0
-    total_groups = Group.objects.count() if request.user.has_perm("auth.view_group") else 0
+    # Estatísticas básicas (contadores mantidos no Redis, ver apps.administration.stats)
+    names = [stats.SITES, stats.PROPERTIES]
+    if request.user.has_perm("core.view_user"):
+        names.append(stats.ACTIVE_USERS)
+    if request.user.has_perm("auth.view_group"):
+        names.append(stats.GROUPS)
+    counters = stats.get_stats(names)
+    total_users = counters.get(stats.ACTIVE_USERS, 0)
+    total_groups = counters.get(stats.GROUPS, 0)
+    total_sites = counters[stats.SITES]
+    total_properties = counters[stats.PROPERTIES]
+
+    # Buscar site do usuário atual para exibir informações
+    from apps.landings.models import Site
 
-    # Importar aqui para evitar circular import
     try:
-        from apps.landings.models import Site
-        from apps.properties.models import Property
-
-        total_sites = Site.objects.count()
-        total_properties = Property.objects.count()
-
-        # Buscar site do usuário atual para exibir informações
-        try:
-            user_site = Site.objects.select_related("theme").get(owner=request.user)
-            properties_count = user_site.properties.filter(is_active=True).count()
-        except Site.DoesNotExist:
-            user_site = None
-            properties_count = 0
-    except ImportError:
-        total_sites = 0
-        total_properties = 0
+        user_site = Site.objects.select_related("theme").get(owner=request.user)
+        properties_count = stats.get_site_active_properties(user_site.pk)
+    except Site.DoesNotExist:
         user_site = None
         properties_count = 0
 
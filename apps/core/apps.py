@@ -11,6 +11,10 @@ class CoreConfig(AppConfig):
     name = "apps.core"
     verbose_name = "Core"
 
+    def ready(self):
+        """Importa signals quando o app estiver pronto"""
+        import apps.core.signals  # noqa: F401
+
 
 
 
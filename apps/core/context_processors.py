@@ -4,11 +4,23 @@ Context processors do app Core - Adiciona dados globais aos templates
 
 from typing import Any
 
+from django.utils.functional import SimpleLazyObject
+
+
+def _user_site(user: Any) -> Any:
+    try:
+        return user.site
+    except Exception:
+        return None
+
 
 def onboarding_progress(request: Any) -> dict[str, Any]:
     """
     Adiciona informações de progresso do onboarding ao contexto dos templates.
 
+    Os valores são preguiçosos (SimpleLazyObject): o resumo só é buscado (do
+    cache, ou calculado) quando o template lê uma das variáveis.
+
     Args:
         request: Objeto HttpRequest do Django
 
@@ -19,32 +31,28 @@ def onboarding_progress(request: Any) -> dict[str, Any]:
     if not hasattr(request, "user") or not request.user.is_authenticated:
         return {"onboarding_progress": None}
 
-    try:
-        from apps.core.models import OnboardingStatus
-        from apps.core.utils import OnboardingProgressCalculator
+    from apps.core.models import OnboardingStatus
+    from apps.core.utils import OnboardingProgressCalculator, get_onboarding_summary
 
-        progress = OnboardingProgressCalculator.calculate(request.user)
+    user = request.user
+    summary = SimpleLazyObject(lambda: get_onboarding_summary(user))
 
-        # Adicionar site ao contexto se disponível
-        site = None
+    def progress() -> dict[str, Any] | None:
         try:
-            if hasattr(request.user, "site"):
-                site = request.user.site
+            return OnboardingProgressCalculator.build(summary["completed_steps"])
         except Exception:
-            pass
+            # Em caso de qualquer erro, não exibe o progresso
+            return None
 
-        # Verificar status de onboarding no banco de dados
-        onboarding_status = None
+    def status() -> OnboardingStatus | None:
         try:
-            onboarding_status = OnboardingStatus.get_or_create_for_user(request.user)
+            # Instância não salva: apenas para leitura nos templates
+            return OnboardingStatus(user=user, completion_message_dismissed=summary["completion_message_dismissed"])
         except Exception:
-            pass
+            return None
 
-        return {
-            "onboarding_progress": progress,
-            "site": site,
-            "onboarding_status": onboarding_status,
-        }
-    except Exception:
-        # Em caso de qualquer erro, retornar valores padrão seguros
-        return {"onboarding_progress": None, "site": None, "onboarding_status": None}
+    return {
+        "onboarding_progress": SimpleLazyObject(progress),
+        "site": SimpleLazyObject(lambda: _user_site(user)),
+        "onboarding_status": SimpleLazyObject(status),
+    }
@@ -0,0 +1,134 @@
+"""
+Normalização de imagens enviadas pelos usuários (Pillow).
+
+Fotos de celular chegam com 6-10MB, orientação em EXIF e às vezes em HEIC.
+Depois do upload, uma task na fila "media" normaliza o arquivo:
+- aplica a orientação do EXIF nos pixels
+- limita a maior dimensão (MEDIA_NORMALIZE_MAX_DIMENSION)
+- remove metadados (EXIF, GPS, XMP), mantendo apenas o perfil de cor
+- recomprime (JPEG progressivo; PNGs e imagens com transparência como PNG otimizado)
+
+O arquivo normalizado é gravado com um nome novo e o campo só é trocado se
+ainda apontar para o original (ver tasks de properties e landings). Assim um
+upload feito durante o processamento nunca é sobrescrito.
+
+HEIC/HEIF é suportado quando o pacote opcional pillow-heif está instalado.
+"""
+
+import logging
+import posixpath
+from dataclasses import dataclass
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pillow_heif import register_heif_opener
+except ImportError:  # pragma: no cover - dependência opcional
+    register_heif_opener = None
+else:
+    register_heif_opener()
+
+# Nome da fila do Celery que processa imagens (ver CELERY_TASK_ROUTES)
+MEDIA_QUEUE = "media"
+
+# Modos com transparência (salvos como PNG mesmo quando o original não era PNG)
+TRANSPARENT_MODES = ("RGBA", "LA", "PA")
+
+
+@dataclass(frozen=True)
+class NormalizedImage:
+    """Resultado da normalização: nome do novo arquivo e tamanhos antes/depois (bytes)"""
+
+    name: str
+    original_size: int
+    size: int
+
+
+def get_max_dimension() -> int:
+    return getattr(settings, "MEDIA_NORMALIZE_MAX_DIMENSION", 2560)
+
+
+def get_quality() -> int:
+    return getattr(settings, "MEDIA_NORMALIZE_QUALITY", 82)
+
+
+def _has_transparency(image: Image.Image) -> bool:
+    return image.mode in TRANSPARENT_MODES or "transparency" in image.info
+
+
+def _encode(image: Image.Image, quality: int, icc_profile: bytes | None, keep_png: bool) -> tuple[bytes, str]:
+    """Recomprime a imagem sem metadados (mantém o perfil de cor); retorna (conteúdo, extensão)"""
+    buffer = BytesIO()
+
+    if keep_png or _has_transparency(image):
+        image = image.convert("RGBA")
+        image.save(buffer, "PNG", optimize=True, icc_profile=icc_profile)
+        return buffer.getvalue(), ".png"
+
+    image = image.convert("RGB")
+    image.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True, icc_profile=icc_profile)
+    return buffer.getvalue(), ".jpg"
+
+
+def normalize_image(name: str, storage=default_storage) -> NormalizedImage | None:
+    """
+    Normaliza uma imagem do storage e grava o resultado com um nome novo.
+
+    O original não é alterado (quem chama troca o campo e remove o original).
+    Retorna None quando a imagem já está normalizada (sem rotação nem
+    metadados, dentro do limite e a recompressão não reduziria o arquivo),
+    para GIFs animados e SVGs.
+
+    Raises:
+        OSError / PIL.UnidentifiedImageError: arquivo ausente ou não é uma imagem válida
+    """
+    if name.lower().endswith(".svg"):
+        return None
+
+    original_size = storage.size(name)
+    max_dimension = get_max_dimension()
+
+    with storage.open(name, "rb") as f:
+        with Image.open(f) as image:
+            if getattr(image, "is_animated", False):
+                return None
+
+            source_format = image.format
+            exif = image.getexif()
+            rotated = exif.get(ExifTags.Base.Orientation, 1) != 1
+            has_metadata = bool(len(exif) or image.info.get("xmp"))
+            icc_profile = image.info.get("icc_profile")
+
+            resized = max(image.size) > max_dimension
+            if resized and source_format == "JPEG":
+                # Decodifica o JPEG já reduzido (escala DCT): bem mais rápido e com menos memória
+                image.draft("RGB", (max_dimension, max_dimension))
+
+            normalized = ImageOps.exif_transpose(image)
+            if resized:
+                normalized.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+            content, extension = _encode(normalized, get_quality(), icc_profile, keep_png=source_format == "PNG")
+
+    converted = source_format not in ("JPEG", "PNG")  # HEIC, WebP, BMP, TIFF...
+    # Metadados (ex: GPS) sempre são removidos; sem eles, só troca se o arquivo diminuir
+    if not (converted or resized or rotated or has_metadata or len(content) < original_size):
+        return None
+
+    root, _ = posixpath.splitext(name)
+    new_name = storage.save(f"{root}{extension}", ContentFile(content))
+    return NormalizedImage(name=new_name, original_size=original_size, size=len(content))
+
+
+def delete_file(name: str, storage=default_storage) -> None:
+    """Remove um arquivo do storage sem propagar erros (usado após a troca)"""
+    try:
+        storage.delete(name)
+    except Exception as e:
+        logger.warning(f"Erro ao remover arquivo {name}: {e}")
@@ -0,0 +1,302 @@
+"""
+Benchmark de queries das páginas públicas e do dashboard.
+
+Cria um banco de testes isolado (SQLite ou PostgreSQL local, conforme DATABASES),
+popula N sites com M imóveis e K imagens cada e mede, para cada rota:
+- número de queries SQL
+- tempo total gasto em SQL (ms)
+- tempo total da requisição, incluindo renderização (ms, mediana de --repeat)
+
+Os resultados são comparados com um baseline em JSON. Se alguma rota passar a
+executar mais queries que o baseline (ex: N+1 introduzido em template ou view),
+o comando termina com erro. Tempos são apenas reportados (variam entre máquinas).
+
+A mesma comparação roda na suíte de testes (apps.core.tests.test_query_benchmark),
+com `python manage.py test`.
+
+Uso:
+    python manage.py benchmark_queries                    # Compara com o baseline
+    python manage.py benchmark_queries --update           # Regrava o baseline
+    python manage.py benchmark_queries --tenants 2 --properties 50 --images 5 --baseline /tmp/b.json
+"""
+
+import json
+import statistics
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "queries.json"
+
+# Caches locais isolados: o benchmark nunca lê/escreve no Redis. As sessões ficam
+# em um cache separado para que limpar o cache entre medições não faça logout.
+BENCHMARK_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark"},
+    "sessions": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "benchmark-sessions"},
+}
+
+
+def find_regressions(routes: dict[str, dict], baseline_routes: dict[str, dict]) -> list[str]:
+    """Rotas que executam mais queries que no baseline (rotas sem baseline são ignoradas)"""
+    regressions = []
+    for name, result in routes.items():
+        expected = baseline_routes.get(name)
+        if expected is not None and result["queries"] > expected["queries"]:
+            regressions.append(f"{name}: {expected['queries']} -> {result['queries']} queries")
+    return regressions
+
+
+class _SQLTimer:
+    """execute_wrapper que acumula o tempo gasto nas queries"""
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = "Mede queries e tempo de renderização das rotas públicas e do dashboard e compara com o baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenants", type=int, default=3, help="Número de sites (N)")
+        parser.add_argument("--properties", type=int, default=20, help="Imóveis por site (M)")
+        parser.add_argument("--images", type=int, default=3, help="Imagens por imóvel (K)")
+        parser.add_argument("--repeat", type=int, default=5, help="Repetições para medir o tempo de cada rota")
+        parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Arquivo JSON do baseline")
+        parser.add_argument("--update", action="store_true", help="Grava os resultados como novo baseline")
+
+    def handle(self, *args, **options):
+        params = {"tenants": options["tenants"], "properties": options["properties"], "images": options["images"]}
+
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            results = self.run_routes(params, options["repeat"])
+        finally:
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+        self._print_results(results)
+
+        report = {"params": params, "database": connection.vendor, "routes": results}
+        baseline_path = options["baseline"]
+
+        if options["update"]:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(report, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"\n✅ Baseline gravado em {baseline_path}\n"))
+            return
+
+        if not baseline_path.exists():
+            raise CommandError(f"Baseline não encontrado: {baseline_path} (execute com --update para criar)")
+
+        self._compare(report, json.loads(baseline_path.read_text()))
+
+    def run_routes(self, params: dict, repeat: int) -> dict[str, dict]:
+        """
+        Popula o banco atual e mede todas as rotas.
+
+        Também usado pelo teste de regressão (apps.core.tests), dentro do banco de testes do Django.
+        """
+        with override_settings(CACHES=BENCHMARK_CACHES, SESSION_CACHE_ALIAS="sessions", CELERY_TASK_ALWAYS_EAGER=False):
+            routes = self._seed(**params)
+            return {name: self._measure(*route, repeat) for name, *route in routes}
+
+    # ------------------------------------------------------------------
+    # Dados de teste
+    # ------------------------------------------------------------------
+
+    def _seed(self, tenants: int, properties: int, images: int) -> list[tuple[str, Client, str]]:
+        """Popula o banco de testes e retorna as rotas a medir: (nome, cliente, caminho)"""
+        from apps.core.models import User
+        from apps.landings.models import Site
+        from apps.properties.models import Property, PropertyImage
+        from apps.themes.manager import ThemeManager
+        from apps.themes.models import Theme
+
+        base_domain = getattr(settings, "BASE_DOMAIN", "propzy.com.br")
+
+        with redirect_stdout(StringIO()):
+            ThemeManager().install_all_themes()
+        themes = list(Theme.objects.order_by("slug")) or [None]
+
+        routes = []
+        for index in range(tenants):
+            owner = User.objects.create_user(f"benchmark-{index}@propzy.local", "benchmark")
+            theme = themes[index % len(themes)]
+            site = Site.objects.create(
+                owner=owner,
+                subdomain=f"benchmark-{index}",
+                business_name=f"Benchmark {index}",
+                email=owner.email,
+                theme=theme,
+                is_published=True,
+            )
+
+            # bulk_create não grava arquivos nem dispara signals (o snapshot é montado na primeira leitura)
+            property_objs = Property.objects.bulk_create(
+                [
+                    Property(
+                        site=site,
+                        title=f"Imóvel {number}",
+                        description="Imóvel de benchmark " * 10,
+                        property_type="house" if number % 2 else "apartment",
+                        transaction_type=("sale", "rent", "both")[number % 3],
+                        sale_price=100000 + number,
+                        rent_price=1000 + number,
+                        area=80,
+                        address="Rua do Benchmark, 1",
+                        neighborhood="Centro",
+                        city="Curitiba" if number % 2 else "Londrina",
+                        state="PR",
+                        is_featured=number < 6,
+                        order=number,
+                        main_image=f"properties/benchmark-{number}-0.jpg" if images else None,
+                    )
+                    for number in range(properties)
+                ]
+            )
+            PropertyImage.objects.bulk_create(
+                [
+                    PropertyImage(property=property_obj, image=f"properties/benchmark-{number}-{i}.jpg", order=i)
+                    for number, property_obj in enumerate(property_objs)
+                    for i in range(images)
+                ]
+            )
+
+            label = f"site-{index} ({theme.slug if theme else 'default'})"
+            public = Client(HTTP_HOST=f"benchmark-{index}.{base_domain}")
+            routes += [
+                (f"{label} GET /", public, "/"),
+                (f"{label} GET /imoveis/", public, "/imoveis/"),
+                (f"{label} GET /imoveis/?page=2", public, "/imoveis/?page=2"),
+                (f"{label} GET /imovel/<pk>/", public, f"/imovel/{property_objs[0].pk}/" if property_objs else "/"),
+            ]
+
+            if index == 0:
+                routes += self._dashboard_routes(owner, property_objs[0] if property_objs else None, base_domain)
+
+        return routes
+
+    def _dashboard_routes(self, owner, property_obj, base_domain: str) -> list[tuple[str, Client, str]]:
+        """Rotas do dashboard do dono do primeiro site"""
+        from apps.core.models import User
+
+        dashboard = Client(HTTP_HOST=base_domain)
+        dashboard.force_login(owner)
+
+        admin = User.objects.create_superuser("benchmark-admin@propzy.local", "benchmark")
+        admin_client = Client(HTTP_HOST=base_domain)
+        admin_client.force_login(admin)
+
+        routes = [
+            ("dashboard GET /", dashboard, "/"),
+            ("dashboard GET /landings/dashboard/config/basic/", dashboard, "/landings/dashboard/config/basic/"),
+            ("dashboard GET /landings/dashboard/config/domain/", dashboard, "/landings/dashboard/config/domain/"),
+            ("dashboard GET /landings/dashboard/config/theme/", dashboard, "/landings/dashboard/config/theme/"),
+            (
+                "dashboard GET /landings/dashboard/configuracoes-avancadas/",
+                dashboard,
+                "/landings/dashboard/configuracoes-avancadas/",
+            ),
+            (
+                "dashboard GET /landings/dashboard/theme/default/preview/",
+                dashboard,
+                "/landings/dashboard/theme/default/preview/",
+            ),
+            ("dashboard GET /properties/imoveis/", dashboard, "/properties/imoveis/"),
+            ("dashboard GET /core/perfil/", dashboard, "/core/perfil/"),
+            ("admin GET /admin-panel/usuarios/", admin_client, "/admin-panel/usuarios/"),
+            ("admin GET /admin-panel/grupos/", admin_client, "/admin-panel/grupos/"),
+        ]
+        if property_obj is not None:
+            routes += [
+                ("dashboard GET /properties/imoveis/<pk>/", dashboard, f"/properties/imoveis/{property_obj.pk}/"),
+                (
+                    "dashboard GET /properties/imoveis/<pk>/editar/",
+                    dashboard,
+                    f"/properties/imoveis/{property_obj.pk}/editar/",
+                ),
+            ]
+        return routes
+
+    # ------------------------------------------------------------------
+    # Medição
+    # ------------------------------------------------------------------
+
+    def _measure(self, client: Client, path: str, repeat: int) -> dict:
+        """
+        Executa a rota com o cache vazio e mede queries, tempo de SQL e tempo total.
+
+        Uma requisição de aquecimento é descartada (ela monta estruturas persistidas
+        no banco, como o snapshot da listagem, que não se repetem em produção).
+        """
+        cache = caches["default"]
+        client.get(path)
+
+        samples = []
+        for _ in range(max(repeat, 1)):
+            cache.clear()
+            timer = _SQLTimer()
+            start = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries, connection.execute_wrapper(timer):
+                response = client.get(path)
+            samples.append((len(queries), timer.elapsed * 1000, (time.perf_counter() - start) * 1000))
+
+        if response.status_code >= 400:
+            raise CommandError(f"{path} retornou {response.status_code}")
+
+        return {
+            "status": response.status_code,
+            "queries": max(sample[0] for sample in samples),
+            "sql_ms": round(statistics.median(sample[1] for sample in samples), 2),
+            "wall_ms": round(statistics.median(sample[2] for sample in samples), 2),
+        }
+
+    def _print_results(self, results: dict):
+        self.stdout.write(self.style.SUCCESS(f"\n📊 Benchmark de queries ({connection.vendor})\n"))
+        width = max(len(name) for name in results) if results else 0
+        for name, result in results.items():
+            self.stdout.write(
+                f"  • {name:<{width}}  {result['queries']:>4} queries  "
+                f"{result['sql_ms']:>8.2f} ms SQL  {result['wall_ms']:>8.2f} ms total  [{result['status']}]"
+            )
+
+    def _compare(self, report: dict, baseline: dict):
+        """Falha se alguma rota executar mais queries que no baseline"""
+        if baseline.get("params") != report["params"]:
+            raise CommandError(
+                f"Parâmetros diferentes do baseline ({baseline.get('params')}); "
+                "use os mesmos valores ou regrave com --update"
+            )
+
+        for name, result in report["routes"].items():
+            expected = baseline["routes"].get(name)
+            if expected is None:
+                self.stdout.write(self.style.WARNING(f"  ⚠️  Rota sem baseline: {name}"))
+            elif result["queries"] < expected["queries"]:
+                self.stdout.write(
+                    self.style.SUCCESS(f"  ⬇️  {name}: {expected['queries']} -> {result['queries']} queries")
+                )
+
+        regressions = find_regressions(report["routes"], baseline["routes"])
+        if regressions:
+            raise CommandError("Regressão no número de queries:\n  " + "\n  ".join(regressions))
+
+        self.stdout.write(self.style.SUCCESS("\n✅ Nenhuma regressão no número de queries\n"))
@@ -0,0 +1,65 @@
+"""
+Comando Django para enfileirar a normalização das imagens já enviadas.
+
+Novos uploads são normalizados automaticamente; este comando processa os
+arquivos antigos (imagens de imóveis, logo/imagem principal dos sites e
+imagens das seções do tema). As tasks rodam na fila "media".
+
+Uso:
+    python manage.py normalize_media                 # Todos os sites
+    python manage.py normalize_media --site fulano   # Apenas um site (subdomínio)
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.landings.models import Site, ThemeSectionConfig
+from apps.landings.tasks import SITE_IMAGE_FIELDS, normalize_section_image, normalize_site_image
+from apps.properties.models import PropertyImage
+from apps.properties.tasks import normalize_property_image
+
+
+class Command(BaseCommand):
+    """Comando para normalizar as imagens existentes"""
+
+    help = "Enfileira a normalização (orientação, dimensões, metadados, compressão) das imagens existentes"
+
+    def add_arguments(self, parser):
+        """Adiciona argumentos ao comando"""
+        parser.add_argument(
+            "--site",
+            type=str,
+            help="Subdomínio do site (deixe vazio para todos)",
+        )
+
+    def handle(self, *args, **options):
+        """Executa o comando"""
+        sites = Site.objects.all()
+        if options.get("site"):
+            sites = sites.filter(subdomain=options["site"])
+
+        images = PropertyImage.objects.filter(property__site__in=sites).exclude(image="")
+        total_images = 0
+        for image_id in images.values_list("pk", flat=True).iterator():
+            normalize_property_image.delay(image_id)
+            total_images += 1
+
+        total_site_images = 0
+        for site in sites.only("pk", *SITE_IMAGE_FIELDS).iterator():
+            for field_name in SITE_IMAGE_FIELDS:
+                if getattr(site, field_name):
+                    normalize_site_image.delay(site.pk, field_name)
+                    total_site_images += 1
+
+        total_sections = 0
+        for theme_config in ThemeSectionConfig.objects.filter(site__in=sites).iterator():
+            for section_key, section in theme_config.sections_config.items():
+                if isinstance(section, dict) and section.get("image"):
+                    normalize_section_image.delay(theme_config.site_id, section_key, section["image"])
+                    total_sections += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Enfileiradas: {total_images} imagem(ns) de imóveis, {total_site_images} imagem(ns) de sites "
+                f"e {total_sections} imagem(ns) de seções"
+            )
+        )
@@ -0,0 +1,307 @@
+"""
+Paginação por cursor (keyset) para listagens grandes.
+
+O Paginator do Django executa um COUNT(*) e um OFFSET a cada página: o banco lê
+e descarta todas as linhas anteriores, o que fica lento em sites com milhares de
+imóveis e na paginação profunda feita por robôs de busca. O KeysetPaginator
+continua a partir dos valores de ordenação da última linha exibida (ex:
+is_featured, order, created_at, id), usando o mesmo índice da ordenação.
+
+O cursor (?cursor=) é um token opaco com esses valores e o número da página.
+Links antigos com ?page=N continuam funcionando (via OFFSET). O total é
+opcional: pode ser informado pela view (ex: contagens das facetas) ou contado
+até um limite (COUNT sobre uma subconsulta com LIMIT), exibido como "N+".
+
+A página expõe a mesma interface de django.core.paginator.Page usada pelos
+templates (has_next, number, paginator.num_pages...) mais os cursores, e o
+includes/pagination.html aceita os dois tipos.
+
+Limitação: a ordenação deve usar apenas campos (ou anotações) não nulos do
+próprio model; o pk é adicionado como desempate quando não estiver presente.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+import math
+from collections.abc import Sequence
+from functools import cached_property
+from typing import Any
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+# Parâmetros GET da paginação
+CURSOR_PARAM = "cursor"
+PAGE_PARAM = "page"
+
+# Limite da contagem aproximada (acima disso o total é exibido como "N+")
+DEFAULT_COUNT_LIMIT = 1000
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder trunca datetimes em milissegundos; o cursor precisa do valor exato"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class InvalidCursor(ValueError):
+    """Cursor malformado ou de outra ordenação (a listagem volta para a primeira página)"""
+
+
+class KeysetPage(Sequence):
+    """Página da paginação por cursor, compatível com django.core.paginator.Page"""
+
+    def __init__(
+        self,
+        object_list: list,
+        number: int,
+        paginator: "KeysetPaginator",
+        has_next: bool,
+        has_previous: bool,
+    ):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self) -> str:
+        return f"<KeysetPage {self.number}>"
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    def next_page_number(self) -> int:
+        return self.number + 1
+
+    def previous_page_number(self) -> int:
+        return max(self.number - 1, 1)
+
+    @property
+    def next_cursor(self) -> str | None:
+        """Cursor da próxima página (a partir da última linha desta)"""
+        if not self._has_next or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], self.next_page_number(), backwards=False)
+
+    @property
+    def previous_cursor(self) -> str | None:
+        """Cursor da página anterior (a partir da primeira linha desta, em ordem reversa)"""
+        if not self._has_previous or not self.object_list:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], self.previous_page_number(), backwards=True)
+
+    @property
+    def last_cursor(self) -> str | None:
+        """Cursor da última página (apenas com total exato)"""
+        if not self._has_next or self.paginator.approximate:
+            return None
+        return self.paginator.encode_cursor(None, self.paginator.num_pages, backwards=True)
+
+
+class KeysetPaginator:
+    """
+    Paginação por cursor sobre a ordenação do queryset.
+
+    Args:
+        queryset: Queryset já ordenado (ex: "-is_featured", "order", "-created_at")
+        per_page: Itens por página
+        count: Total já conhecido (evita a contagem); None conta até count_limit
+        count_limit: Limite da contagem aproximada
+    """
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        per_page: int,
+        count: int | None = None,
+        count_limit: int = DEFAULT_COUNT_LIMIT,
+    ):
+        self.ordering = self._get_ordering(queryset)
+        self.queryset = queryset.order_by(*self._order_by())
+        self.per_page = per_page
+        self.count_limit = count_limit
+        self._count = count
+
+    # ------------------------------------------------------------------
+    # Totais
+    # ------------------------------------------------------------------
+
+    @cached_property
+    def _limited_count(self) -> int:
+        if self._count is not None:
+            return self._count
+        return self.queryset.order_by()[: self.count_limit + 1].count()
+
+    @property
+    def approximate(self) -> bool:
+        """True quando a contagem atingiu o limite (total exibido como "N+")"""
+        return self._count is None and self._limited_count > self.count_limit
+
+    @property
+    def count(self) -> int:
+        return min(self._limited_count, self.count_limit) if self.approximate else self._limited_count
+
+    @property
+    def num_pages(self) -> int:
+        return max(math.ceil(self.count / self.per_page), 1)
+
+    # ------------------------------------------------------------------
+    # Páginas
+    # ------------------------------------------------------------------
+
+    def get_page(self, cursor: str | None = None, number: Any = None) -> KeysetPage:
+        """
+        Página do cursor informado; sem cursor, usa o número da página (?page=).
+        Cursores inválidos e números fora do intervalo não geram erro (como Paginator.get_page).
+        """
+        if cursor:
+            try:
+                values, page_number, backwards = self.decode_cursor(cursor)
+            except InvalidCursor:
+                return self._page_from_offset(1)
+            return self._page_from_cursor(values, page_number, backwards)
+
+        try:
+            page_number = max(int(number), 1)
+        except (TypeError, ValueError):
+            page_number = 1
+        return self._page_from_offset(page_number)
+
+    def _page_from_offset(self, number: int) -> KeysetPage:
+        """Primeira página ou link antigo com ?page=N"""
+        offset = (number - 1) * self.per_page
+        rows = list(self.queryset[offset : offset + self.per_page + 1])
+        if not rows and number > 1:
+            return self._page_from_cursor(None, None, backwards=True)
+        return KeysetPage(
+            rows[: self.per_page], number, self, has_next=len(rows) > self.per_page, has_previous=number > 1
+        )
+
+    def _page_from_cursor(self, values: list | None, number: int | None, backwards: bool) -> KeysetPage:
+        limit = self.per_page + 1
+        order_by = self._order_by(reverse=backwards)
+        if values is None:
+            rows = list(self.queryset.order_by(*order_by)[:limit])
+        else:
+            rows = self._seek(values, backwards, limit)
+
+        if not backwards:
+            if not rows:
+                # Os itens seguintes foram removidos: exibe a última página
+                return self._page_from_cursor(None, None, backwards=True)
+            return KeysetPage(
+                rows[: self.per_page], number, self, has_next=len(rows) > self.per_page, has_previous=True
+            )
+
+        # Página anterior (ou última): as linhas vieram em ordem reversa
+        has_previous = len(rows) > self.per_page
+        rows = rows[: self.per_page][::-1]
+        if not has_previous:
+            number = 1
+        elif number is None:
+            number = self.num_pages
+        return KeysetPage(rows, number, self, has_next=values is not None, has_previous=has_previous)
+
+    # ------------------------------------------------------------------
+    # Ordenação e filtro
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _get_ordering(queryset: QuerySet) -> list[tuple[str, bool]]:
+        """Campos da ordenação como (nome, decrescente), com o pk como desempate"""
+        pk_name = queryset.model._meta.pk.name
+        ordering = []
+        for item in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(item, str) or item == "?" or "__" in item:
+                raise ValueError(f"Ordenação não suportada pela paginação por cursor: {item!r}")
+            name = item.lstrip("-")
+            ordering.append((pk_name if name == "pk" else name, item.startswith("-")))
+
+        if pk_name not in [name for name, _descending in ordering]:
+            ordering.append((pk_name, True))
+        return ordering
+
+    def _order_by(self, reverse: bool = False) -> list[str]:
+        return [("-" if descending != reverse else "") + name for name, descending in self.ordering]
+
+    def _seek(self, values: list, backwards: bool, limit: int) -> list:
+        """
+        Até `limit` linhas depois (ou antes) dos valores do cursor, na ordem da paginação.
+
+        A condição completa seria (a > x) OR (a = x AND b > y) OR ..., mas com
+        sentidos mistos (ex: -is_featured, order) o banco não a usa como faixa do
+        índice e filtra linha a linha tudo o que vem antes do cursor. Cada termo
+        do OR, por outro lado, é uma faixa contínua do índice (igualdade nos
+        campos anteriores e desigualdade em um campo): os termos são consultados
+        do mais específico ao mais geral até completar a página, normalmente com
+        uma única consulta.
+        """
+        order_by = self._order_by(reverse=backwards)
+        rows = []
+        for depth in range(len(self.ordering) - 1, -1, -1):
+            name, descending = self.ordering[depth]
+            lookup = "lt" if descending != backwards else "gt"
+            prefix = {field: value for (field, _descending), value in zip(self.ordering[:depth], values, strict=False)}
+            branch = self.queryset.filter(**prefix, **{f"{name}__{lookup}": values[depth]}).order_by(*order_by)
+            rows.extend(branch[: limit - len(rows)])
+            if len(rows) >= limit:
+                break
+        return rows
+
+    # ------------------------------------------------------------------
+    # Cursor
+    # ------------------------------------------------------------------
+
+    def encode_cursor(self, row: Any, number: int, backwards: bool) -> str:
+        """Token com os valores de ordenação da linha (None = a partir do fim)"""
+        values = None if row is None else [getattr(row, name) for name, _descending in self.ordering]
+        payload = json.dumps({"v": values, "n": number, "b": backwards}, cls=CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[list | None, int, bool]:
+        """Retorna (valores convertidos, número da página, se é para trás)"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            values, number, backwards = payload["v"], int(payload["n"]), bool(payload["b"])
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise InvalidCursor(str(e)) from e
+
+        if values is None:
+            return None, max(number, 1), True
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor("Cursor de outra ordenação")
+
+        converted = []
+        for (name, _descending), value in zip(self.ordering, values, strict=True):
+            if value is None:
+                raise InvalidCursor(f"Valor nulo em {name}")
+            try:
+                field = self.queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                # Anotação (ex: relevância da busca): mantém o valor do JSON
+                converted.append(value)
+                continue
+            try:
+                converted.append(field.to_python(value))
+            except ValidationError as e:
+                raise InvalidCursor(f"Valor inválido em {name}") from e
+        return converted, max(number, 1), backwards
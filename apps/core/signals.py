@@ -0,0 +1,35 @@
+"""
+Signals do app Core
+Invalida o resumo de onboarding cacheado quando o site, os imóveis ou o status mudam
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import OnboardingStatus
+from .utils import invalidate_onboarding_summary, invalidate_site_onboarding
+
+
+@receiver([post_save, post_delete], sender="landings.Site")
+def invalidate_onboarding_on_site_change(sender, instance, **kwargs):
+    """Dados básicos, tema e domínio do site são etapas do onboarding"""
+    invalidate_onboarding_summary(instance.owner_id)
+
+
+@receiver(post_save, sender="properties.Property")
+def invalidate_onboarding_on_property_create(sender, instance, created, **kwargs):
+    """A etapa "Cadastrar Imóvel" só muda quando um imóvel é criado ou removido"""
+    if created:
+        invalidate_site_onboarding(instance.site_id)
+
+
+@receiver(post_delete, sender="properties.Property")
+def invalidate_onboarding_on_property_delete(sender, instance, **kwargs):
+    """A etapa "Cadastrar Imóvel" só muda quando um imóvel é criado ou removido"""
+    invalidate_site_onboarding(instance.site_id)
+
+
+@receiver([post_save, post_delete], sender=OnboardingStatus)
+def invalidate_onboarding_on_status_change(sender, instance, **kwargs):
+    """Mensagem de conclusão dispensada"""
+    invalidate_onboarding_summary(instance.user_id)
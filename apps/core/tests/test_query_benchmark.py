@@ -0,0 +1,28 @@
+"""
+Regressão no número de queries das páginas públicas e do dashboard.
+
+Roda os mesmos cenários do comando benchmark_queries (mesmos parâmetros do
+baseline em benchmarks/queries.json) no banco de testes e falha se alguma rota
+passar a executar mais queries que o baseline. Depois de uma redução
+intencional, regrave o baseline com `python manage.py benchmark_queries --update`.
+"""
+
+import json
+from io import StringIO
+
+from django.test import TransactionTestCase
+
+from apps.core.management.commands.benchmark_queries import DEFAULT_BASELINE, Command, find_regressions
+
+
+class QueryBenchmarkTests(TransactionTestCase):
+    # Transações reais, como no comando: os callbacks on_commit (snapshot, folha de estilos do site)
+    # rodam durante a carga, e as rotas são medidas no mesmo estado do baseline
+    def test_query_counts_do_not_exceed_baseline(self):
+        baseline = json.loads(DEFAULT_BASELINE.read_text())
+
+        routes = Command(stdout=StringIO()).run_routes(baseline["params"], repeat=1)
+
+        self.assertEqual(set(routes) - set(baseline["routes"]), set(), "Rotas sem baseline: rode --update")
+        regressions = find_regressions(routes, baseline["routes"])
+        self.assertEqual(regressions, [], "Regressão no número de queries:\n" + "\n".join(regressions))
@@ -1,11 +1,21 @@
 """
 Utilitários do app Core - Cálculo de progresso de onboarding
+
+O resumo do onboarding (etapas concluídas e mensagem de conclusão dispensada)
+fica em cache por usuário e é invalidado pelos signals de Site, Property e
+OnboardingStatus (apps.core.signals).
 """
 
+import logging
 from typing import Any
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 
+logger = logging.getLogger(__name__)
+
 
 class OnboardingProgressCalculator:
     """
@@ -62,18 +72,27 @@ class OnboardingProgressCalculator:
             - total_count: Total de etapas
             - percentage: Porcentagem de conclusão
         """
+        return cls.build(cls.completed_steps(user))
+
+    @classmethod
+    def completed_steps(cls, user: Any) -> list[str]:
+        """Chaves das etapas concluídas pelo usuário"""
         try:
             site = user.site
         except Exception:
             # Se não tiver site, todas as etapas estão pendentes
-            site = None
+            return []
+
+        return [step["key"] for step in cls.STEPS if getattr(cls, step["check_method"])(site)]
 
+    @classmethod
+    def build(cls, completed_keys: list[str]) -> dict[str, Any]:
+        """Monta o progresso (mesmo formato de calculate) a partir das etapas concluídas"""
         steps = []
         completed_count = 0
 
         for step_config in cls.STEPS:
-            check_method = getattr(cls, step_config["check_method"])
-            is_completed = check_method(site) if site else False
+            is_completed = step_config["key"] in completed_keys
 
             if is_completed:
                 completed_count += 1
@@ -132,3 +151,69 @@ class OnboardingProgressCalculator:
         # Considera configurado se tem subdomínio (sempre tem) ou domínio personalizado
         return bool(site.subdomain)
 
+
+# ============================================================================
+# CACHE DO RESUMO DE ONBOARDING (por usuário)
+# ============================================================================
+
+
+def _onboarding_cache_key(user_id: int) -> str:
+    return f"onboarding:summary:{user_id}"
+
+
+def get_onboarding_summary(user: Any) -> dict[str, Any]:
+    """
+    Resumo do onboarding do usuário, cacheado.
+
+    Returns:
+        Dict com completed_steps (chaves das etapas concluídas) e
+        completion_message_dismissed
+    """
+    from apps.core.models import OnboardingStatus
+
+    key = _onboarding_cache_key(user.pk)
+    try:
+        summary = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Erro ao ler resumo de onboarding do cache: {e}")
+        summary = None
+    if summary is not None:
+        return summary
+
+    # Sem get_or_create: o status só é gravado quando a mensagem é dispensada
+    dismissed = OnboardingStatus.objects.filter(user=user).values_list("completion_message_dismissed", flat=True)
+    summary = {
+        "completed_steps": OnboardingProgressCalculator.completed_steps(user),
+        "completion_message_dismissed": bool(dismissed.first()),
+    }
+    try:
+        cache.set(key, summary, timeout=getattr(settings, "ONBOARDING_CACHE_TTL", 3600))
+    except Exception as e:
+        logger.warning(f"Erro ao gravar resumo de onboarding no cache: {e}")
+    return summary
+
+
+def invalidate_onboarding_summary(user_id: int | None) -> None:
+    """
+    Descarta o resumo de onboarding cacheado do usuário após o commit (antes dele,
+    um acesso concorrente leria os dados antigos e os gravaria de novo no cache)
+    """
+    if user_id is None:
+        return
+
+    def _invalidate():
+        try:
+            cache.delete(_onboarding_cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"Erro ao invalidar resumo de onboarding: {e}")
+
+    transaction.on_commit(_invalidate)
+
+
+def invalidate_site_onboarding(site_id: int | None) -> None:
+    """Descarta o resumo de onboarding do dono do site (após o commit)"""
+    from apps.landings.models import Site
+
+    if site_id is None:
+        return
+    invalidate_onboarding_summary(Site.objects.filter(pk=site_id).values_list("owner_id", flat=True).first())
@@ -1,23 +1,22 @@
 """
-Admin do app Infrastructure
-
-Este app não possui admin próprio.
+Admin do app Infrastructure - Provisionamento de domínios (somente leitura)
 """
 
+from django.contrib import admin
 
+from .models import DomainProvisioning
 
 
+@admin.register(DomainProvisioning)
+class DomainProvisioningAdmin(admin.ModelAdmin):
+    """Admin para acompanhar o provisionamento (DNS/SSL) dos domínios personalizados"""
 
+    list_display = ["domain", "site", "state", "attempts", "next_attempt_at", "certificate_expires_at", "updated_at"]
+    list_filter = ["state"]
+    search_fields = ["domain", "site__business_name", "site__owner__email"]
+    list_select_related = ["site"]
+    readonly_fields = [field.name for field in DomainProvisioning._meta.fields]
 
-
-
-
-
-
-
-
-
-
-
-
-
+    def has_add_permission(self, request):
+        # Criado pelo agendador a partir do domínio do site
+        return False
@@ -11,6 +11,10 @@ class InfrastructureConfig(AppConfig):
     name = "apps.infrastructure"
     verbose_name = "Infraestrutura"
 
+    def ready(self):
+        """Importa signals quando o app estiver pronto"""
+        import apps.infrastructure.signals  # noqa: F401
+
 
 
 
@@ -0,0 +1,200 @@
+"""
+Verificação do DNS dos domínios personalizados.
+
+As consultas rodam em paralelo (asyncio, até DNS_CHECK_CONCURRENCY simultâneas),
+cada uma com timeout de DNS_CHECK_TIMEOUT segundos, e o domínio é aceito se:
+
+- o nome canônico (destino do CNAME) é o CUSTOM_DOMAIN_CNAME_TARGET, ou
+- algum IP resolvido está entre os esperados (CUSTOM_DOMAIN_EXPECTED_IPS ou,
+  se vazio, os IPs do próprio domínio base).
+
+Quais domínios verificar, e quando, é decidido pela máquina de estados do
+provisionamento (apps.infrastructure.provisioning).
+
+A resolução usa socket.gethostbyname_ex (resolvedor do sistema) em um pool de
+threads próprio; em testes, StubResolver responde a partir de um dicionário.
+"""
+
+import asyncio
+import logging
+import socket
+from collections.abc import Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Protocol
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DNSLookupError(Exception):
+    """Domínio sem registro (NXDOMAIN, sem A) ou falha do resolvedor"""
+
+
+@dataclass(frozen=True)
+class DNSAnswer:
+    """Resposta da resolução: nome canônico (após os CNAMEs) e endereços IPv4"""
+
+    canonical_name: str
+    addresses: frozenset[str]
+
+
+@dataclass(frozen=True)
+class DNSCheckResult:
+    """Resultado da verificação de um domínio"""
+
+    domain: str
+    ok: bool
+    message: str = ""
+    canonical_name: str = ""
+    addresses: tuple[str, ...] = ()
+
+
+class Resolver(Protocol):
+    async def resolve(self, host: str) -> DNSAnswer: ...
+
+
+class SystemResolver:
+    """Resolvedor do sistema (gethostbyname_ex) executado em um pool de threads"""
+
+    def __init__(self, executor: ThreadPoolExecutor | None = None):
+        self.executor = executor
+
+    async def resolve(self, host: str) -> DNSAnswer:
+        loop = asyncio.get_running_loop()
+        try:
+            canonical_name, _aliases, addresses = await loop.run_in_executor(
+                self.executor, socket.gethostbyname_ex, host
+            )
+        except (socket.gaierror, socket.herror, UnicodeError) as e:
+            raise DNSLookupError(str(e)) from e
+        return DNSAnswer(normalize_host(canonical_name), frozenset(addresses))
+
+
+class StubResolver:
+    """
+    Resolvedor local a partir de um dicionário (testes e desenvolvimento).
+
+    Valores aceitos: DNSAnswer, lista de IPs, nome (CNAME para outro registro
+    do dicionário) ou uma exceção a ser levantada.
+    """
+
+    def __init__(self, records: Mapping[str, object], delay: float = 0):
+        self.records = {normalize_host(host): value for host, value in records.items()}
+        self.delay = delay
+
+    async def resolve(self, host: str) -> DNSAnswer:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        name = normalize_host(host)
+        for _hop in range(8):
+            value = self.records.get(name)
+            if value is None:
+                raise DNSLookupError(f"{name}: registro não encontrado")
+            if isinstance(value, BaseException):
+                raise value
+            if isinstance(value, DNSAnswer):
+                return value
+            if isinstance(value, str):
+                name = normalize_host(value)
+                continue
+            return DNSAnswer(name, frozenset(value))
+        raise DNSLookupError(f"{host}: cadeia de CNAME muito longa")
+
+
+@dataclass(frozen=True)
+class ExpectedTargets:
+    """Destinos aceitos para um domínio personalizado"""
+
+    cname: str
+    addresses: frozenset[str]
+
+
+def normalize_host(host: str) -> str:
+    """Nome em minúsculas, sem espaços e sem o ponto final"""
+    return host.strip().lower().rstrip(".")
+
+
+def check_answer(domain: str, answer: DNSAnswer, expected: ExpectedTargets) -> DNSCheckResult:
+    """Confere a resposta com os destinos esperados"""
+    details = {"canonical_name": answer.canonical_name, "addresses": tuple(sorted(answer.addresses))}
+    if expected.cname and answer.canonical_name == expected.cname:
+        return DNSCheckResult(domain, True, **details)
+    if answer.addresses & expected.addresses:
+        return DNSCheckResult(domain, True, **details)
+    found = ", ".join(details["addresses"]) or answer.canonical_name
+    return DNSCheckResult(domain, False, f"DNS aponta para {found}, e não para {expected.cname}", **details)
+
+
+async def check_domains(
+    domains: Iterable[str],
+    expected: ExpectedTargets,
+    resolver: Resolver,
+    timeout: float,
+    concurrency: int,
+) -> dict[str, DNSCheckResult]:
+    """Verifica os domínios em paralelo (no máximo `concurrency` consultas simultâneas)"""
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def check(domain: str) -> DNSCheckResult:
+        async with semaphore:
+            try:
+                answer = await asyncio.wait_for(resolver.resolve(domain), timeout)
+            except TimeoutError:
+                return DNSCheckResult(domain, False, f"Tempo esgotado ao consultar o DNS ({timeout:g}s)")
+            except DNSLookupError:
+                return DNSCheckResult(domain, False, "DNS não configurado ou não propagado ainda")
+        return check_answer(domain, answer, expected)
+
+    unique = list(dict.fromkeys(normalize_host(domain) for domain in domains))
+    results = await asyncio.gather(*(check(domain) for domain in unique))
+    return {result.domain: result for result in results}
+
+
+async def _resolve_expected(resolver: Resolver, timeout: float) -> ExpectedTargets:
+    cname = normalize_host(settings.CUSTOM_DOMAIN_CNAME_TARGET)
+    addresses = frozenset(ip.strip() for ip in settings.CUSTOM_DOMAIN_EXPECTED_IPS if ip.strip())
+    if not addresses:
+        answer = await asyncio.wait_for(resolver.resolve(cname), timeout)
+        addresses = answer.addresses
+    return ExpectedTargets(cname, addresses)
+
+
+def run_dns_checks(domains: Iterable[str], resolver: Resolver | None = None) -> dict[str, DNSCheckResult]:
+    """
+    Verifica os domínios (chamada síncrona, para tarefas e comandos).
+
+    Raises:
+        DNSLookupError: não foi possível resolver o domínio base (destinos esperados)
+    """
+    domains = list(domains)
+    timeout = settings.DNS_CHECK_TIMEOUT
+    concurrency = settings.DNS_CHECK_CONCURRENCY
+
+    async def run(resolver: Resolver) -> dict[str, DNSCheckResult]:
+        try:
+            expected = await _resolve_expected(resolver, timeout)
+        except TimeoutError as e:
+            raise DNSLookupError(f"Tempo esgotado ao resolver {settings.CUSTOM_DOMAIN_CNAME_TARGET}") from e
+        except DNSLookupError as e:
+            raise DNSLookupError(f"Não foi possível resolver {settings.CUSTOM_DOMAIN_CNAME_TARGET}: {e}") from e
+        return await check_domains(domains, expected, resolver, timeout, concurrency)
+
+    if resolver is not None:
+        return asyncio.run(run(resolver))
+
+    # Pool próprio: consultas presas no resolvedor do sistema não seguram o fim da varredura
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="dns-check")
+    try:
+        return asyncio.run(run(SystemResolver(executor)))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def backoff_delay(attempts: int, base: int | None = None, maximum: int | None = None) -> timedelta:
+    """Intervalo até a próxima tentativa após `attempts` falhas seguidas (padrão: backoff da verificação DNS)"""
+    base = settings.DNS_CHECK_BACKOFF_BASE if base is None else base
+    maximum = settings.DNS_CHECK_BACKOFF_MAX if maximum is None else maximum
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), maximum))
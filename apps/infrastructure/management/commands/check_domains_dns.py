@@ -0,0 +1,50 @@
+"""
+Comando Django para verificar o DNS dos domínios personalizados.
+
+Sem argumentos verifica os domínios pendentes cuja próxima verificação venceu
+(a mesma etapa do agendador provision_custom_domains) e grava os resultados.
+Com --domain apenas consulta e exibe o resultado, sem gravar.
+
+Uso:
+    python manage.py check_domains_dns                            # Pendentes (grava resultados)
+    python manage.py check_domains_dns --all                      # Ignora o backoff dos domínios
+    python manage.py check_domains_dns --domain www.fulano.com.br # Apenas consulta
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.infrastructure.dns_check import DNSLookupError, run_dns_checks
+from apps.infrastructure.provisioning import check_pending_domains, sync_missing_domains
+
+
+class Command(BaseCommand):
+    """Comando para verificar o DNS dos domínios personalizados"""
+
+    help = "Verifica o DNS dos domínios personalizados pendentes"
+
+    def add_arguments(self, parser):
+        """Adiciona argumentos ao comando"""
+        parser.add_argument("--domain", action="append", help="Domínio a consultar, sem gravar (pode repetir)")
+        parser.add_argument("--all", action="store_true", help="Verifica todos os pendentes, ignorando o backoff")
+
+    def handle(self, *args, **options):
+        """Executa o comando"""
+        try:
+            if options["domain"]:
+                for result in run_dns_checks(options["domain"]).values():
+                    if result.ok:
+                        self.stdout.write(self.style.SUCCESS(f"  ✅ {result.domain}: {', '.join(result.addresses)}"))
+                    else:
+                        self.stdout.write(self.style.ERROR(f"  ❌ {result.domain}: {result.message}"))
+                return
+
+            sync_missing_domains()
+            summary = check_pending_domains(ignore_backoff=options["all"])
+        except DNSLookupError as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✅ {summary['checked']} domínio(s) verificado(s): {summary['ok']} ok, {summary['failed']} pendente(s)\n"
+            )
+        )
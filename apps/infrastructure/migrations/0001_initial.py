@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("landings", "0002_site_design_css"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DomainProvisioning",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("domain", models.CharField(max_length=255, unique=True, verbose_name="Domínio")),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Aguardando DNS"),
+                            ("dns_ok", "DNS configurado"),
+                            ("issuing", "Emitindo certificado"),
+                            ("active", "Ativo"),
+                            ("renewing", "Renovando certificado"),
+                        ],
+                        default="pending",
+                        max_length=20,
+                        verbose_name="Estado",
+                    ),
+                ),
+                (
+                    "state_changed_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Mudança de estado"),
+                ),
+                ("attempts", models.PositiveSmallIntegerField(default=0, verbose_name="Tentativas")),
+                ("next_attempt_at", models.DateTimeField(blank=True, null=True, verbose_name="Próxima tentativa")),
+                ("last_error", models.TextField(blank=True, null=True, verbose_name="Último erro")),
+                ("task_key", models.CharField(blank=True, max_length=100, null=True, verbose_name="Chave da tarefa")),
+                ("task_started_at", models.DateTimeField(blank=True, null=True, verbose_name="Início da tarefa")),
+                (
+                    "certificate_expires_at",
+                    models.DateTimeField(blank=True, null=True, verbose_name="Vencimento do certificado"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Criado em")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Atualizado em")),
+                (
+                    "site",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="domain_provisioning",
+                        to="landings.site",
+                        verbose_name="Site",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Provisionamento de Domínio",
+                "verbose_name_plural": "Provisionamentos de Domínios",
+                "indexes": [models.Index(fields=["state", "next_attempt_at"], name="infrastruct_state_eee716_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:40
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def backfill_domain_provisioning(apps, schema_editor):
+    """
+    Cria o provisionamento dos domínios personalizados já existentes a partir do status do Site.
+
+    Domínios com SSL ativo entram como active e com DNS ok entram como dns_ok; assim o
+    agendador não refaz a verificação nem emite de novo certificados que já existem.
+    O vencimento fica vazio: a primeira renovação agendada lê o certificado e o grava.
+    """
+    Site = apps.get_model("landings", "Site")
+    DomainProvisioning = apps.get_model("infrastructure", "DomainProvisioning")
+
+    now = timezone.now()
+    sites = (
+        Site.objects.exclude(custom_domain__isnull=True)
+        .exclude(custom_domain="")
+        .filter(domain_provisioning__isnull=True)
+        .values_list("pk", "custom_domain", "ssl_status", "dns_status")
+    )
+    provisionings = []
+    for site_id, domain, ssl_status, dns_status in sites.iterator():
+        provisioning = DomainProvisioning(site_id=site_id, domain=domain, state="pending", state_changed_at=now)
+        if ssl_status == "active":
+            provisioning.state = "active"
+        elif dns_status == "ok":
+            provisioning.state = "dns_ok"
+        provisionings.append(provisioning)
+
+    DomainProvisioning.objects.bulk_create(provisionings, batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("infrastructure", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_domain_provisioning, migrations.RunPython.noop),
+    ]
@@ -1,23 +1,68 @@
 """
-Models do app Infrastructure
-
-Este app não possui models próprios, apenas gerencia serviços de infraestrutura.
+Models do app Infrastructure - Provisionamento de domínios personalizados
 """
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class DomainProvisioning(models.Model):
+    """
+    Estado do provisionamento (DNS e certificado SSL) do domínio personalizado de um site.
+
+    Máquina de estados: pending -> dns_ok -> issuing -> active -> renewing -> active.
+    As transições são feitas por UPDATE condicional (apps.infrastructure.provisioning):
+    apenas um processo avança cada domínio, e uma emissão ou renovação só roda
+    para a chave de idempotência (task_key) gravada na transição.
+    """
+
+    STATE_PENDING = "pending"
+    STATE_DNS_OK = "dns_ok"
+    STATE_ISSUING = "issuing"
+    STATE_ACTIVE = "active"
+    STATE_RENEWING = "renewing"
+    STATE_CHOICES = [
+        (STATE_PENDING, _("Aguardando DNS")),
+        (STATE_DNS_OK, _("DNS configurado")),
+        (STATE_ISSUING, _("Emitindo certificado")),
+        (STATE_ACTIVE, _("Ativo")),
+        (STATE_RENEWING, _("Renovando certificado")),
+    ]
+
+    # Transições permitidas (emissão com erro volta para dns_ok; renovação com erro mantém o certificado atual)
+    TRANSITIONS = {
+        STATE_PENDING: {STATE_DNS_OK},
+        STATE_DNS_OK: {STATE_ISSUING},
+        STATE_ISSUING: {STATE_ACTIVE, STATE_DNS_OK},
+        STATE_ACTIVE: {STATE_RENEWING},
+        STATE_RENEWING: {STATE_ACTIVE},
+    }
+
+    site = models.OneToOneField(
+        "landings.Site", on_delete=models.CASCADE, related_name="domain_provisioning", verbose_name=_("Site")
+    )
+    domain = models.CharField(_("Domínio"), max_length=255, unique=True)
+    state = models.CharField(_("Estado"), max_length=20, choices=STATE_CHOICES, default=STATE_PENDING)
+    state_changed_at = models.DateTimeField(_("Mudança de estado"), default=timezone.now)
+
+    # Tentativas com falha no estado atual e quando tentar de novo (backoff exponencial)
+    attempts = models.PositiveSmallIntegerField(_("Tentativas"), default=0)
+    next_attempt_at = models.DateTimeField(_("Próxima tentativa"), null=True, blank=True)
+    last_error = models.TextField(_("Último erro"), blank=True, null=True)
+
+    # Emissão/renovação em andamento: chave de idempotência (também o id da tarefa no Celery)
+    task_key = models.CharField(_("Chave da tarefa"), max_length=100, blank=True, null=True)
+    task_started_at = models.DateTimeField(_("Início da tarefa"), null=True, blank=True)
+
+    certificate_expires_at = models.DateTimeField(_("Vencimento do certificado"), null=True, blank=True)
+    created_at = models.DateTimeField(_("Criado em"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Atualizado em"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Provisionamento de Domínio")
+        verbose_name_plural = _("Provisionamentos de Domínios")
+        indexes = [models.Index(fields=["state", "next_attempt_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.domain} ({self.get_state_display()})"
@@ -0,0 +1,481 @@
+"""
+Provisionamento dos domínios personalizados: verificação DNS e certificado SSL.
+
+Cada domínio tem um DomainProvisioning, avançado por um único agendador (tarefa
+provision_custom_domains, no Celery Beat):
+
+    pending --DNS ok--> dns_ok --emissão agendada--> issuing --certbot ok--> active
+                          ^                             |                     |
+                          +-------- certbot erro -------+          perto de vencer
+                                                                              v
+                                              active <--certbot ok/erro-- renewing
+
+- Transições são UPDATEs condicionados ao estado (e ao domínio) atual: dois
+  agendadores concorrentes não avançam o mesmo domínio duas vezes.
+- Ao agendar uma emissão/renovação é gravada uma chave de idempotência
+  (task_key), usada também como id da tarefa no Celery. A tarefa só roda se a
+  chave ainda é a do domínio e ainda não foi iniciada; entregas repetidas,
+  tarefas antigas e domínios trocados no meio do caminho são ignorados.
+- O certbot de um domínio roda sob um lock no cache: nunca há duas execuções
+  simultâneas para o mesmo domínio.
+- Falhas (DNS ainda não propagado, erro no certbot) são tentadas de novo com
+  backoff exponencial; emissões sem resposta após SSL_TASK_TIMEOUT voltam à fila.
+
+Os campos dns_status/ssl_status do Site espelham o estado para o painel.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import mail_admins
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .dns_check import DNSCheckResult, Resolver, backoff_delay, normalize_host, run_dns_checks
+from .models import DomainProvisioning
+
+logger = logging.getLogger(__name__)
+
+# Espera entre o DNS ficar ok e a emissão (propagação para os resolvedores do Let's Encrypt)
+ISSUE_DELAY = timedelta(minutes=1)
+
+# Validade dos certificados do Let's Encrypt, usada se não for possível ler o arquivo
+CERTIFICATE_LIFETIME = timedelta(days=90)
+
+# Lock do certbot por domínio: um pouco mais que o timeout do certbot no SSLManager
+CERTBOT_LOCK_TIMEOUT = 300
+
+
+def _certbot_lock_key(domain: str) -> str:
+    return f"certbot:{domain}"
+
+
+def _due(now: datetime) -> Q:
+    return Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now)
+
+
+def _update_site(provisioning: DomainProvisioning, **fields) -> None:
+    """Espelha o estado no Site (update(): sem os signals do Site, o painel lê direto do banco)"""
+    from apps.landings.models import Site
+
+    Site.objects.filter(pk=provisioning.site_id, custom_domain=provisioning.domain).update(**fields)
+
+
+def transition(provisioning: DomainProvisioning, to_state: str, expected_key: str | None = None, **fields) -> bool:
+    """
+    Leva o domínio do estado atual para `to_state`, se ninguém o fez antes.
+
+    Args:
+        provisioning: Provisionamento como lido (estado e domínio esperados)
+        to_state: Estado de destino (deve ser permitido em DomainProvisioning.TRANSITIONS)
+        expected_key: Exige que a chave de idempotência gravada seja esta
+        **fields: Demais campos gravados junto com a transição
+
+    Returns:
+        True se a transição foi feita por esta chamada
+    """
+    from_state = provisioning.state
+    if to_state not in DomainProvisioning.TRANSITIONS[from_state]:
+        raise ValueError(f"Transição inválida: {from_state} -> {to_state}")
+
+    queryset = DomainProvisioning.objects.filter(pk=provisioning.pk, domain=provisioning.domain, state=from_state)
+    if expected_key is not None:
+        queryset = queryset.filter(task_key=expected_key)
+
+    fields.update(state=to_state, state_changed_at=timezone.now())
+    if not queryset.update(**fields):
+        return False
+
+    for name, value in fields.items():
+        setattr(provisioning, name, value)
+    logger.info(f"🌐 {provisioning.domain}: {from_state} -> {to_state}")
+    return True
+
+
+def sync_site_domain(site_id: int) -> DomainProvisioning | None:
+    """
+    Cria (ou reinicia) o provisionamento conforme o domínio personalizado atual do site.
+
+    Returns:
+        Provisionamento do domínio ou None se o site não tem domínio personalizado
+    """
+    from apps.landings.models import Site
+
+    domain = Site.objects.filter(pk=site_id).values_list("custom_domain", flat=True).first()
+    if not domain:
+        DomainProvisioning.objects.filter(site_id=site_id).delete()
+        return None
+
+    provisioning = DomainProvisioning.objects.filter(site_id=site_id).first()
+    if provisioning is not None and provisioning.domain == domain:
+        return provisioning
+
+    # O domínio pode ter vindo de outro site, ainda não sincronizado
+    DomainProvisioning.objects.filter(domain=domain).exclude(site_id=site_id).delete()
+    provisioning, _ = DomainProvisioning.objects.update_or_create(
+        site_id=site_id,
+        defaults={
+            "domain": domain,
+            "state": DomainProvisioning.STATE_PENDING,
+            "state_changed_at": timezone.now(),
+            "attempts": 0,
+            "next_attempt_at": None,
+            "last_error": None,
+            "task_key": None,
+            "task_started_at": None,
+            "certificate_expires_at": None,
+        },
+    )
+    logger.info(f"🌐 Provisionamento iniciado para {domain}")
+    return provisioning
+
+
+def sync_missing_domains(limit: int | None = None) -> int:
+    """Sincroniza sites com domínio personalizado sem provisionamento (ou com outro domínio)"""
+    from apps.landings.models import Site
+
+    site_ids = list(
+        Site.objects.exclude(custom_domain__isnull=True)
+        .exclude(custom_domain="")
+        .filter(Q(domain_provisioning__isnull=True) | ~Q(domain_provisioning__domain=F("custom_domain")))
+        .values_list("pk", flat=True)[:limit]
+    )
+    for site_id in site_ids:
+        sync_site_domain(site_id)
+    return len(site_ids)
+
+
+# ============================================================================
+# DNS: pending -> dns_ok
+# ============================================================================
+
+
+def apply_dns_result(provisioning: DomainProvisioning, result: DNSCheckResult, now: datetime) -> bool:
+    """
+    Aplica o resultado da verificação DNS a um domínio pendente.
+
+    Returns:
+        True se o domínio passou para dns_ok
+    """
+    if result.ok:
+        advanced = transition(
+            provisioning,
+            DomainProvisioning.STATE_DNS_OK,
+            attempts=0,
+            next_attempt_at=now + ISSUE_DELAY,
+            last_error=None,
+        )
+        if advanced:
+            _update_site(provisioning, dns_status="ok", dns_error=None)
+        return advanced
+
+    attempts = provisioning.attempts + 1
+    updated = DomainProvisioning.objects.filter(
+        pk=provisioning.pk, domain=provisioning.domain, state=DomainProvisioning.STATE_PENDING
+    ).update(attempts=attempts, next_attempt_at=now + backoff_delay(attempts), last_error=result.message[:500])
+    if updated:
+        provisioning.attempts = attempts
+        _update_site(provisioning, dns_status="error", dns_error=result.message[:500])
+    return False
+
+
+def check_pending_domains(
+    resolver: Resolver | None = None, ignore_backoff: bool = False, now: datetime | None = None
+) -> dict[str, int]:
+    """
+    Verifica (em paralelo) o DNS dos domínios pendentes cuja próxima tentativa venceu.
+
+    Raises:
+        DNSLookupError: não foi possível resolver o domínio base (destinos esperados)
+
+    Returns:
+        Contagem de domínios verificados, configurados e ainda pendentes
+    """
+    now = now or timezone.now()
+    pending = DomainProvisioning.objects.filter(state=DomainProvisioning.STATE_PENDING)
+    if not ignore_backoff:
+        pending = pending.filter(_due(now))
+    pending = list(pending.order_by("next_attempt_at", "pk")[: settings.DNS_CHECK_BATCH_SIZE])
+    if not pending:
+        return {"checked": 0, "ok": 0, "failed": 0}
+
+    results = run_dns_checks((provisioning.domain for provisioning in pending), resolver)
+    ok = 0
+    for provisioning in pending:
+        result = results[normalize_host(provisioning.domain)]
+        ok += apply_dns_result(provisioning, result, now)
+    return {"checked": len(pending), "ok": ok, "failed": len(pending) - ok}
+
+
+def check_site_domain_now(site_id: int, resolver: Resolver | None = None) -> DNSCheckResult | None:
+    """
+    Verificação manual do DNS de um site (ignora o backoff).
+
+    Domínios além de pending (DNS já ok) são apenas consultados, sem voltar de estado.
+
+    Raises:
+        DNSLookupError: não foi possível resolver o domínio base (destinos esperados)
+
+    Returns:
+        Resultado da verificação ou None se o site não tem domínio personalizado
+    """
+    provisioning = sync_site_domain(site_id)
+    if provisioning is None:
+        return None
+
+    result = next(iter(run_dns_checks([provisioning.domain], resolver).values()))
+    if provisioning.state == DomainProvisioning.STATE_PENDING:
+        apply_dns_result(provisioning, result, timezone.now())
+    return result
+
+
+# Verificação manual pelo painel: agendada em background, o painel consulta o andamento
+MANUAL_CHECK_LOCK_TIMEOUT = 60  # segundos (libera o botão se o worker não responder)
+MANUAL_CHECK_RESULT_TTL = 300  # segundos
+
+
+def _manual_check_lock_key(site_id: int) -> str:
+    return f"dns_check:manual:{site_id}:running"
+
+
+def _manual_check_result_key(site_id: int) -> str:
+    return f"dns_check:manual:{site_id}:result"
+
+
+def request_manual_dns_check(site_id: int, domain: str) -> bool:
+    """
+    Agenda a verificação manual do DNS de um site (no máximo uma em andamento por site).
+
+    Returns:
+        False se já havia uma verificação em andamento
+    """
+    from .tasks import check_custom_domain_dns
+
+    if not cache.add(_manual_check_lock_key(site_id), domain, timeout=MANUAL_CHECK_LOCK_TIMEOUT):
+        return False
+    cache.delete(_manual_check_result_key(site_id))
+    try:
+        check_custom_domain_dns.delay(site_id, domain)
+    except Exception:
+        cache.delete(_manual_check_lock_key(site_id))
+        raise
+    return True
+
+
+def finish_manual_dns_check(site_id: int, result: dict) -> None:
+    """Grava o resultado da verificação manual e libera uma nova verificação"""
+    cache.set(_manual_check_result_key(site_id), result, timeout=MANUAL_CHECK_RESULT_TTL)
+    cache.delete(_manual_check_lock_key(site_id))
+
+
+def get_manual_dns_check(site_id: int) -> dict:
+    """Andamento da verificação manual: {"running": bool, "result": dict ou None}"""
+    values = cache.get_many([_manual_check_lock_key(site_id), _manual_check_result_key(site_id)])
+    return {
+        "running": _manual_check_lock_key(site_id) in values,
+        "result": values.get(_manual_check_result_key(site_id)),
+    }
+
+
+# ============================================================================
+# SSL: dns_ok -> issuing -> active -> renewing -> active
+# ============================================================================
+
+
+def _schedule_certificate_task(provisioning: DomainProvisioning, to_state: str) -> bool:
+    """Transição para issuing/renewing com uma chave de idempotência nova e agenda a tarefa com essa chave"""
+    from .tasks import issue_ssl_certificate, renew_ssl_certificate
+
+    action = "issue" if to_state == DomainProvisioning.STATE_ISSUING else "renew"
+    task_key = f"ssl-{action}:{provisioning.pk}:{uuid.uuid4().hex}"
+    if not transition(provisioning, to_state, task_key=task_key, task_started_at=None):
+        return False
+
+    task = issue_ssl_certificate if action == "issue" else renew_ssl_certificate
+    try:
+        task.apply_async(args=[provisioning.pk, task_key], task_id=task_key)
+    except Exception as e:
+        # Broker indisponível: desfaz a transição, o próximo ciclo tenta de novo
+        logger.error(f"❌ Erro ao agendar {action} do certificado de {provisioning.domain}: {e}")
+        previous = DomainProvisioning.STATE_DNS_OK if action == "issue" else DomainProvisioning.STATE_ACTIVE
+        DomainProvisioning.objects.filter(pk=provisioning.pk, task_key=task_key, state=to_state).update(
+            state=previous, state_changed_at=timezone.now(), task_key=None
+        )
+        return False
+
+    if action == "issue":
+        _update_site(provisioning, ssl_status="generating", ssl_error=None)
+    return True
+
+
+def schedule_issuances(now: datetime | None = None) -> int:
+    """Agenda a emissão do certificado dos domínios com DNS ok (uma tarefa por domínio)"""
+    now = now or timezone.now()
+    ready = DomainProvisioning.objects.filter(state=DomainProvisioning.STATE_DNS_OK).filter(_due(now))
+    scheduled = 0
+    for provisioning in ready.order_by("next_attempt_at", "pk")[: settings.DNS_CHECK_BATCH_SIZE]:
+        scheduled += _schedule_certificate_task(provisioning, DomainProvisioning.STATE_ISSUING)
+    return scheduled
+
+
+def schedule_renewals(now: datetime | None = None) -> int:
+    """
+    Agenda a renovação dos certificados que vencem em até SSL_RENEW_BEFORE_DAYS dias.
+
+    Domínios ativos sem vencimento conhecido (importados pela migration) também são
+    agendados: o certbot só renova se estiver no prazo, e a conclusão grava o vencimento lido.
+    """
+    now = now or timezone.now()
+    renew_before = now + timedelta(days=settings.SSL_RENEW_BEFORE_DAYS)
+    expiring = (
+        DomainProvisioning.objects.filter(state=DomainProvisioning.STATE_ACTIVE)
+        .filter(Q(certificate_expires_at__isnull=True) | Q(certificate_expires_at__lte=renew_before))
+        .filter(_due(now))
+    )
+    scheduled = 0
+    for provisioning in expiring.order_by(F("certificate_expires_at").asc(nulls_first=True), "pk")[
+        : settings.DNS_CHECK_BATCH_SIZE
+    ]:
+        scheduled += _schedule_certificate_task(provisioning, DomainProvisioning.STATE_RENEWING)
+    return scheduled
+
+
+def recover_stalled_tasks(now: datetime | None = None) -> int:
+    """Emissões/renovações sem resposta após SSL_TASK_TIMEOUT voltam a ser agendáveis (contam como falha)"""
+    now = now or timezone.now()
+    stalled = DomainProvisioning.objects.filter(
+        state__in=[DomainProvisioning.STATE_ISSUING, DomainProvisioning.STATE_RENEWING],
+        state_changed_at__lt=now - timedelta(seconds=settings.SSL_TASK_TIMEOUT),
+    )
+    recovered = 0
+    for provisioning in stalled:
+        recovered += _finish_certificate_task(
+            provisioning, provisioning.task_key, False, "Tempo esgotado aguardando o certbot", now
+        )
+    return recovered
+
+
+def _finish_certificate_task(
+    provisioning: DomainProvisioning, task_key: str | None, success: bool, message: str, now: datetime
+) -> bool:
+    """Conclui a emissão/renovação: active em caso de sucesso; senão volta com backoff"""
+    from .ssl_manager import ssl_manager
+
+    issuing = provisioning.state == DomainProvisioning.STATE_ISSUING
+    if success:
+        expires_at = ssl_manager.get_certificate_expiry(provisioning.domain) or now + CERTIFICATE_LIFETIME
+        next_attempt_at = None
+        if expires_at <= now + timedelta(days=settings.SSL_RENEW_BEFORE_DAYS):
+            # O certbot ainda não renovou (fora da janela dele): não reagenda a cada ciclo
+            next_attempt_at = now + timedelta(seconds=settings.SSL_ISSUE_BACKOFF_MAX)
+        finished = transition(
+            provisioning,
+            DomainProvisioning.STATE_ACTIVE,
+            expected_key=task_key,
+            attempts=0,
+            next_attempt_at=next_attempt_at,
+            last_error=None,
+            task_key=None,
+            task_started_at=None,
+            certificate_expires_at=expires_at,
+        )
+        if finished:
+            _update_site(provisioning, ssl_status="active", ssl_error=None)
+        return finished
+
+    attempts = provisioning.attempts + 1
+    next_state = DomainProvisioning.STATE_DNS_OK if issuing else DomainProvisioning.STATE_ACTIVE
+    finished = transition(
+        provisioning,
+        next_state,
+        expected_key=task_key,
+        attempts=attempts,
+        next_attempt_at=now + backoff_delay(attempts, settings.SSL_ISSUE_BACKOFF_BASE, settings.SSL_ISSUE_BACKOFF_MAX),
+        last_error=message[:500],
+        task_key=None,
+        task_started_at=None,
+    )
+    if finished:
+        # Renovação com erro: o certificado atual continua valendo até vencer
+        _update_site(provisioning, ssl_status="error" if issuing else "active", ssl_error=message[:500])
+    return finished
+
+
+def run_certificate_task(provisioning_id: int, task_key: str) -> dict:
+    """
+    Executa a emissão/renovação agendada com a chave `task_key` (no máximo uma vez).
+
+    Returns:
+        Dict com success e message
+    """
+    from .ssl_manager import ssl_manager
+
+    now = timezone.now()
+    # Reivindica a tarefa: só uma entrega com a chave atual passa daqui
+    claimed = DomainProvisioning.objects.filter(
+        pk=provisioning_id,
+        task_key=task_key,
+        task_started_at__isnull=True,
+        state__in=[DomainProvisioning.STATE_ISSUING, DomainProvisioning.STATE_RENEWING],
+    ).update(task_started_at=now)
+    if not claimed:
+        logger.info(f"Tarefa {task_key} ignorada: já executada, substituída ou domínio alterado")
+        return {"success": False, "message": "Tarefa já executada ou obsoleta"}
+
+    provisioning = DomainProvisioning.objects.select_related("site__owner").get(pk=provisioning_id)
+    domain = provisioning.domain
+
+    lock_key = _certbot_lock_key(domain)
+    if not cache.add(lock_key, task_key, timeout=CERTBOT_LOCK_TIMEOUT):
+        message = f"Certbot já em execução para {domain}"
+        logger.warning(f"⚠️ {message}")
+        _finish_certificate_task(provisioning, task_key, False, message, now)
+        return {"success": False, "message": message}
+
+    try:
+        if provisioning.state == DomainProvisioning.STATE_ISSUING:
+            email = provisioning.site.owner.email or settings.DEFAULT_FROM_EMAIL
+            success, message = ssl_manager.generate_certificate(domain, email)
+        else:
+            success, message = ssl_manager.renew_certificate(domain)
+    except Exception as e:
+        success, message = False, f"Erro inesperado: {str(e)}"
+    finally:
+        if cache.get(lock_key) == task_key:
+            cache.delete(lock_key)
+
+    issued = provisioning.state == DomainProvisioning.STATE_ISSUING
+    if not _finish_certificate_task(provisioning, task_key, success, message, timezone.now()):
+        # Domínio alterado ou tarefa dada como perdida enquanto o certbot rodava
+        return {"success": False, "message": "Domínio alterado durante a execução"}
+
+    if success and issued:
+        mail_admins(
+            f"SSL Gerado: {domain}",
+            f"Certificado SSL gerado com sucesso para {domain}\n\n"
+            f"Landing Page: {provisioning.site.business_name}\n"
+            f"Proprietário: {provisioning.site.owner.email}",
+        )
+    return {"success": success, "message": message}
+
+
+def advance_domains(resolver: Resolver | None = None) -> dict[str, int]:
+    """
+    Um ciclo do agendador: sincroniza, verifica o DNS, agenda emissões e renovações.
+
+    Raises:
+        DNSLookupError: não foi possível resolver o domínio base (as etapas de SSL já rodaram)
+    """
+    now = timezone.now()
+    summary = {
+        "synced": sync_missing_domains(settings.DNS_CHECK_BATCH_SIZE),
+        "recovered": recover_stalled_tasks(now),
+        "renewals": schedule_renewals(now),
+        # Domínios que ficarem ok na verificação abaixo esperam ISSUE_DELAY: entram em um próximo ciclo
+        "issuances": schedule_issuances(now),
+    }
+    summary.update(check_pending_domains(resolver, now=now))
+    return summary
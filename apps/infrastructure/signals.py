@@ -0,0 +1,19 @@
+"""
+Signals do app Infrastructure
+Inicia (ou reinicia) o provisionamento quando o domínio personalizado de um site muda
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .provisioning import sync_site_domain
+
+
+@receiver(post_save, sender="landings.Site")
+def sync_domain_provisioning_on_site_save(sender, instance, created, **kwargs):
+    """Domínio novo/alterado/removido volta para pending (a flag vem do pre_save do app landings)"""
+    if (created and instance.custom_domain) or getattr(instance, "_custom_domain_changed", False):
+        transaction.on_commit(partial(sync_site_domain, instance.pk))
@@ -5,6 +5,7 @@ Gera e renova certificados Let's Encrypt automaticamente
 
 import logging
 import subprocess
+from datetime import UTC, datetime
 from pathlib import Path
 
 from django.conf import settings
@@ -145,36 +146,6 @@ class SSLManager:
             logger.error(f"❌ Exceção ao renovar certificado de {domain}: {str(e)}")
             return False, f"Erro inesperado: {str(e)}"
 
-    def renew_all_certificates(self) -> tuple[int, int]:
-        """
-        Renova todos os certificados que estão próximos do vencimento
-
-        Returns:
-            (total_renovados, total_erros)
-        """
-        try:
-            cmd = [self.certbot_path, "renew", "--deploy-hook", "nginx -s reload"]
-
-            logger.info("Renovando todos os certificados...")
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minutos para renovar todos
-            )
-
-            # Analisar resultado
-            output = result.stdout
-            renewed = output.count("Successfully renewed")
-
-            logger.info(f"✅ Renovação concluída: {renewed} certificados renovados")
-            return renewed, 0
-
-        except Exception as e:
-            logger.error(f"❌ Erro ao renovar certificados: {str(e)}")
-            return 0, 1
-
     def delete_certificate(self, domain: str) -> tuple[bool, str]:
         """
         Remove certificado de um domínio
@@ -207,6 +178,30 @@ class SSLManager:
             logger.error(f"❌ Exceção ao remover certificado de {domain}: {str(e)}")
             return False, f"Erro inesperado: {str(e)}"
 
+    def get_certificate_expiry(self, domain: str) -> datetime | None:
+        """
+        Data de vencimento do certificado de um domínio (lida do arquivo com openssl)
+
+        Args:
+            domain: Domínio do certificado
+
+        Returns:
+            Vencimento (UTC) ou None se não há certificado ou não foi possível ler
+        """
+        cert_path = Path(self.ssl_path) / domain / "fullchain.pem"
+        if not cert_path.exists():
+            return None
+
+        try:
+            cmd = ["openssl", "x509", "-enddate", "-noout", "-in", str(cert_path)]
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            # Saída: notAfter=Jan  1 00:00:00 2026 GMT
+            value = result.stdout.strip().partition("=")[2]
+            return datetime.strptime(" ".join(value.split()), "%b %d %H:%M:%S %Y %Z").replace(tzinfo=UTC)
+        except Exception as e:
+            logger.error(f"❌ Erro ao ler vencimento do certificado de {domain}: {str(e)}")
+            return None
+
     def get_certificate_info(self, domain: str) -> dict:
         """
         Obtém informações sobre o certificado de um domínio
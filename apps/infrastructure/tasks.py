@@ -5,168 +5,122 @@ Tarefas assíncronas do Celery para Sites
 import logging
 
 from celery import shared_task
-from django.core.mail import mail_admins
 
 logger = logging.getLogger(__name__)
 
 
-@shared_task(bind=True, max_retries=3)
-def generate_ssl_certificate(self, site_id: int, domain: str, email: str):
+@shared_task
+def provision_custom_domains():
     """
-    Gera certificado SSL para um domínio personalizado
+    Agendador único do provisionamento dos domínios personalizados: verifica o
+    DNS dos pendentes (em paralelo, com backoff por domínio) e agenda emissões e
+    renovações de certificado (uma tarefa por domínio, com chave de idempotência).
 
-    Args:
-        site_id: ID do site
-        domain: Domínio para gerar certificado
-        email: Email para notificações
+    Deve ser agendada periodicamente (ex: 1x por minuto) no Celery Beat.
     """
-    from apps.infrastructure.ssl_manager import ssl_manager
-    from apps.landings.models import Site
+    from apps.infrastructure.dns_check import DNSLookupError
+    from apps.infrastructure.provisioning import advance_domains
 
     try:
-        logger.info(f"Gerando certificado SSL para {domain}...")
-
-        # Buscar site
-        site = Site.objects.get(id=site_id)
-
-        # Atualizar status
-        site.ssl_status = "generating"
-        site.save(update_fields=["ssl_status"])
-
-        # Gerar certificado
-        success, message = ssl_manager.generate_certificate(domain, email)
-
-        if success:
-            # Sucesso!
-            logger.info(f"✅ Certificado gerado para {domain}")
-            site.ssl_status = "active"
-            site.ssl_error = None
-            site.save(update_fields=["ssl_status", "ssl_error"])
-
-            # Notificar administradores
-            mail_admins(
-                f"SSL Gerado: {domain}",
-                f"Certificado SSL gerado com sucesso para {domain}\n\n"
-                f"Landing Page: {site.business_name}\n"
-                f"Proprietário: {site.owner.email}",
-            )
-
-            return {"success": True, "message": message}
-        else:
-            # Erro
-            logger.error(f"❌ Erro ao gerar certificado para {domain}: {message}")
-            site.ssl_status = "error"
-            site.ssl_error = message[:500]  # Limitar tamanho
-            site.save(update_fields=["ssl_status", "ssl_error"])
-
-            # Tentar novamente (max 3 vezes)
-            raise self.retry(exc=Exception(message), countdown=300)  # Retry em 5 minutos
-
-    except Site.DoesNotExist:
-        logger.error(f"Landing page {site_id} não encontrada")
-        return {"success": False, "message": "Landing page não encontrada"}
+        summary = advance_domains()
+    except DNSLookupError as e:
+        # Sem os destinos esperados não há como verificar o DNS: tenta no próximo ciclo
+        logger.error(f"❌ Verificação de DNS cancelada: {e}")
+        return {"error": str(e)}
 
-    except Exception as e:
-        logger.error(f"Erro inesperado ao gerar certificado: {str(e)}")
-
-        # Atualizar status de erro
-        try:
-            site = Site.objects.get(id=site_id)
-            site.ssl_status = "error"
-            site.ssl_error = str(e)[:500]
-            site.save(update_fields=["ssl_status", "ssl_error"])
-        except:
-            pass
-
-        raise
+    if any(summary.values()):
+        logger.info(f"🌐 Provisionamento de domínios: {summary}")
+    return summary
 
 
 @shared_task
-def renew_ssl_certificates():
+def issue_ssl_certificate(provisioning_id: int, task_key: str):
     """
-    Renova todos os certificados SSL que estão próximos do vencimento
-    Deve ser executado diariamente via Celery Beat
+    Emite o certificado SSL de um domínio personalizado (agendada por provision_custom_domains)
+
+    Args:
+        provisioning_id: ID do DomainProvisioning
+        task_key: Chave de idempotência gravada ao agendar (também o id da tarefa)
     """
-    from apps.landings.ssl_manager import ssl_manager
+    from apps.infrastructure.provisioning import run_certificate_task
 
-    logger.info("Iniciando renovação automática de certificados SSL...")
+    return run_certificate_task(provisioning_id, task_key)
 
-    try:
-        renewed, errors = ssl_manager.renew_all_certificates()
 
-        logger.info(f"✅ Renovação concluída: {renewed} renovados, {errors} erros")
+@shared_task
+def renew_ssl_certificate(provisioning_id: int, task_key: str):
+    """
+    Renova o certificado SSL de um domínio personalizado (agendada por provision_custom_domains)
 
-        # Notificar administradores se houver renovações
-        if renewed > 0:
-            mail_admins("Certificados SSL Renovados", f"{renewed} certificado(s) SSL foram renovados automaticamente.")
+    Args:
+        provisioning_id: ID do DomainProvisioning
+        task_key: Chave de idempotência gravada ao agendar (também o id da tarefa)
+    """
+    from apps.infrastructure.provisioning import run_certificate_task
 
-        return {"renewed": renewed, "errors": errors}
+    return run_certificate_task(provisioning_id, task_key)
 
-    except Exception as e:
-        logger.error(f"❌ Erro ao renovar certificados: {str(e)}")
 
-        # Notificar administradores sobre erro
-        mail_admins("Erro na Renovação de Certificados SSL", f"Erro ao renovar certificados SSL:\n\n{str(e)}")
+@shared_task
+def renew_ssl_certificates():
+    """
+    Agenda a renovação dos certificados SSL que estão próximos do vencimento
 
-        raise
+    A renovação é feita por domínio pelo provision_custom_domains; esta tarefa
+    apenas antecipa o agendamento (mantida para agendamentos diários existentes).
+    """
+    from apps.infrastructure.provisioning import schedule_renewals
+
+    scheduled = schedule_renewals()
+    logger.info(f"🔄 {scheduled} renovação(ões) de certificado agendada(s)")
+    return {"scheduled": scheduled}
 
 
 @shared_task
 def check_custom_domain_dns(site_id: int, domain: str):
     """
-    Verifica se o DNS do domínio personalizado está configurado corretamente
+    Verifica agora o DNS do domínio personalizado de um site (verificação manual)
+
+    O resultado também fica no cache para o painel, que consulta o andamento
+    (apps.infrastructure.provisioning.get_manual_dns_check).
 
     Args:
         site_id: ID da landing page
         domain: Domínio para verificar
     """
-    import socket
-
-    from apps.landings.models import Site
+    from apps.infrastructure.provisioning import finish_manual_dns_check
 
     try:
-        logger.info(f"Verificando DNS para {domain}...")
-
-        site = Site.objects.get(id=site_id)
-
-        # Resolver DNS
-        try:
-            ip_address = socket.gethostbyname(domain)
-            logger.info(f"DNS de {domain} aponta para {ip_address}")
-
-            # Verificar se aponta para o servidor correto
-            # (Aqui você pode adicionar lógica para verificar se é o IP esperado)
-
-            site.dns_status = "ok"
-            site.dns_error = None
-            site.save(update_fields=["dns_status", "dns_error"])
-
-            # Se DNS está OK, agendar geração de SSL (se ainda não foi gerado)
-            if site.ssl_status == "none" or site.ssl_status == "error":
-                from django.conf import settings
+        result = _check_custom_domain_dns(site_id, domain)
+    except Exception:
+        finish_manual_dns_check(site_id, {"success": False, "message": "Erro ao verificar DNS"})
+        raise
+    finish_manual_dns_check(site_id, result)
+    return result
 
-                logger.info(f"🔐 DNS OK para {domain}, agendando geração de SSL...")
-                generate_ssl_certificate.apply_async(
-                    args=[site.id, domain, site.owner.email or settings.DEFAULT_FROM_EMAIL],
-                    countdown=60,  # 1 minuto após DNS estar OK
-                )
 
-            return {"success": True, "ip": ip_address}
+def _check_custom_domain_dns(site_id: int, domain: str) -> dict:
+    from apps.infrastructure.dns_check import DNSLookupError
+    from apps.infrastructure.provisioning import check_site_domain_now
+    from apps.landings.models import Site
 
-        except socket.gaierror:
-            error_msg = "DNS não configurado ou não propagado ainda"
-            logger.warning(f"⚠️ {error_msg} para {domain}")
+    if not Site.objects.filter(id=site_id, custom_domain=domain).exists():
+        logger.error(f"Landing page {site_id} com domínio {domain} não encontrada")
+        return {"success": False, "message": "Landing page não encontrada"}
 
-            site.dns_status = "error"
-            site.dns_error = error_msg
-            site.save(update_fields=["dns_status", "dns_error"])
+    logger.info(f"Verificando DNS para {domain}...")
+    try:
+        result = check_site_domain_now(site_id)
+    except DNSLookupError as e:
+        logger.error(f"Erro ao verificar DNS: {e}")
+        return {"success": False, "message": str(e)}
 
-            return {"success": False, "message": error_msg}
+    if result is None:
+        return {"success": False, "message": "Landing page sem domínio personalizado"}
 
-    except Site.DoesNotExist:
-        logger.error(f"Landing page {site_id} não encontrada")
-        return {"success": False, "message": "Landing page não encontrada"}
+    if result.ok:
+        logger.info(f"DNS de {domain} aponta para {', '.join(result.addresses) or result.canonical_name}")
+        return {"success": True, "ip": result.addresses[0] if result.addresses else ""}
 
-    except Exception as e:
-        logger.error(f"Erro ao verificar DNS: {str(e)}")
-        raise
+    logger.warning(f"⚠️ {result.message} para {domain}")
+    return {"success": False, "message": result.message}
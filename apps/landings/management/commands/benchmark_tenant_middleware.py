@@ -0,0 +1,96 @@
+"""
+Microbenchmark do TenantMiddleware.
+
+Mede o custo por requisição de process_request (tempo e queries) em cenários
+típicos: host do sistema, subdomínio, domínio personalizado, host desconhecido
+e URL administrativa bloqueada. Os dados de teste são criados dentro de uma
+transação que é desfeita ao final (não altera o banco).
+
+Uso:
+    python manage.py benchmark_tenant_middleware
+    python manage.py benchmark_tenant_middleware --iterations 5000
+    python manage.py benchmark_tenant_middleware --cold   # sem cache (sempre vai ao banco)
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from apps.core.models import User
+from apps.landings.middleware import TenantMiddleware
+from apps.landings.models import Site
+from apps.landings.tenant_cache import tenant_cache
+
+
+class _Rollback(Exception):
+    """Usada para desfazer a transação do benchmark"""
+
+
+class Command(BaseCommand):
+    help = "Mede o overhead por requisição do TenantMiddleware"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000, help="Requisições por cenário")
+        parser.add_argument(
+            "--cold", action="store_true", help="Limpa o cache de tenant antes de cada requisição (mede o banco)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options["iterations"], options["cold"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, iterations: int, cold: bool):
+        base_domain = getattr(settings, "BASE_DOMAIN", "propzy.com.br")
+
+        owner = User.objects.create_user("benchmark-tenant@propzy.local", None)
+        site = Site.objects.create(
+            owner=owner, subdomain="benchmark-tenant", business_name="Benchmark", email=owner.email
+        )
+        # update() não dispara signals (evita agendar tarefas de DNS/SSL)
+        Site.objects.filter(pk=site.pk).update(custom_domain="www.benchmark-tenant.com.br")
+
+        scenarios = [
+            ("host do sistema", base_domain, "/"),
+            ("subdomínio", f"benchmark-tenant.{base_domain}", "/"),
+            ("domínio personalizado", "www.benchmark-tenant.com.br", "/imoveis/"),
+            ("subdomínio desconhecido", f"nao-existe.{base_domain}", "/"),
+            ("domínio desconhecido", "www.nao-existe.com.br", "/"),
+            ("URL bloqueada", f"benchmark-tenant.{base_domain}", "/admin-panel/"),
+        ]
+
+        middleware = TenantMiddleware(lambda request: None)
+        factory = RequestFactory()
+        tenant_cache.local.clear()
+
+        mode = "frio (sem cache)" if cold else "quente (com cache)"
+        self.stdout.write(self.style.SUCCESS(f"\n⏱️  TenantMiddleware - {iterations} requisições por cenário - {mode}\n"))
+
+        for label, host, path in scenarios:
+            requests = [factory.get(path, HTTP_HOST=host) for _ in range(iterations)]
+            hosts = {host}
+            tenant_cache.invalidate_hosts(hosts)
+
+            elapsed = 0.0
+            with CaptureQueriesContext(connection) as queries:
+                for request in requests:
+                    if cold:
+                        tenant_cache.invalidate_hosts(hosts)
+                    start = time.perf_counter()
+                    middleware.process_request(request)
+                    elapsed += time.perf_counter() - start
+
+            per_request_us = elapsed / iterations * 1_000_000
+            queries_per_request = len(queries) / iterations
+            self.stdout.write(
+                f"  • {label:<24} {per_request_us:>9.1f} µs/req   {queries_per_request:>5.2f} queries/req"
+            )
+
+        self.stdout.write("")
@@ -0,0 +1,43 @@
+"""
+Comando Django para gerar as folhas de estilos (cores do design) dos sites.
+
+As folhas são geradas automaticamente quando o design é salvo; o comando serve
+para os sites existentes antes da funcionalidade e para regerar após mudanças
+no formato do CSS. Sites sem folha gerada continuam com as cores inline.
+
+Uso:
+    python manage.py compile_site_stylesheets                  # Todos os sites
+    python manage.py compile_site_stylesheets --site fulano    # Site específico (subdomínio)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.landings.models import Site
+from apps.landings.stylesheets import compile_site_stylesheet
+
+
+class Command(BaseCommand):
+    """Comando para gerar as folhas de estilos dos sites"""
+
+    help = "Gera a folha de estilos (variáveis de cor do design) de cada site"
+
+    def add_arguments(self, parser):
+        """Adiciona argumentos ao comando"""
+        parser.add_argument("--site", type=str, help="Subdomínio do site (padrão: todos)")
+
+    def handle(self, *args, **options):
+        """Executa o comando"""
+        sites = Site.objects.order_by("pk")
+        if options.get("site"):
+            sites = sites.filter(subdomain=options["site"])
+            if not sites.exists():
+                raise CommandError(f"Site não encontrado: {options['site']}")
+
+        count = 0
+        for site_id in sites.values_list("pk", flat=True).iterator():
+            name = compile_site_stylesheet(site_id)
+            if name:
+                count += 1
+                self.stdout.write(f"  ✅ {site_id}: {name}")
+
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {count} folha(s) de estilos gerada(s)\n"))
@@ -96,12 +96,14 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f"❌ {message}"))
 
     def renew_all_certificates(self):
-        """Renova todos os certificados"""
-        self.stdout.write("🔄 Renovando todos os certificados...")
+        """Agenda a renovação dos certificados próximos do vencimento (uma tarefa por domínio)"""
+        from apps.infrastructure.provisioning import schedule_renewals
 
-        renewed, errors = ssl_manager.renew_all_certificates()
+        self.stdout.write("🔄 Agendando a renovação dos certificados...")
 
-        self.stdout.write(self.style.SUCCESS(f"✅ Renovação concluída: {renewed} renovados, {errors} erros"))
+        scheduled = schedule_renewals()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {scheduled} renovação(ões) agendada(s)"))
 
     def check_certificate(self, domain):
         """Verifica status do certificado de um domínio"""
@@ -8,15 +8,91 @@ SEGURANÇA: Domínios não registrados no sistema retornam 404, mesmo com ALLOWE
 """
 
 import logging
+import re
 
 from django.conf import settings
+from django.db.models import Q
 from django.http import Http404, HttpResponseRedirect
 from django.utils.deprecation import MiddlewareMixin
 
 from .models import Site
+from .tenant_cache import tenant_cache
 
 logger = logging.getLogger(__name__)
 
+# Padrões pré-compilados (compilados uma única vez no carregamento do módulo)
+# RFC 1123: hostname = (dominio\.)+tld - letras, números, hífens e pontos apenas
+HOSTNAME_RE = re.compile(r"([a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?\.)*[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?")
+# Subdomínio: letras, números, hífens (não no início/fim)
+SUBDOMAIN_RE = re.compile(r"[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?")
+
+# Subdomínios reservados do sistema (nunca são sites)
+SYSTEM_SUBDOMAINS = frozenset({"www", "app", "api", "admin"})
+
+# URLs administrativas bloqueadas em sites (devem ser acessadas no domínio principal)
+BLOCKED_PATHS = (
+    "/admin-panel/",
+    "/landings/dashboard/",
+    "/properties/",
+    "/accounts/",  # Bloqueia login em subdomínios - deve ser feito no domínio principal
+)
+
+
+class TenantResolver:
+    """
+    Estrutura pré-calculada para resolver host -> Site.
+
+    Montada uma única vez por worker (no __init__ do middleware), evitando
+    reconstruir listas de hosts e caminhos a cada requisição.
+    """
+
+    def __init__(self, base_domain: str, urlconf: str):
+        self.base_domain = base_domain
+        self.urlconf = urlconf
+        self.subdomain_suffix = f".{base_domain}"
+        # Hosts que NÃO são sites (são do sistema principal)
+        self.system_hosts = frozenset(
+            {
+                base_domain,
+                f"www.{base_domain}",
+                f"app.{base_domain}",
+                "localhost",
+                "127.0.0.1",
+            }
+        )
+
+    def get_subdomain(self, host: str) -> str | None:
+        """Retorna o subdomínio se o host for do domínio base (ex: fulano.propzy.com.br -> fulano)"""
+        if host.endswith(self.subdomain_suffix):
+            return host[: -len(self.subdomain_suffix)]
+        return None
+
+    def load_site(self, host: str, subdomain: str | None) -> Site | None:
+        """
+        Busca no banco o site ativo do host com uma única query.
+
+        Precedência determinística: domínio personalizado vence subdomínio.
+        SEGURANÇA: Django ORM usa prepared statements, protegido contra SQL injection.
+        """
+        lookup = Q(custom_domain=host)
+        if subdomain is not None:
+            lookup |= Q(subdomain=subdomain)
+
+        # Ambos os campos são únicos: no máximo 2 linhas (uma por critério).
+        # Sem o owner: o Site fica serializado no cache (Redis e LRU local) e as páginas públicas não usam o usuário
+        sites = list(Site.objects.select_related("theme").filter(lookup, is_active=True)[:2])
+        if not sites:
+            return None
+        for site in sites:
+            if site.custom_domain == host:
+                return site
+        return sites[0]
+
+    def redirect_to_base(self, request) -> HttpResponseRedirect:
+        """Redireciona a requisição para o domínio principal, preservando o caminho"""
+        scheme = "https" if request.is_secure() else "http"
+        return HttpResponseRedirect(f"{scheme}://{self.base_domain}{request.path}")
+
 
 class TenantMiddleware(MiddlewareMixin):
     """
@@ -27,6 +103,12 @@ class TenantMiddleware(MiddlewareMixin):
     - request.tenant: O Site correspondente ou None
     - request.is_site: Boolean indicando se é uma requisição de site
 
+    PERFORMANCE:
+    - A resolução host -> Site passa pelo tenant_cache (LRU local + Redis)
+    - Hosts desconhecidos ficam em cache negativo por alguns segundos
+    - Em cache miss, uma única query resolve domínio personalizado e subdomínio
+    - Regex, hosts do sistema e caminhos bloqueados são pré-calculados
+
     SEGURANÇA:
     - Domínios não registrados no sistema retornam 404
     - Previne acesso não autorizado mesmo com ALLOWED_HOSTS='*'
@@ -36,6 +118,13 @@ class TenantMiddleware(MiddlewareMixin):
     - Loga tentativas de acesso a domínios não registrados
     """
 
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.resolver = TenantResolver(
+            getattr(settings, "BASE_DOMAIN", "propzy.com.br"),
+            getattr(settings, "TENANT_URLCONF", settings.ROOT_URLCONF),
+        )
+
     @staticmethod
     def _is_valid_hostname(hostname: str) -> bool:
         """
@@ -47,34 +136,22 @@ class TenantMiddleware(MiddlewareMixin):
         - Previne SQL injection via hostname
         - Valida formato RFC 1123
         """
-        import re
-
         # Tamanho máximo de hostname (RFC 1123)
         if len(hostname) > 253:
             return False
 
-        # Previne CRLF injection
-        if "\r" in hostname or "\n" in hostname or "\x00" in hostname:
-            return False
-
         # Previne Unicode tricks (apenas ASCII)
-        try:
-            hostname.encode("ascii")
-        except UnicodeEncodeError:
+        if not hostname.isascii():
             return False
 
-        # Valida formato: letras, números, hífens e pontos apenas
-        # RFC 1123: hostname = (dominio\.)+tld
-        pattern = r"^([a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?\.)*[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?$"
-        if not re.match(pattern, hostname):
+        # Valida formato (fullmatch também rejeita CRLF e \x00)
+        if not HOSTNAME_RE.fullmatch(hostname):
             return False
 
         # Previne hostname que é apenas números (pode ser IP)
         if hostname.replace(".", "").isdigit():
             # Permite apenas se for localhost/127.0.0.1
-            if hostname in ("127.0.0.1", "localhost"):
-                return True
-            return False
+            return hostname in ("127.0.0.1", "localhost")
 
         return True
 
@@ -88,20 +165,9 @@ class TenantMiddleware(MiddlewareMixin):
         - Máximo 63 caracteres (RFC 1123)
         - Não pode começar ou terminar com hífen
         """
-        import re
-
-        if not subdomain or len(subdomain) > 63:
-            return False
-
-        # Apenas ASCII
-        try:
-            subdomain.encode("ascii")
-        except UnicodeEncodeError:
+        if not subdomain or len(subdomain) > 63 or not subdomain.isascii():
             return False
-
-        # Padrão: letras, números, hífens (não no início/fim)
-        pattern = r"^[a-z0-9]([a-z0-9\-]{0,61}[a-z0-9])?$"
-        return bool(re.match(pattern, subdomain))
+        return SUBDOMAIN_RE.fullmatch(subdomain) is not None
 
     def process_request(self, request):
         """Processa a requisição para detectar o tenant e validar segurança"""
@@ -118,117 +184,49 @@ class TenantMiddleware(MiddlewareMixin):
 
         except Exception as e:
             logger.error(f"Erro ao processar host: {e}")
-            raise Http404("Host inválido")
+            raise Http404("Host inválido") from None
 
         # Inicializa o tenant como None
         request.tenant = None
         request.is_site = False
 
-        # Pega o domínio base configurado
-        base_domain = getattr(settings, "BASE_DOMAIN", "propzy.com.br")
-
-        # Lista de hosts que NÃO são sites (são do sistema principal)
-        system_hosts = [
-            base_domain,
-            f"www.{base_domain}",
-            f"app.{base_domain}",
-            "localhost",
-            "127.0.0.1",
-        ]
+        resolver = self.resolver
 
         # Se for um host do sistema, não é site - permite acesso
-        if host in system_hosts:
+        if host in resolver.system_hosts:
             return
 
-        # PRIMEIRO: Tenta encontrar por domínio personalizado
-        # SEGURANÇA: Django ORM usa prepared statements, protegido contra SQL injection
-        try:
-            site = Site.objects.select_related("owner", "theme").get(
-                custom_domain=host,  # Django ORM sanitiza automaticamente
-                is_active=True,
-            )
-            request.tenant = site
-            request.is_site = True
-            logger.info(f"Tenant encontrado: {host} -> Site ID {site.id}")
-
-            # DEPOIS de detectar o tenant, verifica se é URL administrativa
-            path = request.path.lower()
-            blocked_paths = [
-                "/admin-panel/",
-                "/landings/dashboard/",
-                "/properties/",
-                "/accounts/",  # Bloqueia login em subdomínios - deve ser feito no domínio principal
-            ]
-
-            # Se for uma URL bloqueada em um site válido, redireciona para o domínio principal
-            if any(path.startswith(blocked_path) for blocked_path in blocked_paths):
-                scheme = 'https' if request.is_secure() else 'http'
-                redirect_url = f"{scheme}://{base_domain}{request.path}"
-                logger.info(f"Bloqueando acesso administrativo/autenticação em site: {host}{path} -> redirecionando para {redirect_url}")
-                return HttpResponseRedirect(redirect_url)
-
-            # Se não for URL administrativa, permite acesso (é página pública do site)
-            return
-        except Site.DoesNotExist:
-            pass
-        except Site.MultipleObjectsReturned:
-            # SEGURANÇA: Se houver duplicatas, loga e retorna 404
-            logger.error(f"Múltiplos sites encontrados para: {host}")
-            raise Http404("Configuração inválida")
-
-        # SEGUNDO: Tenta encontrar por subdomínio
-        if host.endswith(f".{base_domain}"):
-            subdomain = host.replace(f".{base_domain}", "")
-
+        # Subdomínio do domínio base (ex: fulano.propzy.com.br)
+        subdomain = resolver.get_subdomain(host)
+        if subdomain is not None:
             # Ignora subdomínios do sistema - permite acesso
-            if subdomain in ["www", "app", "api", "admin"]:
+            if subdomain in SYSTEM_SUBDOMAINS:
                 return
 
-            try:
-                # SEGURANÇA: Valida subdomain antes de query
-                if not self._is_valid_subdomain(subdomain):
-                    logger.warning(f"Subdomínio inválido: {repr(subdomain)}")
-                    raise Http404("Subdomínio inválido")
-
-                site = Site.objects.select_related("owner", "theme").get(
-                    subdomain=subdomain,  # Django ORM sanitiza automaticamente
-                    is_active=True,
-                )
-                request.tenant = site
-                request.is_site = True
-                logger.info(f"Tenant encontrado: {subdomain}.{base_domain} -> Site ID {site.id}")
-
-                # DEPOIS de detectar o tenant, verifica se é URL administrativa
-                path = request.path.lower()
-                blocked_paths = [
-                    "/admin-panel/",
-                    "/landings/dashboard/",
-                    "/properties/",
-                    "/accounts/",  # Bloqueia login em subdomínios - deve ser feito no domínio principal
-                ]
-
-                # Se for uma URL bloqueada em um site válido, redireciona para o domínio principal
-                if any(path.startswith(blocked_path) for blocked_path in blocked_paths):
-                    scheme = 'https' if request.is_secure() else 'http'
-                    redirect_url = f"{scheme}://{base_domain}{request.path}"
-                    logger.info(f"Bloqueando acesso administrativo/autenticação em subdomínio: {host}{path} -> redirecionando para {redirect_url}")
-                    return HttpResponseRedirect(redirect_url)
-
-                # Se não for URL administrativa, permite acesso (é página pública do site)
-                return
-            except Site.DoesNotExist:
-                # Subdomínio não encontrado - redireciona para o site principal
-                logger.info(f"Subdomínio não encontrado: {subdomain}.{base_domain} - redirecionando para {base_domain}")
-                scheme = 'https' if request.is_secure() else 'http'
-                redirect_url = f"{scheme}://{base_domain}{request.path}"
-                return HttpResponseRedirect(redirect_url)
-            except Site.MultipleObjectsReturned:
-                logger.error(f"Múltiplos sites encontrados para subdomínio: {subdomain}")
-                raise Http404("Configuração inválida")
-
-        # SEGURANÇA: Se chegou aqui, é um domínio não registrado
-        # Redireciona para o site principal em vez de retornar 404
-        logger.info(f"Domínio não registrado: {host} - redirecionando para {base_domain}")
-        scheme = 'https' if request.is_secure() else 'http'
-        redirect_url = f"{scheme}://{base_domain}{request.path}"
-        return HttpResponseRedirect(redirect_url)
+            # SEGURANÇA: Valida subdomain antes de qualquer query
+            if not self._is_valid_subdomain(subdomain):
+                logger.warning(f"Subdomínio inválido: {repr(subdomain)}")
+                raise Http404("Subdomínio inválido")
+
+        # Resolve host -> Site (LRU local -> Redis -> banco)
+        site = tenant_cache.get_site(host, lambda h: resolver.load_site(h, subdomain))
+
+        if site is None:
+            # SEGURANÇA: Domínio/subdomínio não registrado
+            # Redireciona para o site principal em vez de retornar 404
+            logger.info(f"Host não registrado: {host} - redirecionando para {resolver.base_domain}")
+            return resolver.redirect_to_base(request)
+
+        request.tenant = site
+        request.is_site = True
+        # Rotas públicas do site (a raiz "/" é a home do site, não o painel)
+        request.urlconf = resolver.urlconf
+
+        # DEPOIS de detectar o tenant, verifica se é URL administrativa
+        # Se for uma URL bloqueada em um site válido, redireciona para o domínio principal
+        if request.path.lower().startswith(BLOCKED_PATHS):
+            logger.info(f"Bloqueando acesso administrativo/autenticação em site: {host}{request.path}")
+            return resolver.redirect_to_base(request)
+
+        # Se não for URL administrativa, permite acesso (é página pública do site)
+        return
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("landings", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="site",
+            name="design_css",
+            field=models.FileField(
+                blank=True, editable=False, upload_to="designs/", verbose_name="Folha de Estilos do Design"
+            ),
+        ),
+    ]
@@ -84,6 +84,8 @@ class Site(models.Model):
     business_name = models.CharField(_("Nome do Negócio"), max_length=200)
     logo = models.ImageField(_("Logo"), upload_to="logos/", blank=True)
     hero_image = models.ImageField(_("Imagem Principal/Banner"), upload_to="heroes/", blank=True)
+    # Gerado a partir do SiteDesign (apps.landings.stylesheets)
+    design_css = models.FileField(_("Folha de Estilos do Design"), upload_to="designs/", blank=True, editable=False)
 
     # Contato
     email = models.EmailField(_("E-mail de Contato"))
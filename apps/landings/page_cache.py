@@ -0,0 +1,191 @@
+"""
+Cache de página inteira para as páginas públicas dos sites (tenants).
+
+Cada site possui uma "versão de conteúdo" armazenada no cache (Redis). A versão
+faz parte da chave de todas as páginas cacheadas do site, então basta
+incrementá-la (bump_site_version) para invalidar todas as páginas do tenant de uma
+vez, sem precisar localizar e apagar chaves individualmente.
+
+A versão é um timestamp Unix (segundos) sempre crescente, o que também permite
+usá-la como data de última modificação do conteúdo do site. Ela também é a base
+dos validadores HTTP (ETag / Last-Modified) das páginas públicas, calculados sem
+renderizar nenhum template.
+"""
+
+import hashlib
+import logging
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+logger = logging.getLogger(__name__)
+
+# Cabeçalhos preservados nas respostas cacheadas
+CACHED_HEADERS = ("Content-Type", "Content-Language")
+
+
+def _version_key(site_id: int) -> str:
+    return f"site:version:{site_id}"
+
+
+def get_site_version(site_id: int) -> int:
+    """
+    Retorna a versão de conteúdo do site.
+
+    Se ainda não existir (ou tiver sido removida do Redis), inicializa com o
+    timestamp atual - o que equivale a considerar todo o conteúdo como alterado agora.
+    """
+    key = _version_key(site_id)
+    try:
+        version = cache.get(key)
+        if version is None:
+            version = int(time.time())
+            # add() não sobrescreve caso outro worker tenha inicializado antes
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+        return int(version)
+    except Exception as e:
+        logger.warning(f"Erro ao ler versão do site {site_id}: {e}")
+        return int(time.time())
+
+
+def bump_site_version(site_id: int | None) -> None:
+    """Avança a versão de conteúdo do site, invalidando todas as suas páginas cacheadas"""
+    if not site_id:
+        return
+    key = _version_key(site_id)
+    try:
+        current = cache.get(key) or 0
+        cache.set(key, max(int(time.time()), int(current) + 1), timeout=None)
+    except Exception as e:
+        logger.warning(f"Erro ao atualizar versão do site {site_id}: {e}")
+
+
+def get_request_site_version(request: HttpRequest) -> int:
+    """Versão do site do tenant, memorizada na requisição (evita ler o Redis mais de uma vez)"""
+    if not hasattr(request, "_site_version"):
+        request._site_version = get_site_version(request.tenant.pk)
+    return request._site_version
+
+
+def _page_key(request: HttpRequest, site_id: int, version: int) -> str:
+    """Chave da página: esquema + host + caminho + query string + idioma, dentro da versão do site"""
+    raw = "|".join(
+        [
+            request.scheme,
+            request.get_host().lower(),
+            request.path,
+            request.META.get("QUERY_STRING", ""),
+            get_language() or "",
+        ]
+    )
+    digest = hashlib.md5(raw.encode("utf-8"), usedforsecurity=False).hexdigest()
+    return f"page:{site_id}:{version}:{digest}"
+
+
+def is_cacheable_request(request: HttpRequest) -> bool:
+    """Apenas GET anônimo em um host de site (tenant) é cacheado"""
+    if request.method != "GET" or not getattr(request, "tenant", None):
+        return False
+    user = getattr(request, "user", None)
+    return not (user is not None and user.is_authenticated)
+
+
+def tenant_page_cache(view_func: Callable) -> Callable:
+    """
+    Decorator que cacheia a resposta completa de uma view pública do site.
+
+    Só respostas 200 de requisições anônimas são armazenadas. O tempo de vida é
+    definido por PAGE_CACHE_TTL; a invalidação acontece pela versão do site.
+    """
+
+    @wraps(view_func)
+    def _wrapped_view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        if not is_cacheable_request(request):
+            return view_func(request, *args, **kwargs)
+
+        site_id = request.tenant.pk
+        key = _page_key(request, site_id, get_request_site_version(request))
+
+        try:
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Erro ao ler cache de página: {e}")
+            cached = None
+
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for header, value in headers.items():
+                response[header] = value
+            response["X-Page-Cache"] = "HIT"
+            return response
+
+        response = view_func(request, *args, **kwargs)
+
+        if response.status_code == 200 and not response.streaming:
+            # Templates precisam estar renderizados antes de serializar
+            if hasattr(response, "render") and callable(response.render):
+                response = response.render()
+            headers = {header: response[header] for header in CACHED_HEADERS if response.has_header(header)}
+            try:
+                cache.set(key, (response.content, headers), getattr(settings, "PAGE_CACHE_TTL", 600))
+            except Exception as e:
+                logger.warning(f"Erro ao gravar cache de página: {e}")
+            response["X-Page-Cache"] = "MISS"
+
+        return response
+
+    return _wrapped_view
+
+
+# ============================================================================
+# GET CONDICIONAL (ETag / Last-Modified)
+# ============================================================================
+
+
+def site_etag(request: HttpRequest, *args, **kwargs) -> str | None:
+    """
+    ETag fraco da página: site + versão de conteúdo + idioma.
+
+    Não depende do HTML renderizado, então pode ser comparado antes de executar a view.
+    Usuários autenticados não recebem validadores (a página pode variar por usuário).
+    """
+    if not is_cacheable_request(request):
+        return None
+    version = get_request_site_version(request)
+    return f'W/"{request.tenant.pk}-{version}-{get_language() or ""}"'
+
+
+def site_last_modified(request: HttpRequest, *args, **kwargs) -> datetime | None:
+    """Data da última alteração do conteúdo do site (a versão é um timestamp Unix)"""
+    if not is_cacheable_request(request):
+        return None
+    return datetime.fromtimestamp(get_request_site_version(request), tz=UTC)
+
+
+def tenant_conditional_get(view_func: Callable) -> Callable:
+    """
+    Decorator que responde 304 Not Modified quando o validador do cliente
+    (If-None-Match / If-Modified-Since) corresponde à versão atual do site.
+
+    Também marca a resposta para que o navegador sempre revalide antes de reutilizar.
+    """
+    conditional_view = condition(etag_func=site_etag, last_modified_func=site_last_modified)(view_func)
+
+    @wraps(view_func)
+    def _wrapped_view(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        response = conditional_view(request, *args, **kwargs)
+        if is_cacheable_request(request) and response.status_code in (200, 304):
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    return _wrapped_view
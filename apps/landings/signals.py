@@ -1,14 +1,25 @@
 """
 Signals para Sites
-Gera certificados SSL automaticamente quando domínio personalizado é adicionado
+Marca domínios personalizados alterados para o provisionamento (DNS e SSL, apps.infrastructure)
+e invalida o cache de resolução de tenant quando domínios mudam
+Agenda a normalização do logo e da imagem principal enviados
+Gera a folha de estilos do site quando o design muda
 """
 
 import logging
+from functools import partial
 
-from django.db.models.signals import post_save, pre_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from .models import Site
+from apps.themes.models import Theme
+
+from .models import Site, SiteDesign, ThemeSectionConfig
+from .page_cache import bump_site_version
+from .stylesheets import compile_site_stylesheet
+from .tasks import SITE_IMAGE_FIELDS, normalize_site_image
+from .tenant_cache import get_site_hosts, tenant_cache
 
 logger = logging.getLogger(__name__)
 
@@ -22,16 +33,24 @@ def detect_custom_domain_change(sender, instance, **kwargs):
         try:
             old_instance = Site.objects.get(pk=instance.pk)
 
+            # Guarda os hosts antigos para invalidar o cache de tenant no post_save
+            instance._previous_hosts = get_site_hosts(old_instance)
+
+            # Guarda as imagens antigas para normalizar apenas arquivos novos no post_save
+            instance._previous_images = {field: getattr(old_instance, field).name for field in SITE_IMAGE_FIELDS}
+
             # Verificar se custom_domain mudou
             if old_instance.custom_domain != instance.custom_domain:
-                # Domínio mudou
+                # Domínio mudou: o provisionamento recomeça (apps.infrastructure.signals)
+                instance._custom_domain_changed = True
+                instance.dns_status = "pending"
+                instance.dns_error = None
+                instance.ssl_status = "none"
+                instance.ssl_error = None
                 if instance.custom_domain:
                     logger.info(f"Domínio personalizado adicionado/alterado: {instance.custom_domain}")
-                    # Flag para gerar certificado no post_save
-                    instance._custom_domain_changed = True
                 else:
                     logger.info("Domínio personalizado removido")
-                    instance._custom_domain_changed = False
 
             # Verificar se business_name mudou para atualizar subdomain automaticamente
             if old_instance.business_name != instance.business_name:
@@ -43,10 +62,12 @@ def detect_custom_domain_change(sender, instance, **kwargs):
 
 
 @receiver(post_save, sender=Site)
-def generate_ssl_for_custom_domain(sender, instance, created, **kwargs):
+def update_subdomain_on_business_name_change(sender, instance, created, **kwargs):
     """
-    Gera certificado SSL automaticamente quando domínio personalizado é adicionado
-    E atualiza subdomain quando business_name muda
+    Atualiza subdomain quando business_name muda.
+
+    O DNS e o SSL de domínios personalizados novos são provisionados pelo
+    agendador provision_custom_domains, não por tarefas agendadas aqui.
     """
     # Atualizar subdomain se business_name mudou
     if getattr(instance, "_business_name_changed", False):
@@ -59,30 +80,71 @@ def generate_ssl_for_custom_domain(sender, instance, created, **kwargs):
         except Exception as e:
             logger.error(f"❌ Erro ao atualizar subdomain: {str(e)}")
 
-    # Verificar se é novo com custom_domain ou se custom_domain mudou
-    should_generate = (created and instance.custom_domain) or getattr(instance, "_custom_domain_changed", False)
 
-    if should_generate and instance.custom_domain:
-        logger.info(f"🔐 Agendando geração de certificado SSL para {instance.custom_domain}")
+@receiver(post_save, sender=Site)
+def invalidate_tenant_cache_on_save(sender, instance, **kwargs):
+    """
+    Invalida o cache host -> Site quando o site é salvo.
+    Inclui os hosts antigos para que mudanças de domínio sejam refletidas imediatamente.
 
-        # Importar aqui para evitar circular import
-        # ATUALIZADO: Tasks movidas para apps.infrastructure
-        from apps.infrastructure.tasks import check_custom_domain_dns
+    Após o commit: antes dele, um cache miss concorrente leria a linha antiga e a
+    gravaria de novo no cache por TENANT_CACHE_TTL.
+    """
+    hosts = get_site_hosts(instance) + getattr(instance, "_previous_hosts", [])
+    transaction.on_commit(partial(tenant_cache.invalidate_hosts, hosts))
 
-        try:
-            # Verificar DNS após 5 minutos (dar tempo inicial para propagação)
-            # A propagação pode levar até 2 horas, então faremos verificações periódicas
-            check_custom_domain_dns.apply_async(args=[instance.id, instance.custom_domain], countdown=300)  # 5 min
 
-            # Verificações adicionais após 30 minutos, 1 hora e 2 horas
-            check_custom_domain_dns.apply_async(args=[instance.id, instance.custom_domain], countdown=1800)  # 30 min
-            check_custom_domain_dns.apply_async(args=[instance.id, instance.custom_domain], countdown=3600)  # 1 hora
-            check_custom_domain_dns.apply_async(args=[instance.id, instance.custom_domain], countdown=7200)  # 2 horas
+@receiver(post_save, sender=Site)
+def schedule_site_image_normalization(sender, instance, created, **kwargs):
+    """Agenda a normalização (fila media) do logo e da imagem principal quando um arquivo novo é enviado"""
+    previous_images = getattr(instance, "_previous_images", {})
+    for field_name in SITE_IMAGE_FIELDS:
+        name = getattr(instance, field_name).name
+        if name and name != previous_images.get(field_name):
+            transaction.on_commit(partial(normalize_site_image.delay, instance.pk, field_name))
 
-            # Gerar certificado SSL após primeira verificação bem-sucedida (será verificado na task)
-            # A task de DNS verificará e agendará o SSL quando estiver pronto
 
-            logger.info(f"✅ Tarefas agendadas para gerar SSL de {instance.custom_domain}")
+@receiver(post_delete, sender=Site)
+def invalidate_tenant_cache_on_delete(sender, instance, **kwargs):
+    """Invalida o cache host -> Site quando o site é removido (após o commit)"""
+    transaction.on_commit(partial(tenant_cache.invalidate_hosts, get_site_hosts(instance)))
 
-        except Exception as e:
-            logger.error(f"❌ Erro ao agendar geração de SSL: {str(e)}")
+
+@receiver([post_save, post_delete], sender=SiteDesign)
+def compile_stylesheet_on_design_change(sender, instance, **kwargs):
+    """Gera a folha de estilos do site (variáveis de cor) depois que o design é salvo"""
+    transaction.on_commit(partial(compile_site_stylesheet, instance.site_id))
+
+
+@receiver(post_save, sender=Theme)
+def invalidate_tenant_cache_on_theme_save(sender, instance, **kwargs):
+    """
+    Invalida o cache dos sites que usam o tema (o Site é cacheado com select_related("theme"))
+    e as páginas cacheadas desses sites
+    """
+    sites = list(Site.objects.filter(theme=instance).only("subdomain", "custom_domain"))
+    hosts = [host for site in sites for host in get_site_hosts(site)]
+    transaction.on_commit(partial(tenant_cache.invalidate_hosts, hosts))
+    for site in sites:
+        transaction.on_commit(partial(bump_site_version, site.pk))
+
+
+# ============================================================================
+# CACHE DE PÁGINAS PÚBLICAS (versão de conteúdo por site)
+# ============================================================================
+# A versão avança após o commit: antes dele, uma requisição concorrente
+# renderizaria os dados antigos e os gravaria sob a versão nova.
+# Imóveis e imagens avançam a versão em apps.properties.signals (após o snapshot).
+
+
+@receiver([post_save, post_delete], sender=Site)
+def bump_version_on_site_change(sender, instance, **kwargs):
+    """Invalida as páginas cacheadas do site quando ele é alterado"""
+    transaction.on_commit(partial(bump_site_version, instance.pk))
+
+
+@receiver([post_save, post_delete], sender=SiteDesign)
+@receiver([post_save, post_delete], sender=ThemeSectionConfig)
+def bump_version_on_site_content_change(sender, instance, **kwargs):
+    """Invalida as páginas cacheadas do site quando design ou seções mudam"""
+    transaction.on_commit(partial(bump_site_version, instance.site_id))
@@ -0,0 +1,113 @@
+"""
+sitemap.xml e robots.txt dos sites (tenants).
+
+Sem sitemap, os robôs de busca descobrem as páginas de imóveis percorrendo a
+paginação e as combinações de filtros da listagem, o que gera muitas páginas
+dinâmicas. O sitemap lista a página inicial, a listagem e cada imóvel ativo com
+o lastmod do imóvel (Property.updated_at), para que o robô volte apenas ao que
+mudou; o robots.txt aponta para ele e bloqueia as variações da listagem
+(cursor, página, filtros e busca).
+
+As duas respostas são montadas a partir do host da requisição (subdomínio ou
+domínio próprio) e cacheadas pelo cache de página, dentro da versão de conteúdo
+do site: uma alteração em imóveis (bump_site_version) gera um novo sitemap.
+
+Sites com mais de SITEMAP_MAX_URLS imóveis recebem um índice de sitemaps
+(sitemap.xml?page=N), conforme o limite do protocolo.
+"""
+
+import math
+from datetime import UTC, datetime
+from typing import Any
+from xml.etree import ElementTree
+
+from apps.properties.models import Property
+
+# Limite de URLs por arquivo (protocolo sitemaps.org)
+SITEMAP_MAX_URLS = 50_000
+
+# Páginas fixas (início e listagem), sempre na primeira página do sitemap
+SITEMAP_FIXED_URLS = 2
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+# Caminhos que não devem ser rastreados nos hosts dos sites
+ROBOTS_DISALLOW = (
+    # Variações da listagem (cursor, página, filtros e busca): os imóveis estão no sitemap
+    "/imoveis/?",
+    "/landings/",
+    "/properties/",
+    "/accounts/",
+    "/core/",
+    "/admin/",
+    "/admin-panel/",
+    "/i18n/",
+)
+
+
+def _lastmod(value: datetime) -> str:
+    return value.astimezone(UTC).isoformat(timespec="seconds")
+
+
+def _url(parent: ElementTree.Element, loc: str, lastmod: datetime | None = None) -> None:
+    url = ElementTree.SubElement(parent, "url")
+    ElementTree.SubElement(url, "loc").text = loc
+    if lastmod is not None:
+        ElementTree.SubElement(url, "lastmod").text = _lastmod(lastmod)
+
+
+def _to_bytes(root: ElementTree.Element) -> bytes:
+    return ElementTree.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def sitemap_page_count(site: Any) -> int:
+    """Quantidade de arquivos de sitemap do site (1 = sitemap único, sem índice)"""
+    total = Property.objects.filter(site=site, is_active=True).count() + SITEMAP_FIXED_URLS
+    return max(math.ceil(total / SITEMAP_MAX_URLS), 1)
+
+
+def build_sitemap_index(base_url: str, pages: int, lastmod: datetime) -> bytes:
+    """Índice com um sitemap por página (sitemap.xml?page=N)"""
+    root = ElementTree.Element("sitemapindex", xmlns=SITEMAP_NAMESPACE)
+    for page in range(1, pages + 1):
+        sitemap = ElementTree.SubElement(root, "sitemap")
+        ElementTree.SubElement(sitemap, "loc").text = f"{base_url}/sitemap.xml?page={page}"
+        ElementTree.SubElement(sitemap, "lastmod").text = _lastmod(lastmod)
+    return _to_bytes(root)
+
+
+def build_sitemap(site: Any, base_url: str, site_lastmod: datetime, page: int = 1) -> bytes:
+    """
+    Sitemap com as páginas fixas (apenas na primeira página) e os imóveis ativos.
+
+    Args:
+        site: Site do tenant
+        base_url: Esquema + host da requisição (ex: https://fulano.propzy.com.br)
+        site_lastmod: Última alteração do conteúdo do site (versão do site)
+        page: Página do sitemap (a partir de 1)
+    """
+    # A primeira página reserva espaço para as páginas fixas; as seguintes continuam de onde ela parou
+    start = max((page - 1) * SITEMAP_MAX_URLS - SITEMAP_FIXED_URLS, 0)
+    end = page * SITEMAP_MAX_URLS - SITEMAP_FIXED_URLS
+    properties = (
+        Property.objects.filter(site=site, is_active=True).order_by("pk").values_list("pk", "updated_at")[start:end]
+    )
+
+    root = ElementTree.Element("urlset", xmlns=SITEMAP_NAMESPACE)
+    if page == 1:
+        _url(root, f"{base_url}/", site_lastmod)
+        _url(root, f"{base_url}/imoveis/", site_lastmod)
+    for pk, updated_at in properties.iterator():
+        _url(root, f"{base_url}/imovel/{pk}/", updated_at)
+    return _to_bytes(root)
+
+
+def build_robots(site: Any, base_url: str) -> str:
+    """robots.txt do site: sites não publicados não são indexados"""
+    if not site.is_published:
+        return "User-agent: *\nDisallow: /\n"
+
+    lines = ["User-agent: *", "Allow: /"]
+    lines.extend(f"Disallow: {path}" for path in ROBOTS_DISALLOW)
+    lines.extend(["", f"Sitemap: {base_url}/sitemap.xml", ""])
+    return "\n".join(lines)
@@ -145,36 +145,6 @@ class SSLManager:
             logger.error(f"❌ Exceção ao renovar certificado de {domain}: {str(e)}")
             return False, f"Erro inesperado: {str(e)}"
 
-    def renew_all_certificates(self) -> tuple[int, int]:
-        """
-        Renova todos os certificados que estão próximos do vencimento
-
-        Returns:
-            (total_renovados, total_erros)
-        """
-        try:
-            cmd = [self.certbot_path, "renew", "--deploy-hook", "nginx -s reload"]
-
-            logger.info("Renovando todos os certificados...")
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minutos para renovar todos
-            )
-
-            # Analisar resultado
-            output = result.stdout
-            renewed = output.count("Successfully renewed")
-
-            logger.info(f"✅ Renovação concluída: {renewed} certificados renovados")
-            return renewed, 0
-
-        except Exception as e:
-            logger.error(f"❌ Erro ao renovar certificados: {str(e)}")
-            return 0, 1
-
     def delete_certificate(self, domain: str) -> tuple[bool, str]:
         """
         Remove certificado de um domínio
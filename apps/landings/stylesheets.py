@@ -0,0 +1,116 @@
+"""
+Folha de estilos (CSS) por site, gerada a partir do SiteDesign.
+
+As cores do design viram variáveis CSS em um arquivo minificado salvo no
+storage com o hash do conteúdo no nome (designs/<site>/design.<hash>.css), o
+que permite cache longo (immutable) no navegador e no nginx: uma alteração no
+design gera um arquivo novo, e as páginas passam a apontar para ele.
+
+O nome do arquivo fica no próprio Site (Site.design_css), que já é carregado
+pelo middleware de tenant; as páginas públicas não consultam o SiteDesign.
+"""
+
+import hashlib
+import logging
+import re
+from typing import Any
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+DESIGN_CSS_DIR = "designs"
+
+# Campo do SiteDesign -> variável CSS
+DESIGN_CSS_VARIABLES = {
+    "primary_color": "--primary-color",
+    "secondary_color": "--secondary-color",
+    "tertiary_color": "--tertiary-color",
+    "quaternary_color": "--quaternary-color",
+    "success_color": "--success-color",
+    "danger_color": "--danger-color",
+    "warning_color": "--warning-color",
+    "info_color": "--info-color",
+    "text_primary_color": "--text-primary-color",
+    "text_secondary_color": "--text-secondary-color",
+    "background_color": "--background-color",
+    "border_color": "--border-color",
+}
+
+# Apenas cores hexadecimais entram no CSS (o valor é gravado sem escape)
+COLOR_RE = re.compile(r"^#(?:[0-9a-fA-F]{3}){1,2}$")
+
+
+def render_design_css(design: Any) -> str:
+    """CSS minificado com as variáveis de cor do design (valores inválidos usam o padrão do campo)"""
+    from .models import SiteDesign
+
+    declarations = []
+    for field_name, variable in DESIGN_CSS_VARIABLES.items():
+        value = getattr(design, field_name, "") if design is not None else ""
+        if not COLOR_RE.match(value or ""):
+            value = SiteDesign._meta.get_field(field_name).default
+        declarations.append(f"{variable}:{value}")
+    return ":root{" + ";".join(declarations) + "}"
+
+
+def design_css_name(site_id: int, css: str) -> str:
+    """Nome do arquivo no storage, com o hash do conteúdo"""
+    digest = hashlib.sha256(css.encode()).hexdigest()[:12]
+    return f"{DESIGN_CSS_DIR}/{site_id}/design.{digest}.css"
+
+
+def compile_site_stylesheet(site_id: int) -> str | None:
+    """
+    Gera a folha de estilos do site e aponta o Site para ela.
+
+    Mantém o arquivo anterior (páginas já entregues ainda podem referenciá-lo)
+    e remove os mais antigos.
+
+    Returns:
+        Nome do arquivo no storage ou None se o site não existe
+    """
+    from .models import Site, SiteDesign
+    from .page_cache import bump_site_version
+    from .tenant_cache import tenant_cache
+
+    site = Site.objects.filter(pk=site_id).only("pk", "subdomain", "custom_domain", "design_css").first()
+    if site is None:
+        return None
+
+    design = SiteDesign.objects.filter(site_id=site_id).first()
+    css = render_design_css(design)
+    name = design_css_name(site_id, css)
+    previous = site.design_css.name
+
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, ContentFile(css.encode()))
+        if saved != name:
+            # Outro processo gravou o mesmo conteúdo ao mesmo tempo
+            default_storage.delete(saved)
+
+    if name != previous:
+        # update(): sem disparar os signals do Site
+        Site.objects.filter(pk=site_id).update(design_css=name)
+        tenant_cache.invalidate_site(site)
+        bump_site_version(site_id)
+        _delete_old_stylesheets(site_id, keep={name, previous})
+        logger.info(f"Folha de estilos do site {site_id} gerada: {name}")
+
+    return name
+
+
+def _delete_old_stylesheets(site_id: int, keep: set[str]) -> None:
+    directory = f"{DESIGN_CSS_DIR}/{site_id}"
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        name = f"{directory}/{filename}"
+        if name not in keep:
+            try:
+                default_storage.delete(name)
+            except OSError as e:
+                logger.warning(f"Erro ao remover folha de estilos antiga {name}: {e}")
@@ -5,158 +5,110 @@ Tarefas assíncronas do Celery para Sites
 import logging
 
 from celery import shared_task
-from django.core.mail import mail_admins
 
 logger = logging.getLogger(__name__)
 
 
+# Campos de imagem do Site normalizados após o upload
+SITE_IMAGE_FIELDS = ("logo", "hero_image")
+
+
 @shared_task(bind=True, max_retries=3)
-def generate_ssl_certificate(self, site_id: int, domain: str, email: str):
+def normalize_site_image(self, site_id: int, field_name: str):
     """
-    Gera certificado SSL para um domínio personalizado
+    Normaliza o logo ou a imagem principal do site (orientação, dimensões, metadados, compressão)
 
     Args:
         site_id: ID do site
-        domain: Domínio para gerar certificado
-        email: Email para notificações
+        field_name: "logo" ou "hero_image"
     """
+    from PIL import UnidentifiedImageError
+
+    from apps.core.images import delete_file, normalize_image
     from apps.landings.models import Site
-    from apps.landings.ssl_manager import ssl_manager
+    from apps.landings.page_cache import bump_site_version
+    from apps.landings.tenant_cache import tenant_cache
 
-    try:
-        logger.info(f"Gerando certificado SSL para {domain}...")
-
-        # Buscar site
-        site = Site.objects.get(id=site_id)
-
-        # Atualizar status
-        site.ssl_status = "generating"
-        site.save(update_fields=["ssl_status"])
-
-        # Gerar certificado
-        success, message = ssl_manager.generate_certificate(domain, email)
-
-        if success:
-            # Sucesso!
-            logger.info(f"✅ Certificado gerado para {domain}")
-            site.ssl_status = "active"
-            site.ssl_error = None
-            site.save(update_fields=["ssl_status", "ssl_error"])
-
-            # Notificar administradores
-            mail_admins(
-                f"SSL Gerado: {domain}",
-                f"Certificado SSL gerado com sucesso para {domain}\n\n"
-                f"Landing Page: {site.business_name}\n"
-                f"Proprietário: {site.owner.email}",
-            )
-
-            return {"success": True, "message": message}
-        else:
-            # Erro
-            logger.error(f"❌ Erro ao gerar certificado para {domain}: {message}")
-            site.ssl_status = "error"
-            site.ssl_error = message[:500]  # Limitar tamanho
-            site.save(update_fields=["ssl_status", "ssl_error"])
-
-            # Tentar novamente (max 3 vezes)
-            raise self.retry(exc=Exception(message), countdown=300)  # Retry em 5 minutos
-
-    except Site.DoesNotExist:
-        logger.error(f"Site {site_id} não encontrada")
-        return {"success": False, "message": "Site não encontrada"}
-
-    except Exception as e:
-        logger.error(f"Erro inesperado ao gerar certificado: {str(e)}")
-
-        # Atualizar status de erro
-        try:
-            site = Site.objects.get(id=site_id)
-            site.ssl_status = "error"
-            site.ssl_error = str(e)[:500]
-            site.save(update_fields=["ssl_status", "ssl_error"])
-        except:
-            pass
-
-        raise
-
-
-@shared_task
-def renew_ssl_certificates():
-    """
-    Renova todos os certificados SSL que estão próximos do vencimento
-    Deve ser executado diariamente via Celery Beat
-    """
-    from apps.landings.ssl_manager import ssl_manager
+    if field_name not in SITE_IMAGE_FIELDS:
+        raise ValueError(f"Campo de imagem inválido: {field_name}")
 
-    logger.info("Iniciando renovação automática de certificados SSL...")
+    original_name = Site.objects.filter(pk=site_id).values_list(field_name, flat=True).first()
+    if not original_name:
+        return {"success": False, "message": "Site sem imagem"}
 
     try:
-        renewed, errors = ssl_manager.renew_all_certificates()
-
-        logger.info(f"✅ Renovação concluída: {renewed} renovados, {errors} erros")
+        result = normalize_image(original_name)
+    except UnidentifiedImageError:
+        logger.error(f"Arquivo não é uma imagem válida: {original_name}")
+        return {"success": False, "message": "Imagem inválida"}
+    except OSError as e:
+        logger.error(f"Erro ao normalizar {original_name}: {e}")
+        raise self.retry(exc=e, countdown=60) from e
 
-        # Notificar administradores se houver renovações
-        if renewed > 0:
-            mail_admins("Certificados SSL Renovados", f"{renewed} certificado(s) SSL foram renovados automaticamente.")
+    if result is None:
+        return {"success": True, "normalized": False}
 
-        return {"renewed": renewed, "errors": errors}
+    # Troca atômica: só aplica se a imagem não foi trocada durante o processamento
+    swapped = Site.objects.filter(pk=site_id, **{field_name: original_name}).update(**{field_name: result.name})
+    if not swapped:
+        delete_file(result.name)
+        return {"success": False, "message": "Imagem alterada durante o processamento"}
 
-    except Exception as e:
-        logger.error(f"❌ Erro ao renovar certificados: {str(e)}")
+    delete_file(original_name)
 
-        # Notificar administradores sobre erro
-        mail_admins("Erro na Renovação de Certificados SSL", f"Erro ao renovar certificados SSL:\n\n{str(e)}")
+    # update() não dispara signals: invalida o Site cacheado por host e as páginas do site
+    site = Site.objects.only("subdomain", "custom_domain").get(pk=site_id)
+    tenant_cache.invalidate_site(site)
+    bump_site_version(site_id)
 
-        raise
+    logger.info(f"✅ Imagem normalizada: {original_name} ({result.original_size} -> {result.size} bytes)")
+    return {"success": True, "normalized": True}
 
 
-@shared_task
-def check_custom_domain_dns(site_id: int, domain: str):
+@shared_task(bind=True, max_retries=3)
+def normalize_section_image(self, site_id: int, section_key: str, image_name: str):
     """
-    Verifica se o DNS do domínio personalizado está configurado corretamente
+    Normaliza a imagem de uma seção do tema (ThemeSectionConfig.sections_config[section]["image"])
 
     Args:
-        site_id: ID da landing page
-        domain: Domínio para verificar
+        site_id: ID do site
+        section_key: Chave da seção (ex: "hero", "about")
+        image_name: Caminho da imagem no storage
     """
-    import socket
+    from django.db import transaction
+    from PIL import UnidentifiedImageError
 
-    from apps.landings.models import Site
+    from apps.core.images import delete_file, normalize_image
+    from apps.landings.models import ThemeSectionConfig
 
     try:
-        logger.info(f"Verificando DNS para {domain}...")
-
-        site = Site.objects.get(id=site_id)
-
-        # Resolver DNS
-        try:
-            ip_address = socket.gethostbyname(domain)
-            logger.info(f"DNS de {domain} aponta para {ip_address}")
-
-            # Verificar se aponta para o servidor correto
-            # (Aqui você pode adicionar lógica para verificar se é o IP esperado)
-
-            site.dns_status = "ok"
-            site.dns_error = None
-            site.save(update_fields=["dns_status", "dns_error"])
-
-            return {"success": True, "ip": ip_address}
-
-        except socket.gaierror:
-            error_msg = "DNS não configurado ou não propagado ainda"
-            logger.warning(f"⚠️ {error_msg} para {domain}")
-
-            site.dns_status = "error"
-            site.dns_error = error_msg
-            site.save(update_fields=["dns_status", "dns_error"])
-
-            return {"success": False, "message": error_msg}
-
-    except Site.DoesNotExist:
-        logger.error(f"Site {site_id} não encontrada")
-        return {"success": False, "message": "Site não encontrada"}
-
-    except Exception as e:
-        logger.error(f"Erro ao verificar DNS: {str(e)}")
-        raise
+        result = normalize_image(image_name)
+    except UnidentifiedImageError:
+        logger.error(f"Arquivo não é uma imagem válida: {image_name}")
+        return {"success": False, "message": "Imagem inválida"}
+    except OSError as e:
+        logger.error(f"Erro ao normalizar {image_name}: {e}")
+        raise self.retry(exc=e, countdown=60) from e
+
+    if result is None:
+        return {"success": True, "normalized": False}
+
+    # Troca atômica: só aplica se a seção ainda usa a imagem original
+    with transaction.atomic():
+        theme_config = ThemeSectionConfig.objects.select_for_update().filter(site_id=site_id).first()
+        section = theme_config.sections_config.get(section_key) if theme_config else None
+        swapped = bool(section) and section.get("image") == image_name
+        if swapped:
+            sections_config = theme_config.sections_config.copy()
+            sections_config[section_key] = {**section, "image": result.name}
+            theme_config.sections_config = sections_config
+            # save() dispara o signal que invalida as páginas cacheadas do site
+            theme_config.save(update_fields=["sections_config", "updated_at"])
+
+    if not swapped:
+        delete_file(result.name)
+        return {"success": False, "message": "Imagem alterada durante o processamento"}
+
+    delete_file(image_name)
+    logger.info(f"✅ Imagem normalizada: {image_name} ({result.original_size} -> {result.size} bytes)")
+    return {"success": True, "normalized": True}
@@ -42,33 +42,11 @@ def section_config(site, section_key):
 def get_filtered_properties(site, section_config):
     """
     Retorna propriedades filtradas baseado na configuração da seção.
-    Otimizado com prefetch_related para melhor desempenho.
+    Lê o snapshot da listagem do site (uma query) e filtra em memória.
     """
-    from apps.properties.models import Property
+    from apps.properties.snapshots import filter_cards, get_site_cards
 
-    # Query base otimizada
-    properties = site.properties.filter(is_active=True).prefetch_related("images").order_by("-created_at")
-
-    # Aplicar filtros da configuração
-    if section_config.get("show_featured_only"):
-        properties = properties.filter(is_featured=True)
-
-    if section_config.get("filter_transaction"):
-        transaction = section_config["filter_transaction"]
-        if transaction in ["sale", "rent"]:
-            properties = properties.filter(transaction_type=transaction)
-        # "both" não precisa de filtro
-
-    if section_config.get("filter_type"):
-        properties = properties.filter(property_type=section_config["filter_type"])
-
-    if section_config.get("filter_city"):
-        properties = properties.filter(city__icontains=section_config["filter_city"])
-
-    # Aplicar limite
-    limit = section_config.get("limit", 0)
-    if limit and limit > 0:
-        properties = properties[:limit]
-
-    return properties
+    # Mais recentes primeiro
+    properties = sorted(get_site_cards(site), key=lambda p: p.created_at, reverse=True)
 
+    return filter_cards(properties, section_config)
@@ -0,0 +1,180 @@
+"""
+Cache de resolução de tenant (host -> Site) usado pelo TenantMiddleware.
+
+Funciona em duas camadas:
+- LRU local por worker (memória do processo, TTL curto de poucos segundos)
+- Cache compartilhado no Redis (CACHES["default"]), invalidado pelos signals de Site
+
+Hosts não registrados também são cacheados (cache negativo), evitando que
+domínios desconhecidos gerem consultas ao banco em toda requisição.
+"""
+
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Marcador armazenado para hosts sem site (cache negativo)
+NOT_FOUND = "__tenant_not_found__"
+
+# Marcador interno para "chave ausente" (diferente de None e de NOT_FOUND)
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Cache LRU em memória com expiração por TTL.
+
+    Thread-safe para uso com workers gunicorn multi-thread.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Retorna o valor da chave ou _MISSING se ausente/expirado"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Armazena um valor, removendo o menos usado se exceder o tamanho máximo"""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove uma chave (se existir)"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove todas as chaves"""
+        with self._lock:
+            self._data.clear()
+
+
+class TenantCache:
+    """
+    Cache host -> Site em duas camadas (LRU local + Redis).
+
+    O Site é armazenado serializado (pickle) na camada local para que cada
+    requisição receba sua própria instância, sem compartilhar estado entre threads.
+    """
+
+    key_prefix = "tenant:host:"
+
+    def __init__(self):
+        self.local = LocalLRUCache(
+            maxsize=getattr(settings, "TENANT_CACHE_LOCAL_MAXSIZE", 1024),
+            ttl=getattr(settings, "TENANT_CACHE_LOCAL_TTL", 5),
+        )
+
+    @property
+    def timeout(self) -> int:
+        return getattr(settings, "TENANT_CACHE_TTL", 300)
+
+    @property
+    def negative_timeout(self) -> int:
+        return getattr(settings, "TENANT_CACHE_NEGATIVE_TTL", 60)
+
+    def make_key(self, host: str) -> str:
+        return f"{self.key_prefix}{host}"
+
+    def get_site(self, host: str, loader: Callable[[str], Any]) -> Any:
+        """
+        Retorna o Site do host, consultando LRU local -> Redis -> banco (loader).
+
+        Args:
+            host: Host já normalizado (minúsculo, sem porta)
+            loader: Função que busca o Site no banco e retorna None se não existir
+
+        Returns:
+            Instância de Site ou None se o host não pertencer a nenhum site ativo
+        """
+        key = self.make_key(host)
+
+        # 1) LRU local do worker
+        payload = self.local.get(key)
+        if payload is not _MISSING:
+            return self._load(payload)
+
+        # 2) Redis compartilhado (falha no Redis não pode derrubar o site)
+        try:
+            payload = cache.get(key, _MISSING)
+        except Exception as e:
+            logger.warning(f"Erro ao ler cache de tenant ({host}): {e}")
+            payload = _MISSING
+
+        if payload is not _MISSING:
+            self.local.set(key, payload)
+            return self._load(payload)
+
+        # 3) Banco de dados
+        site = loader(host)
+        payload = pickle.dumps(site, pickle.HIGHEST_PROTOCOL) if site is not None else NOT_FOUND
+        timeout = self.timeout if site is not None else self.negative_timeout
+        try:
+            cache.set(key, payload, timeout)
+        except Exception as e:
+            logger.warning(f"Erro ao gravar cache de tenant ({host}): {e}")
+        self.local.set(key, payload)
+        return site
+
+    @staticmethod
+    def _load(payload: Any) -> Any:
+        if payload == NOT_FOUND:
+            return None
+        return pickle.loads(payload)
+
+    def invalidate_hosts(self, hosts: Iterable[str]) -> None:
+        """Remove os hosts informados das duas camadas de cache"""
+        keys = [self.make_key(host) for host in {h for h in hosts if h}]
+        if not keys:
+            return
+        for key in keys:
+            self.local.delete(key)
+        try:
+            cache.delete_many(keys)
+        except Exception as e:
+            logger.warning(f"Erro ao invalidar cache de tenant: {e}")
+
+    def invalidate_site(self, site: Any) -> None:
+        """Remove do cache todos os hosts que apontam para o site"""
+        self.invalidate_hosts(get_site_hosts(site))
+
+
+def get_site_hosts(site: Any) -> list[str]:
+    """Retorna os hosts (subdomínio completo e domínio personalizado) de um site"""
+    hosts = []
+    if site.subdomain:
+        hosts.append(site.get_full_subdomain().lower())
+    if site.custom_domain:
+        hosts.append(site.custom_domain.lower())
+    return hosts
+
+
+# Instância global (uma por processo/worker)
+tenant_cache = TenantCache()
@@ -11,9 +11,11 @@ app_name = "landings"
 urlpatterns = [
     # Dashboard (configuração)
     path("dashboard/", views.dashboard_home, name="dashboard_home"),
+    path("dashboard/config/", views.dashboard_config_basic, name="dashboard_config"),
     path("dashboard/config/basic/", views.dashboard_config_basic, name="dashboard_config_basic"),
     path("dashboard/check-subdomain/", views.check_subdomain_availability, name="check_subdomain_availability"),
     path("dashboard/config/domain/", views.dashboard_config_domain, name="dashboard_config_domain"),
+    path("dashboard/config/domain/dns-status/", views.dashboard_domain_dns_status, name="dashboard_domain_dns_status"),
     path("dashboard/config/theme/", views.dashboard_config_theme, name="dashboard_config_theme"),
     path("dashboard/configuracoes-avancadas/", views.dashboard_advanced_config, name="dashboard_advanced_config"),
     path("dashboard/theme/<slug:theme_slug>/preview/", views.dashboard_theme_preview, name="theme_preview"),
@@ -21,6 +23,7 @@ urlpatterns = [
     # Páginas públicas do site (também disponíveis via /landings/)
     path("imoveis/", views.properties_list, name="properties_list"),
     path("imovel/<int:pk>/", views.property_detail, name="property_detail"),
+    path("feed/imoveis.<str:feed_format>", views.property_feed, name="property_feed"),
     # Site público (catch-all - será adicionada no urls.py principal)
     path("", views.site_view, name="view"),
 ]
@@ -6,25 +6,39 @@ Inclui:
 - Views do dashboard para configuração
 """
 
+from datetime import UTC, datetime
 from typing import Any
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import Http404
+from django.http import FileResponse, Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.http import require_http_methods
 
+from apps.core.pagination import CURSOR_PARAM, PAGE_PARAM, KeysetPaginator
+from apps.properties.facets import apply_filters, count_properties, get_facets, get_filters
+from apps.properties.feeds import FEED_FORMATS, open_feed
 from apps.properties.models import Property
+from apps.properties.search import search_properties
+from apps.properties.snapshots import attach_card_slides, build_slides, filter_cards, get_site_cards
 
 # ATUALIZADO: Theme movido para apps.themes
+from apps.themes.manifests import DEFAULT_SECTIONS
 from apps.themes.models import Theme
 
 from .forms import SiteAdvancedForm, ThemeSectionConfigForm
 from .models import Site, ThemeSectionConfig
+from .page_cache import get_request_site_version, tenant_conditional_get, tenant_page_cache
+from .sitemaps import build_robots, build_sitemap, build_sitemap_index, sitemap_page_count
+from .tasks import normalize_section_image
 
 
 @require_http_methods(["GET"])
+@tenant_conditional_get
+@tenant_page_cache
 def site_view(request):
     """
     View que serve o site do tenant detectado pelo middleware.
@@ -38,11 +52,11 @@ def site_view(request):
 
     site = request.tenant
 
-    # Busca os imóveis ativos (com prefetch para otimizar queries)
-    properties = site.properties.filter(is_active=True).prefetch_related("images")
+    # Imóveis ativos lidos do snapshot da listagem (uma única linha, sem joins)
+    properties = get_site_cards(site)
 
     # Imóveis em destaque (máximo 6)
-    featured_properties = properties.filter(is_featured=True)[:6]
+    featured_properties = [p for p in properties if p.is_featured][:6]
 
     # Buscar configuração da seção de propriedades se existir
     properties_section_config = {}
@@ -54,24 +68,7 @@ def site_view(request):
 
     # Aplicar filtros da seção de propriedades se configurados
     if properties_section_config.get("enabled", True):
-        if properties_section_config.get("show_featured_only"):
-            properties = properties.filter(is_featured=True)
-
-        if properties_section_config.get("filter_transaction"):
-            transaction = properties_section_config["filter_transaction"]
-            if transaction in ["sale", "rent"]:
-                properties = properties.filter(transaction_type=transaction)
-
-        if properties_section_config.get("filter_type"):
-            properties = properties.filter(property_type=properties_section_config["filter_type"])
-
-        if properties_section_config.get("filter_city"):
-            properties = properties.filter(city__icontains=properties_section_config["filter_city"])
-
-        # Aplicar limite
-        limit = properties_section_config.get("limit", 0)
-        if limit and limit > 0:
-            properties = properties[:limit]
+        properties = filter_cards(properties, properties_section_config)
 
     # Template a ser usado (do tema selecionado)
     template_path = "landings/themes/default/index.html"  # Fallback
@@ -278,26 +275,25 @@ def dashboard_config_domain(request):
     # Processar formulário
     if request.method == "POST":
         if "verify_dns" in request.POST:
-            # Verificar DNS manualmente
+            # Verificar DNS manualmente: agenda a verificação e retorna sem esperar o resultado
+            error = None
             if site.custom_domain:
-                from apps.infrastructure.tasks import check_custom_domain_dns
+                from apps.infrastructure.provisioning import request_manual_dns_check
 
-                result = check_custom_domain_dns.delay(site.pk, site.custom_domain)
-                # Aguardar resultado (timeout de 10 segundos)
                 try:
-                    result_data = result.get(timeout=10)
-                    if result_data.get("success"):
-                        messages.success(
-                            request, _("DNS verificado com sucesso! O domínio está apontado corretamente.")
-                        )
-                    else:
-                        messages.warning(
-                            request, _("DNS não configurado ou ainda não propagado. Verifique as configurações.")
-                        )
+                    request_manual_dns_check(site.pk, site.custom_domain)
                 except Exception:
-                    messages.error(request, _("Erro ao verificar DNS. Tente novamente em alguns instantes."))
+                    error = (messages.ERROR, _("Erro ao verificar DNS. Tente novamente em alguns instantes."))
+            else:
+                error = (messages.WARNING, _("Configure um domínio personalizado primeiro."))
+
+            if request.headers.get("HX-Request"):
+                # HTMX: devolve o card de status, que acompanha a verificação ou exibe o erro
+                return _render_dns_status(request, site, error=error)
+            if error:
+                messages.add_message(request, *error)
             else:
-                messages.warning(request, _("Configure um domínio personalizado primeiro."))
+                messages.info(request, _("Verificação de DNS iniciada. O resultado aparece em instantes."))
             return redirect("landings:dashboard_config_domain")
 
         from .forms import SiteAdvancedForm
@@ -307,24 +303,8 @@ def dashboard_config_domain(request):
             old_domain = site.custom_domain
             form.save()
 
-            # Se o domínio mudou, verificar DNS automaticamente
+            # Se o domínio mudou, a varredura periódica de DNS verifica em instantes (signal pre_save do Site)
             if form.instance.custom_domain and form.instance.custom_domain != old_domain:
-                from apps.infrastructure.tasks import check_custom_domain_dns
-
-                # Verificar DNS após 5 minutos (dar tempo inicial para propagação)
-                # A propagação pode levar até 2 horas, então faremos verificações periódicas
-                check_custom_domain_dns.apply_async(args=[form.instance.pk, form.instance.custom_domain], countdown=300)
-
-                # Verificações adicionais após 30 minutos, 1 hora e 2 horas
-                check_custom_domain_dns.apply_async(
-                    args=[form.instance.pk, form.instance.custom_domain], countdown=1800
-                )  # 30 min
-                check_custom_domain_dns.apply_async(
-                    args=[form.instance.pk, form.instance.custom_domain], countdown=3600
-                )  # 1 hora
-                check_custom_domain_dns.apply_async(
-                    args=[form.instance.pk, form.instance.custom_domain], countdown=7200
-                )  # 2 horas
                 messages.success(
                     request,
                     _(
@@ -346,15 +326,42 @@ def dashboard_config_domain(request):
     form = SiteAdvancedForm(instance=site)
     base_domain = getattr(settings, "BASE_DOMAIN", "propzy.com.br")
 
+    from apps.infrastructure.provisioning import get_manual_dns_check
+
     context = {
         "site": site,
         "form": form,
         "base_domain": base_domain,
+        "dns_check": get_manual_dns_check(site.pk),
     }
 
     return render(request, "landings/dashboard/config_domain.html", context)
 
 
+def _render_dns_status(request, site: Site, error: tuple[int, str] | None = None) -> HttpResponse:
+    """Card de status do DNS; `error` (nível, mensagem) é exibido no card quando a verificação não foi agendada"""
+    from apps.infrastructure.provisioning import get_manual_dns_check
+
+    context = {"site": site, "dns_check": get_manual_dns_check(site.pk)}
+    if error:
+        level, message = error
+        context["dns_check_error"] = {"level": messages.DEFAULT_TAGS.get(level, "error"), "message": message}
+    return render(request, "landings/dashboard/partials/dns_status.html", context)
+
+
+@login_required
+@require_http_methods(["GET"])
+def dashboard_domain_dns_status(request):
+    """
+    Card de status do DNS do domínio personalizado via HTMX.
+
+    Consultado a cada poucos segundos enquanto uma verificação manual está em
+    andamento; a resposta sem o gatilho de polling encerra a consulta.
+    """
+    site = get_object_or_404(Site.objects.only("pk", "custom_domain", "dns_status", "dns_error"), owner=request.user)
+    return _render_dns_status(request, site)
+
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def dashboard_config_theme(request):
@@ -453,6 +460,9 @@ def dashboard_config_theme(request):
                     sections_config[section_key] = section_data
                     theme_config_obj.sections_config = sections_config
                     theme_config_obj.save()
+                    if image_field_name in request.FILES:
+                        # Normaliza a imagem enviada em background (fila media)
+                        normalize_section_image.delay(site.pk, section_key, section_data["image"])
                     messages.success(request, _("Configuração da seção salva com sucesso."))
                     return redirect("landings:dashboard_config_theme")
         elif "save_sections_order" in request.POST:
@@ -512,44 +522,9 @@ def dashboard_config_theme(request):
     first_section_key = None
 
     if site.theme:
-        theme_config = site.theme.get_theme_config()
-        # Seções padrão que sempre devem estar disponíveis
-        default_sections = [
-            {
-                "key": "hero",
-                "name": _("Banner Principal"),
-                "icon": "fa-image",
-                "description": _("Banner principal do site"),
-            },
-            {
-                "key": "about",
-                "name": _("Sobre"),
-                "icon": "fa-user",
-                "description": _("Seção sobre você/empresa"),
-            },
-            {
-                "key": "services",
-                "name": _("Serviços"),
-                "icon": "fa-briefcase",
-                "description": _("Lista de serviços oferecidos"),
-            },
-            {
-                "key": "properties",
-                "name": _("Imóveis"),
-                "icon": "fa-home",
-                "description": _("Galeria de imóveis"),
-            },
-            {
-                "key": "contact",
-                "name": _("Contato"),
-                "icon": "fa-envelope",
-                "description": _("Formulário e informações de contato"),
-            },
-        ]
-        # Buscar seções do theme.json, se existirem
-        theme_sections = theme_config.get("sections", [])
-        # Se o theme.json não tem seções ou retornou lista vazia, usar as padrão
-        available_sections = theme_sections if theme_sections else default_sections
+        manifest = site.theme.get_manifest()
+        # Seções do theme.json ou, se o tema não declara nenhuma, as seções padrão
+        available_sections = list(manifest.sections if manifest and manifest.sections else DEFAULT_SECTIONS)
 
         # Buscar configurações existentes
         try:
@@ -563,19 +538,19 @@ def dashboard_config_theme(request):
         # Reordenar seções baseado na ordem salva
         if sections_order and len(sections_order) > 0:
             ordered_sections = []
-            section_dict = {s["key"]: s for s in available_sections}
+            section_dict = {s.key: s for s in available_sections}
             for key in sections_order:
                 if key in section_dict:
                     ordered_sections.append(section_dict[key])
             # Adicionar seções que não estão na ordem salva
             for section in available_sections:
-                if section["key"] not in sections_order:
+                if section.key not in sections_order:
                     ordered_sections.append(section)
             available_sections = ordered_sections
 
         # Criar formulário da primeira seção para exibição inicial
         if available_sections:
-            first_section_key = available_sections[0]["key"]
+            first_section_key = available_sections[0].key
             first_section_form = ThemeSectionConfigForm(site, first_section_key)
 
     context = {
@@ -609,8 +584,8 @@ def dashboard_theme_preview(request, theme_slug):
         return redirect("landings:dashboard_config_domain")
 
     # Usa o tema selecionado temporariamente para preview
-    properties = site.properties.filter(is_active=True).prefetch_related("images")
-    featured_properties = properties.filter(is_featured=True)[:6]
+    properties = get_site_cards(site)
+    featured_properties = [p for p in properties if p.is_featured][:6]
 
     template_path = theme.get_template_path("index.html")
 
@@ -709,6 +684,9 @@ def dashboard_section_config_form(request, section_key):
             sections_config[section_key] = section_data
             theme_config_obj.sections_config = sections_config
             theme_config_obj.save()
+            if image_field_name in request.FILES:
+                # Normaliza a imagem enviada em background (fila media)
+                normalize_section_image.delay(site.pk, section_key, section_data["image"])
             messages.success(request, _("Configuração salva com sucesso."))
     else:
         form = ThemeSectionConfigForm(site, section_key)
@@ -729,8 +707,8 @@ def dashboard_section_config_form(request, section_key):
 
     # Buscar seções disponíveis
     if site.theme:
-        theme_config = site.theme.get_theme_config()
-        available_sections = theme_config.get("sections", [])
+        manifest = site.theme.get_manifest()
+        available_sections = list(manifest.sections) if manifest else []
     else:
         available_sections = []
 
@@ -748,6 +726,8 @@ def dashboard_section_config_form(request, section_key):
 
 
 @require_http_methods(["GET"])
+@tenant_conditional_get
+@tenant_page_cache
 def properties_list(request):
     """
     Página pública para listar todos os imóveis do site.
@@ -767,63 +747,45 @@ def properties_list(request):
     if not site:
         raise Http404(_("Site não encontrado"))
 
-    # Busca os imóveis ativos (com prefetch para otimizar queries)
+    # Busca os imóveis ativos (as imagens da página são carregadas depois, em lote)
     # Ordena primeiro por destaque (is_featured), depois por order e data de criação
-    properties = (
-        site.properties.filter(is_active=True)
-        .prefetch_related("images")
-        .order_by("-is_featured", "order", "-created_at")
-    )
+    properties = site.properties.filter(is_active=True).order_by("-is_featured", "order", "-created_at")
 
-    # Filtros
-    property_type_filter = request.GET.get("type", "")
-    transaction_filter = request.GET.get("transaction", "")
-    city_filter = request.GET.get("city", "")
+    # Filtros (cidade, tipo, transação, quartos e faixa de preço)
+    filters = get_filters(request.GET)
     search_query = request.GET.get("q", "").strip()
 
-    if search_query:
-        from django.db.models import Q
-
-        query = (
-            Q(title__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(address__icontains=search_query)
-            | Q(neighborhood__icontains=search_query)
-        )
-        properties = properties.filter(query)
-
-    if property_type_filter:
-        properties = properties.filter(property_type=property_type_filter)
-
-    if transaction_filter:
-        properties = properties.filter(transaction_type=transaction_filter)
+    properties = apply_filters(properties, filters)
 
-    if city_filter:
-        properties = properties.filter(city=city_filter)
+    # Busca textual indexada, ordenada por relevância (sem busca, apenas desempata a ordem por pk)
+    properties = search_properties(properties, search_query)
 
-    # Lista de cidades para o filtro (antes da paginação)
-    all_properties = site.properties.filter(is_active=True)
-    cities = all_properties.values_list("city", flat=True).distinct().order_by("city")
+    # Opções dos filtros com a quantidade de imóveis (consulta agrupada, cacheada na versão do site)
+    facets = get_facets(site.pk, filters)
 
-    # Paginação
-    from django.core.paginator import Paginator
-
-    paginator = Paginator(properties, 12)
-    page_number = request.GET.get("page", 1)
-    page_obj = paginator.get_page(page_number)
+    # Paginação por cursor (sem OFFSET); sem busca, o total vem das contagens das facetas (já no cache)
+    total = count_properties(site.pk, filters) if not search_query else None
+    paginator = KeysetPaginator(properties, 12, count=total)
+    page_obj = paginator.get_page(request.GET.get(CURSOR_PARAM), request.GET.get(PAGE_PARAM))
+    # Slides de todos os cards da página com uma única query de imagens
+    page_obj.object_list = attach_card_slides(page_obj.object_list)
 
     # Template a ser usado (do tema selecionado)
-    template_path = "landings/themes/default/properties_list.html"  # Fallback
+    # Temas sem esta página usam o template do tema padrão
+    template_path = ["landings/themes/default/properties_list.html"]  # Fallback
     if site.theme:
-        template_path = site.theme.get_template_path("properties_list.html")
+        template_path.insert(0, site.theme.get_template_path("properties_list.html"))
 
     context = {
         "site": site,
         "properties": page_obj,
-        "cities": cities,
-        "property_type_filter": property_type_filter,
-        "transaction_filter": transaction_filter,
-        "city_filter": city_filter,
+        "facets": facets,
+        "cities": [option.value for option in facets["city"]],
+        "property_type_filter": filters.get("property_type", ""),
+        "transaction_filter": filters.get("transaction_type", ""),
+        "city_filter": filters.get("city", ""),
+        "bedrooms_filter": filters.get("bedrooms", ""),
+        "price_filter": filters.get("price", ""),
         "search_query": search_query,
         "theme": site.theme,
     }
@@ -832,6 +794,8 @@ def properties_list(request):
 
 
 @require_http_methods(["GET"])
+@tenant_conditional_get
+@tenant_page_cache
 def property_detail(request, pk):
     """
     Página pública para ver detalhes de um imóvel.
@@ -854,20 +818,22 @@ def property_detail(request, pk):
     # Busca o imóvel (deve pertencer ao site e estar ativo)
     property_obj = get_object_or_404(Property, pk=pk, site=site, is_active=True)
 
-    # Busca imagens adicionais
-    images = property_obj.images.all().order_by("order", "created_at")
+    # Busca imagens adicionais (galeria usa os mesmos slides dos cards)
+    images = list(property_obj.images.all().order_by("order", "created_at"))
+    property_obj.slides = build_slides(property_obj, images)
 
     # Busca imóveis relacionados (mesmo tipo, mesma cidade, excluindo o atual)
-    related_properties = (
-        site.properties.filter(is_active=True, property_type=property_obj.property_type, city=property_obj.city)
-        .exclude(pk=property_obj.pk)
-        .prefetch_related("images")[:4]
+    related_properties = attach_card_slides(
+        site.properties.filter(
+            is_active=True, property_type=property_obj.property_type, city=property_obj.city
+        ).exclude(pk=property_obj.pk)[:4]
     )
 
     # Template a ser usado (do tema selecionado)
-    template_path = "landings/themes/default/property_detail.html"  # Fallback
+    # Temas sem esta página usam o template do tema padrão
+    template_path = ["landings/themes/default/property_detail.html"]  # Fallback
     if site.theme:
-        template_path = site.theme.get_template_path("property_detail.html")
+        template_path.insert(0, site.theme.get_template_path("property_detail.html"))
 
     context: dict[str, Any] = {
         "site": site,
@@ -878,3 +844,80 @@ def property_detail(request, pk):
     }
 
     return render(request, template_path, context)
+
+
+@require_http_methods(["GET"])
+def property_feed(request, feed_format):
+    """
+    Feed dos imóveis ativos do site para portais (XML VivaReal/VRSync ou JSON).
+    Serve o arquivo pré-gerado da versão do site, sem consultar os imóveis.
+    """
+    site = getattr(request, "tenant", None)
+
+    # Se não houver tenant (acessado via /landings/), usa o site do usuário logado
+    if not site and request.user.is_authenticated:
+        site = Site.objects.filter(owner=request.user).first()
+
+    if not site or feed_format not in FEED_FORMATS:
+        raise Http404(_("Feed não encontrado"))
+
+    feed, file = open_feed(site, feed_format)
+
+    etag = f'"feed-{site.pk}-{feed_format}-{feed.version}"'
+    response = get_conditional_response(request, etag=etag, last_modified=feed.version)
+    if response is None:
+        response = FileResponse(file, content_type=FEED_FORMATS[feed_format].content_type)
+    else:
+        file.close()
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(feed.version)
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def _tenant_base_url(request) -> str:
+    """Esquema + host da requisição: o sitemap lista as URLs do host acessado (subdomínio ou domínio próprio)"""
+    return f"{request.scheme}://{request.get_host()}"
+
+
+@require_http_methods(["GET"])
+@tenant_conditional_get
+@tenant_page_cache
+def sitemap_xml(request):
+    """
+    sitemap.xml do site: página inicial, listagem e imóveis ativos com lastmod.
+    Cacheado na versão de conteúdo do site (alterações em imóveis geram um novo).
+    """
+    site = getattr(request, "tenant", None)
+    if not site:
+        raise Http404(_("Site não encontrado"))
+
+    base_url = _tenant_base_url(request)
+    site_lastmod = datetime.fromtimestamp(get_request_site_version(request), tz=UTC)
+    pages = sitemap_page_count(site)
+    page = request.GET.get("page")
+
+    if page is None and pages > 1:
+        content = build_sitemap_index(base_url, pages, site_lastmod)
+    else:
+        try:
+            page_number = int(page or 1)
+        except ValueError:
+            raise Http404(_("Página não encontrada")) from None
+        if not 1 <= page_number <= pages:
+            raise Http404(_("Página não encontrada"))
+        content = build_sitemap(site, base_url, site_lastmod, page=page_number)
+
+    return HttpResponse(content, content_type="application/xml; charset=utf-8")
+
+
+@require_http_methods(["GET"])
+@tenant_conditional_get
+@tenant_page_cache
+def robots_txt(request):
+    """robots.txt do site: aponta o sitemap e bloqueia as variações da listagem e as áreas internas"""
+    site = getattr(request, "tenant", None)
+    if not site:
+        raise Http404(_("Site não encontrado"))
+
+    return HttpResponse(build_robots(site, _tenant_base_url(request)), content_type="text/plain; charset=utf-8")
@@ -5,7 +5,7 @@ Admin do app Properties
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 
-from .models import Property, PropertyImage
+from .models import Property, PropertyImage, PropertyImport
 
 
 class PropertyImageInline(admin.TabularInline):
@@ -42,7 +42,7 @@ class PropertyAdmin(admin.ModelAdmin):
         "city",
         "created_at",
     ]
-    search_fields = ["title", "description", "address", "neighborhood", "city"]
+    search_fields = ["title", "description", "address", "neighborhood", "city", "external_id"]
     list_editable = ["is_featured", "is_active"]
     date_hierarchy = "created_at"
     inlines = [PropertyImageInline]
@@ -81,7 +81,7 @@ class PropertyAdmin(admin.ModelAdmin):
         (
             _("Configurações"),
             {
-                "fields": ("is_featured", "is_active", "order"),
+                "fields": ("is_featured", "is_active", "order", "external_id"),
             },
         ),
     )
@@ -100,3 +100,32 @@ class PropertyImageAdmin(admin.ModelAdmin):
     list_filter = ["created_at"]
     search_fields = ["property__title", "caption"]
     ordering = ["property", "order"]
+
+
+@admin.register(PropertyImport)
+class PropertyImportAdmin(admin.ModelAdmin):
+    """Admin para importações em lote (somente leitura)"""
+
+    list_display = [
+        "file_name",
+        "site",
+        "format",
+        "status",
+        "processed",
+        "created_count",
+        "updated_count",
+        "failed_count",
+        "created_at",
+    ]
+    list_filter = ["status", "format", "created_at"]
+    search_fields = ["file_name", "site__subdomain"]
+    date_hierarchy = "created_at"
+    readonly_fields = [field.name for field in PropertyImport._meta.fields]
+
+    def has_add_permission(self, request):
+        """Importações são criadas pelo dashboard ou pelo comando import_properties"""
+        return False
+
+    def get_queryset(self, request):
+        """Otimiza query"""
+        return super().get_queryset(request).select_related("site", "created_by")
@@ -11,6 +11,10 @@ class PropertiesConfig(AppConfig):
     name = "apps.properties"
     verbose_name = "Imóveis"
 
+    def ready(self):
+        """Importa signals quando o app estiver pronto"""
+        import apps.properties.signals  # noqa: F401
+
 
 
 
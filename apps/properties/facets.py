@@ -0,0 +1,282 @@
+"""
+Facetas (filtros com contagem) da listagem pública de imóveis.
+
+Uma única consulta agrupada conta os imóveis ativos do site por combinação de
+cidade, tipo, transação, faixa de quartos e faixas de preço. O resultado (poucas
+linhas por site) fica no cache dentro da versão de conteúdo do site, então é
+invalidado junto com as páginas (bump_site_version).
+
+As contagens de cada faceta consideram os demais filtros selecionados (ex: com
+"Curitiba" selecionada, a faceta de tipo conta apenas imóveis de Curitiba), o
+que é calculado em memória a partir das linhas agrupadas. A busca textual não
+entra nas contagens.
+"""
+
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Least
+from django.utils.translation import gettext as _
+from django.utils.translation import ngettext
+
+from apps.landings.page_cache import get_site_version
+
+from .models import Property
+
+logger = logging.getLogger(__name__)
+
+# Quartos: 1, 2, 3 e 4+ (0 = sem quartos, ex: terrenos e salas comerciais, fora da faceta)
+MAX_BEDROOMS_BUCKET = 4
+
+# Faixas de preço por transação: (mínimo, máximo), máximo exclusivo
+PRICE_RANGES = {
+    "sale": ((None, 200_000), (200_000, 500_000), (500_000, 1_000_000), (1_000_000, None)),
+    "rent": ((None, 1_500), (1_500, 3_000), (3_000, 5_000), (5_000, None)),
+}
+
+# Parâmetros GET aceitos pela listagem -> dimensão da faceta
+FILTER_PARAMS = {
+    "city": "city",
+    "type": "property_type",
+    "transaction": "transaction_type",
+    "bedrooms": "bedrooms",
+    "price": "price",
+}
+
+# Validade das linhas agrupadas no cache (a troca de versão do site já as invalida)
+FACETS_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+@dataclass(frozen=True)
+class FacetOption:
+    """Uma opção de filtro com a quantidade de imóveis"""
+
+    value: str
+    label: str
+    count: int
+
+
+# ------------------------------------------------------------------
+# Faixas
+# ------------------------------------------------------------------
+
+
+def _price_key(kind: str, minimum: int | None, maximum: int | None) -> str:
+    """Valor do parâmetro ?price= (ex: sale-200000-500000, rent-5000-)"""
+    return f"{kind}-{minimum or 0}-{maximum or ''}"
+
+
+def _format_price(value: int) -> str:
+    if value >= 1_000_000:
+        return f"R$ {value / 1_000_000:g} mi".replace(".", ",")
+    if value >= 10_000:
+        return f"R$ {value // 1000} mil"
+    return f"R$ {value:,}".replace(",", ".")
+
+
+def _price_label(kind: str, minimum: int | None, maximum: int | None) -> str:
+    prefix = _("Venda") if kind == "sale" else _("Aluguel")
+    if minimum is None:
+        return f"{prefix}: " + _("até %(max)s") % {"max": _format_price(maximum)}
+    if maximum is None:
+        return f"{prefix}: " + _("acima de %(min)s") % {"min": _format_price(minimum)}
+    return f"{prefix}: {_format_price(minimum)} - {_format_price(maximum)}"
+
+
+def _price_bucket(field: str, ranges: tuple) -> Case:
+    """Índice da faixa de preço do campo (NULL quando o preço não foi informado)"""
+    whens = [When(**{f"{field}__isnull": True}, then=Value(None))]
+    for index, (_minimum, maximum) in enumerate(ranges):
+        if maximum is not None:
+            whens.append(When(**{f"{field}__lt": maximum}, then=Value(index)))
+    return Case(*whens, default=Value(len(ranges) - 1), output_field=IntegerField())
+
+
+def _parse_price(value: str) -> tuple[str, int] | None:
+    """Converte ?price= em (transação, índice da faixa); valores desconhecidos são ignorados"""
+    for kind, ranges in PRICE_RANGES.items():
+        for index, (minimum, maximum) in enumerate(ranges):
+            if _price_key(kind, minimum, maximum) == value:
+                return kind, index
+    return None
+
+
+# ------------------------------------------------------------------
+# Filtros
+# ------------------------------------------------------------------
+
+
+def get_filters(params: Any) -> dict[str, str]:
+    """Filtros selecionados a partir de request.GET (apenas os preenchidos)"""
+    filters = {}
+    for param, dimension in FILTER_PARAMS.items():
+        value = (params.get(param) or "").strip()
+        if value:
+            filters[dimension] = value
+    return filters
+
+
+def apply_filters(queryset: QuerySet, filters: dict[str, str]) -> QuerySet:
+    """Aplica ao queryset os mesmos filtros usados nas contagens das facetas"""
+    if filters.get("city"):
+        queryset = queryset.filter(city=filters["city"])
+    if filters.get("property_type"):
+        queryset = queryset.filter(property_type=filters["property_type"])
+    if filters.get("transaction_type"):
+        queryset = queryset.filter(transaction_type=filters["transaction_type"])
+
+    bedrooms = filters.get("bedrooms", "")
+    if bedrooms.isdigit():
+        bucket = int(bedrooms)
+        if bucket >= MAX_BEDROOMS_BUCKET:
+            queryset = queryset.filter(bedrooms__gte=MAX_BEDROOMS_BUCKET)
+        elif bucket > 0:
+            queryset = queryset.filter(bedrooms=bucket)
+
+    price = _parse_price(filters.get("price", ""))
+    if price:
+        kind, index = price
+        minimum, maximum = PRICE_RANGES[kind][index]
+        condition = Q()
+        if minimum is not None:
+            condition &= Q(**{f"{kind}_price__gte": minimum})
+        if maximum is not None:
+            condition &= Q(**{f"{kind}_price__lt": maximum})
+        queryset = queryset.filter(condition)
+
+    return queryset
+
+
+def _row_matches(row: dict[str, Any], filters: dict[str, str], skip: str) -> bool:
+    """Mesma lógica de apply_filters, aplicada a uma linha agrupada (ignorando a faceta `skip`)"""
+    for dimension in ("city", "property_type", "transaction_type"):
+        if dimension != skip and filters.get(dimension) and row[dimension] != filters[dimension]:
+            return False
+
+    bedrooms = filters.get("bedrooms", "")
+    if skip != "bedrooms" and bedrooms.isdigit() and int(bedrooms) > 0:
+        if row["bedroom_bucket"] != min(int(bedrooms), MAX_BEDROOMS_BUCKET):
+            return False
+
+    price = _parse_price(filters.get("price", "")) if skip != "price" else None
+    if price:
+        kind, index = price
+        if row[f"{kind}_bucket"] != index:
+            return False
+
+    return True
+
+
+# ------------------------------------------------------------------
+# Contagens
+# ------------------------------------------------------------------
+
+
+def facet_queryset(site_id: int) -> QuerySet:
+    """Contagem de imóveis ativos por combinação de dimensões (1 consulta GROUP BY)"""
+    return (
+        Property.objects.filter(site_id=site_id, is_active=True)
+        .annotate(
+            bedroom_bucket=Least("bedrooms", Value(MAX_BEDROOMS_BUCKET)),
+            sale_bucket=_price_bucket("sale_price", PRICE_RANGES["sale"]),
+            rent_bucket=_price_bucket("rent_price", PRICE_RANGES["rent"]),
+        )
+        .values("city", "property_type", "transaction_type", "bedroom_bucket", "sale_bucket", "rent_bucket")
+        .annotate(total=Count("id"))
+        .order_by()
+    )
+
+
+def get_facet_rows(site_id: int) -> list[dict[str, Any]]:
+    """Linhas agrupadas do site, cacheadas na versão de conteúdo atual"""
+    key = f"facets:{site_id}:{get_site_version(site_id)}"
+    try:
+        rows = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Erro ao ler facetas do cache: {e}")
+        rows = None
+
+    if rows is None:
+        rows = list(facet_queryset(site_id))
+        try:
+            cache.set(key, rows, FACETS_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Erro ao gravar facetas no cache: {e}")
+    return rows
+
+
+def _count(rows: list[dict[str, Any]], filters: dict[str, str], dimension: str, key) -> Counter:
+    counts = Counter()
+    for row in rows:
+        if _row_matches(row, filters, skip=dimension):
+            value = key(row)
+            if value is not None:
+                counts[value] += row["total"]
+    return counts
+
+
+def count_properties(site_id: int, filters: dict[str, str]) -> int:
+    """Total de imóveis ativos com todos os filtros (sem consulta extra quando as linhas estão no cache)"""
+    return sum(row["total"] for row in get_facet_rows(site_id) if _row_matches(row, filters, skip=""))
+
+
+def _choice_options(counts: Counter, choices, selected: str | None) -> list[FacetOption]:
+    """Opções na ordem das choices do model; sem imóveis, só aparecem se estiverem selecionadas"""
+    return [
+        FacetOption(value=value, label=str(label), count=counts.get(value, 0))
+        for value, label in choices
+        if counts.get(value) or value == selected
+    ]
+
+
+def get_facets(site_id: int, filters: dict[str, str]) -> dict[str, list[FacetOption]]:
+    """
+    Facetas da listagem pública: cidade, tipo, transação, quartos e preço.
+
+    Returns:
+        Dicionário dimensão -> lista de FacetOption (value, label, count)
+    """
+    rows = get_facet_rows(site_id)
+
+    cities = _count(rows, filters, "city", lambda row: row["city"])
+    if filters.get("city"):
+        cities.setdefault(filters["city"], 0)
+
+    bedrooms = _count(rows, filters, "bedrooms", lambda row: row["bedroom_bucket"] or None)
+    bedroom_options = []
+    for bucket in range(1, MAX_BEDROOMS_BUCKET + 1):
+        if bedrooms.get(bucket) or filters.get("bedrooms") == str(bucket):
+            label = ngettext("%(count)s quarto", "%(count)s quartos", bucket) % {"count": bucket}
+            if bucket == MAX_BEDROOMS_BUCKET:
+                label = _("%(count)s+ quartos") % {"count": bucket}
+            bedroom_options.append(FacetOption(value=str(bucket), label=label, count=bedrooms.get(bucket, 0)))
+
+    price_options = []
+    for kind, ranges in PRICE_RANGES.items():
+        prices = _count(rows, filters, "price", lambda row, kind=kind: row[f"{kind}_bucket"])
+        for index, (minimum, maximum) in enumerate(ranges):
+            value = _price_key(kind, minimum, maximum)
+            if prices.get(index) or filters.get("price") == value:
+                price_options.append(
+                    FacetOption(value=value, label=_price_label(kind, minimum, maximum), count=prices.get(index, 0))
+                )
+
+    return {
+        "city": [FacetOption(value=city, label=city, count=count) for city, count in sorted(cities.items())],
+        "property_type": _choice_options(
+            _count(rows, filters, "property_type", lambda row: row["property_type"]),
+            Property.PROPERTY_TYPES,
+            filters.get("property_type"),
+        ),
+        "transaction_type": _choice_options(
+            _count(rows, filters, "transaction_type", lambda row: row["transaction_type"]),
+            Property.TRANSACTION_TYPES,
+            filters.get("transaction_type"),
+        ),
+        "bedrooms": bedroom_options,
+        "price": price_options,
+    }
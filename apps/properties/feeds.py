@@ -0,0 +1,366 @@
+"""
+Feeds de imóveis para portais (XML no padrão VivaReal/VRSync, usado também pela
+OLX/ZAP, e uma variante JSON).
+
+Os robôs dos portais consultam o feed com frequência, mas o conteúdo só muda
+quando os imóveis do site mudam. Por isso o feed não é montado a cada requisição:
+ele é gerado uma vez por versão de conteúdo do site (page_cache.get_site_version)
+e gravado no storage (feeds/<site>/<formato>-<versão>.<ext>). A view apenas lê o
+arquivo pronto, com ETag/Last-Modified da versão.
+
+A geração percorre os imóveis com iterator() (em blocos, com as imagens de cada
+bloco em uma query) e escreve o feed em partes num arquivo temporário, então a
+memória não cresce com o tamanho do site.
+
+Quando a versão muda, o arquivo anterior continua sendo servido enquanto uma
+tarefa Celery gera o novo; apenas o primeiro acesso de um site (sem nenhum
+arquivo) gera o feed durante a requisição.
+"""
+
+import json
+import logging
+import re
+import tempfile
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+from xml.etree import ElementTree
+
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch, QuerySet
+from django.utils import timezone
+
+from apps.landings.page_cache import get_site_version
+
+from .models import Property, PropertyImage
+
+logger = logging.getLogger(__name__)
+
+# Imóveis lidos por bloco (cada bloco carrega as imagens com uma query)
+FEED_CHUNK_SIZE = 500
+
+# Tempo máximo de uma geração em andamento (trava contra gerações duplicadas)
+FEED_BUILD_LOCK_TIMEOUT = 60 * 10
+
+VRSYNC_NAMESPACE = "http://www.vivareal.com/schemas/1.0/VRSync"
+
+# Tipo do imóvel -> PropertyType do VRSync
+VRSYNC_PROPERTY_TYPES = {
+    "house": "Residential / Home",
+    "apartment": "Residential / Apartment",
+    "commercial": "Commercial / Office",
+    "land": "Residential / Land Lot",
+    "farm": "Residential / Farm Ranch",
+}
+
+VRSYNC_TRANSACTION_TYPES = {
+    "sale": "For Sale",
+    "rent": "For Rent",
+    "both": "Sale/Rent",
+}
+
+# Caracteres de controle não são permitidos em XML 1.0
+INVALID_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+@dataclass(frozen=True)
+class FeedFormat:
+    """Formato de feed disponível em /feed/imoveis.<extension>"""
+
+    extension: str
+    content_type: str
+
+
+FEED_FORMATS = {
+    "xml": FeedFormat("xml", "application/xml; charset=utf-8"),
+    "json": FeedFormat("json", "application/json"),
+}
+
+
+@dataclass(frozen=True)
+class FeedFile:
+    """Arquivo de feed gravado no storage e a versão do site que ele representa"""
+
+    name: str
+    version: int
+
+
+# ------------------------------------------------------------------
+# Conteúdo
+# ------------------------------------------------------------------
+
+
+def feed_queryset(site_id: int) -> QuerySet:
+    """Imóveis ativos do site com as imagens (prefetch por bloco do iterator)"""
+    images = PropertyImage.objects.only("property_id", "image", "caption", "order").order_by("order", "created_at")
+    return (
+        Property.objects.filter(site_id=site_id, is_active=True)
+        .defer("search_vector")
+        .prefetch_related(Prefetch("images", queryset=images))
+        .order_by("pk")
+    )
+
+
+def _absolute_url(base_url: str, url: str) -> str:
+    """URLs do storage local são relativas (/media/...); no S3 já são absolutas"""
+    return url if url.startswith(("http://", "https://")) else f"{base_url}{url}"
+
+
+def _image_urls(base_url: str, property_obj: Property) -> list[str]:
+    """Imagem principal primeiro e depois as adicionais, sem repetir arquivos"""
+    names = []
+    if property_obj.main_image and "placeholder" not in property_obj.main_image.name:
+        names.append(property_obj.main_image)
+    names.extend(image.image for image in property_obj.images.all() if image.image)
+
+    urls = []
+    seen = set()
+    for file in names:
+        if file.name not in seen:
+            seen.add(file.name)
+            urls.append(_absolute_url(base_url, file.url))
+    return urls
+
+
+def _xml_text(value: Any) -> str:
+    return INVALID_XML_CHARS.sub("", str(value))
+
+
+def _sub(parent: ElementTree.Element, tag: str, value: Any = None, **attrs: str) -> ElementTree.Element:
+    element = ElementTree.SubElement(parent, tag, attrs)
+    if value is not None:
+        element.text = _xml_text(value)
+    return element
+
+
+def _vrsync_listing(base_url: str, property_obj: Property) -> ElementTree.Element:
+    """Um <Listing> do VRSync"""
+    listing = ElementTree.Element("Listing")
+    _sub(listing, "ListingID", property_obj.external_id or property_obj.pk)
+    _sub(listing, "Title", property_obj.title)
+    _sub(listing, "TransactionType", VRSYNC_TRANSACTION_TYPES[property_obj.transaction_type])
+    _sub(listing, "PublicationType", "PREMIUM" if property_obj.is_featured else "STANDARD")
+    _sub(listing, "DetailViewUrl", f"{base_url}/imovel/{property_obj.pk}/")
+
+    media = _sub(listing, "Media")
+    for index, url in enumerate(_image_urls(base_url, property_obj)):
+        attrs = {"medium": "image"}
+        if index == 0:
+            attrs["primary"] = "true"
+        _sub(media, "Item", url, **attrs)
+
+    details = _sub(listing, "Details")
+    _sub(details, "PropertyType", VRSYNC_PROPERTY_TYPES[property_obj.property_type])
+    _sub(details, "Description", property_obj.description or property_obj.title)
+    if property_obj.sale_price is not None:
+        _sub(details, "ListPrice", int(property_obj.sale_price), currency="BRL")
+    if property_obj.rent_price is not None:
+        _sub(details, "RentalPrice", int(property_obj.rent_price), currency="BRL", period="Monthly")
+    area_tag = "LotArea" if property_obj.property_type in ("land", "farm") else "LivingArea"
+    _sub(details, area_tag, int(property_obj.area), unit="square metres")
+    _sub(details, "Bedrooms", property_obj.bedrooms)
+    _sub(details, "Bathrooms", property_obj.bathrooms)
+    _sub(details, "Garage", property_obj.garage_spaces, type="Parking Space")
+
+    location = _sub(listing, "Location", displayAddress="Neighborhood")
+    _sub(location, "Country", "Brasil", abbreviation="BR")
+    _sub(location, "State", property_obj.state, abbreviation=property_obj.state)
+    _sub(location, "City", property_obj.city)
+    _sub(location, "Neighborhood", property_obj.neighborhood)
+    _sub(location, "Address", property_obj.address)
+    if property_obj.zipcode:
+        _sub(location, "PostalCode", property_obj.zipcode)
+    return listing
+
+
+def iter_xml_feed(site: Any, properties: Iterable[Property]) -> Iterator[bytes]:
+    """Feed VRSync em partes: cabeçalho, um <Listing> por imóvel e fechamento"""
+    base_url = site.get_primary_url()
+
+    header = ElementTree.Element("Header")
+    _sub(header, "Provider", "Propzy")
+    _sub(header, "Email", site.email)
+    _sub(header, "ContactName", site.business_name)
+    _sub(header, "PublishDate", timezone.now().isoformat(timespec="seconds"))
+    if site.phone:
+        _sub(header, "Telephone", site.phone)
+
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<ListingDataFeed xmlns="{VRSYNC_NAMESPACE}">\n'
+        f"{ElementTree.tostring(header, encoding='unicode')}\n<Listings>\n"
+    ).encode()
+    for property_obj in properties:
+        yield ElementTree.tostring(_vrsync_listing(base_url, property_obj), encoding="unicode").encode() + b"\n"
+    yield b"</Listings>\n</ListingDataFeed>\n"
+
+
+def _json_listing(base_url: str, property_obj: Property) -> dict[str, Any]:
+    return {
+        "id": property_obj.pk,
+        "external_id": property_obj.external_id,
+        "url": f"{base_url}/imovel/{property_obj.pk}/",
+        "title": property_obj.title,
+        "description": property_obj.description,
+        "property_type": property_obj.property_type,
+        "category": property_obj.category,
+        "transaction_type": property_obj.transaction_type,
+        "sale_price": property_obj.sale_price,
+        "rent_price": property_obj.rent_price,
+        "area": property_obj.area,
+        "bedrooms": property_obj.bedrooms,
+        "bathrooms": property_obj.bathrooms,
+        "garage_spaces": property_obj.garage_spaces,
+        "address": property_obj.address,
+        "neighborhood": property_obj.neighborhood,
+        "city": property_obj.city,
+        "state": property_obj.state,
+        "zipcode": property_obj.zipcode,
+        "is_featured": property_obj.is_featured,
+        "images": _image_urls(base_url, property_obj),
+        "updated_at": property_obj.updated_at,
+    }
+
+
+def iter_json_feed(site: Any, properties: Iterable[Property]) -> Iterator[bytes]:
+    """Feed JSON em partes: {"site": ..., "generated_at": ..., "listings": [...]}"""
+    base_url = site.get_primary_url()
+    meta = json.dumps(
+        {"site": {"name": site.business_name, "url": base_url, "email": site.email}, "generated_at": timezone.now()},
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+    )
+    yield f'{meta[:-1]}, "listings": [\n'.encode()
+    separator = b""
+    for property_obj in properties:
+        listing = json.dumps(_json_listing(base_url, property_obj), cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield separator + listing.encode()
+        separator = b",\n"
+    yield b"\n]}\n"
+
+
+FEED_GENERATORS = {
+    "xml": iter_xml_feed,
+    "json": iter_json_feed,
+}
+
+
+# ------------------------------------------------------------------
+# Arquivos
+# ------------------------------------------------------------------
+
+
+def feed_name(site_id: int, feed_format: str, version: int) -> str:
+    return f"feeds/{site_id}/{feed_format}-{version}.{FEED_FORMATS[feed_format].extension}"
+
+
+def _latest_key(site_id: int, feed_format: str) -> str:
+    return f"feed:latest:{site_id}:{feed_format}"
+
+
+def _lock_key(site_id: int, feed_format: str) -> str:
+    return f"feed:building:{site_id}:{feed_format}"
+
+
+def build_feed(site: Any, feed_format: str) -> FeedFile:
+    """
+    Gera o feed da versão atual do site (se ainda não existir) e remove os anteriores.
+
+    A versão é lida antes dos imóveis: uma alteração durante a geração avança a
+    versão e o próximo acesso gera o feed de novo.
+    """
+    version = get_site_version(site.pk)
+    name = feed_name(site.pk, feed_format, version)
+    if default_storage.exists(name):
+        return FeedFile(name, version)
+
+    properties = feed_queryset(site.pk).iterator(chunk_size=FEED_CHUNK_SIZE)
+    with tempfile.TemporaryFile() as tmp:
+        for chunk in FEED_GENERATORS[feed_format](site, properties):
+            tmp.write(chunk)
+        tmp.seek(0)
+        saved = default_storage.save(name, File(tmp))
+
+    if saved != name:
+        # Outro processo gravou a mesma versão antes (o storage renomeou a cópia)
+        default_storage.delete(saved)
+
+    try:
+        cache.set(_latest_key(site.pk, feed_format), (name, version), timeout=None)
+    except Exception as e:
+        logger.warning(f"Erro ao gravar feed atual no cache: {e}")
+    _delete_old_feeds(site.pk, feed_format, keep=name)
+    logger.info(f"✅ Feed {feed_format} do site {site.pk} gerado (versão {version})")
+    return FeedFile(name, version)
+
+
+def _delete_old_feeds(site_id: int, feed_format: str, keep: str) -> None:
+    directory = f"feeds/{site_id}"
+    try:
+        _dirs, files = default_storage.listdir(directory)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for file_name in files:
+        name = f"{directory}/{file_name}"
+        if file_name.startswith(f"{feed_format}-") and name != keep:
+            default_storage.delete(name)
+
+
+def get_feed(site: Any, feed_format: str) -> FeedFile | None:
+    """
+    Arquivo a servir para o site: o da versão atual ou, enquanto ele é gerado em
+    segundo plano, o último gerado. None quando o site ainda não tem feed.
+    """
+    version = get_site_version(site.pk)
+    name = feed_name(site.pk, feed_format, version)
+    if default_storage.exists(name):
+        return FeedFile(name, version)
+
+    try:
+        latest = cache.get(_latest_key(site.pk, feed_format))
+    except Exception as e:
+        logger.warning(f"Erro ao ler feed atual do cache: {e}")
+        latest = None
+    if latest is None or not default_storage.exists(latest[0]):
+        return None
+
+    schedule_feed_build(site.pk, feed_format)
+    return FeedFile(*latest)
+
+
+def open_feed(site: Any, feed_format: str) -> tuple[FeedFile, File]:
+    """
+    Abre o arquivo do feed para leitura. O primeiro acesso do site (nenhum
+    arquivo gerado ainda) gera o feed durante a requisição, assim como um arquivo
+    antigo removido por uma geração concluída entre a escolha e a abertura.
+    """
+    feed = get_feed(site, feed_format)
+    if feed is not None:
+        try:
+            return feed, default_storage.open(feed.name, "rb")
+        except FileNotFoundError:
+            pass
+    feed = build_feed(site, feed_format)
+    return feed, default_storage.open(feed.name, "rb")
+
+
+def schedule_feed_build(site_id: int, feed_format: str) -> None:
+    """Agenda a geração do feed (uma por vez por site e formato)"""
+    from .tasks import build_property_feed
+
+    try:
+        if not cache.add(_lock_key(site_id, feed_format), 1, FEED_BUILD_LOCK_TIMEOUT):
+            return
+    except Exception as e:
+        logger.warning(f"Erro ao travar geração do feed: {e}")
+    build_property_feed.delay(site_id, feed_format)
+
+
+def release_feed_build(site_id: int, feed_format: str) -> None:
+    try:
+        cache.delete(_lock_key(site_id, feed_format))
+    except Exception as e:
+        logger.warning(f"Erro ao liberar geração do feed: {e}")
@@ -2,8 +2,11 @@
 Forms do app Properties - Gestão de imóveis
 """
 
+import os
+
 from crispy_forms.helper import FormHelper
 from django import forms
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
 from .models import Property, PropertyImage
@@ -149,3 +152,29 @@ class PropertyImageForm(forms.ModelForm):
         self.fields["image"].label = _("Imagem")
         self.fields["caption"].label = _("Legenda")
         self.fields["order"].label = _("Ordem")
+
+
+class PropertyImportForm(forms.Form):
+    """Envio de arquivo para importação em lote (CSV ou XML VivaReal/ZAP)."""
+
+    ALLOWED_EXTENSIONS = (".csv", ".txt", ".xml")
+
+    file = forms.FileField(label=_("Arquivo"))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.helper = FormHelper()
+        self.helper.form_tag = False
+        self.fields["file"].widget.attrs.update({"class": "form-control", "accept": ",".join(self.ALLOWED_EXTENSIONS)})
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        max_size = getattr(settings, "PROPERTY_IMPORT_MAX_FILE_SIZE", 50 * 1024 * 1024)
+
+        if os.path.splitext(file.name)[1].lower() not in self.ALLOWED_EXTENSIONS:
+            raise forms.ValidationError(_("Envie um arquivo CSV ou XML (VivaReal/ZAP)."))
+        if file.size > max_size:
+            raise forms.ValidationError(
+                _("Arquivo muito grande (máximo %(max)sMB).") % {"max": max_size // (1024 * 1024)}
+            )
+        return file
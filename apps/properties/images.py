@@ -0,0 +1,156 @@
+"""
+Derivados responsivos das imagens de imóveis (Pillow).
+
+Cada imagem original gera versões de largura fixa em WebP e JPEG, gravadas no
+mesmo storage ao lado do original (ex: properties/foto.jpg ->
+properties/foto__card.webp). Os caminhos ficam em PropertyImage.variants:
+
+    {"card": {"width": 480, "height": 320, "webp": "properties/foto__card.webp",
+              "jpeg": "properties/foto__card.jpg"}, ...}
+
+A geração acontece em background, depois da normalização do original
+(tasks.normalize_property_image -> tasks.generate_property_image_variants).
+Os templates usam os helpers de srcset daqui (via property_tags).
+"""
+
+import logging
+import posixpath
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class VariantSpec:
+    """Definição de um derivado: largura fixa e, opcionalmente, altura (recorte)"""
+
+    name: str
+    width: int
+    height: int | None = None
+    quality: int = 80
+
+
+VARIANTS = (
+    VariantSpec("card", 480),
+    VariantSpec("gallery", 1200),
+    VariantSpec("hero", 1920),
+    # Open Graph: proporção 1.91:1 recomendada pelas redes sociais
+    VariantSpec("og", 1200, 630, quality=85),
+)
+
+# Derivados usados no srcset (mesma proporção do original)
+SRCSET_VARIANTS = ("card", "gallery", "hero")
+
+FORMATS = {
+    "webp": ("WEBP", ".webp"),
+    "jpeg": ("JPEG", ".jpg"),
+}
+
+
+def variant_name(original_name: str, variant: str, extension: str) -> str:
+    """Caminho do derivado ao lado do original (properties/foto.jpg -> properties/foto__card.webp)"""
+    root, _ = posixpath.splitext(original_name)
+    return f"{root}__{variant}{extension}"
+
+
+def _resize(image: Image.Image, spec: VariantSpec) -> Image.Image:
+    """Redimensiona sem ampliar; com altura definida, recorta centralizado"""
+    if spec.height:
+        return ImageOps.fit(image, (spec.width, spec.height), Image.Resampling.LANCZOS)
+    if image.width <= spec.width:
+        return image.copy()
+    height = round(image.height * spec.width / image.width)
+    return image.resize((spec.width, height), Image.Resampling.LANCZOS)
+
+
+def _encode(image: Image.Image, pil_format: str, quality: int) -> bytes:
+    buffer = BytesIO()
+    if pil_format == "JPEG":
+        image = image.convert("RGB")
+        image.save(buffer, pil_format, quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, pil_format, quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def _save(name: str, content: bytes, storage=default_storage) -> str:
+    """Grava o derivado substituindo uma versão anterior com o mesmo nome"""
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(content))
+
+
+def generate_variants(original_name: str, storage=default_storage) -> dict[str, dict[str, Any]]:
+    """
+    Gera todos os derivados de uma imagem e retorna o mapa de variants.
+
+    Raises:
+        OSError / PIL.UnidentifiedImageError: arquivo ausente ou não é uma imagem válida
+    """
+    with storage.open(original_name, "rb") as f:
+        with Image.open(f) as source:
+            source = ImageOps.exif_transpose(source)
+            if source.mode not in ("RGB", "RGBA"):
+                source = source.convert("RGBA" if "transparency" in source.info else "RGB")
+            source.load()
+
+    variants = {}
+    for spec in VARIANTS:
+        resized = _resize(source, spec)
+        entry = {"width": resized.width, "height": resized.height}
+        for key, (pil_format, extension) in FORMATS.items():
+            content = _encode(resized, pil_format, spec.quality)
+            entry[key] = _save(variant_name(original_name, spec.name, extension), content, storage)
+        variants[spec.name] = entry
+    return variants
+
+
+def delete_variants(variants: dict[str, Any] | None, storage=default_storage) -> None:
+    """Remove do storage os arquivos derivados de uma imagem"""
+    for entry in (variants or {}).values():
+        for key in FORMATS:
+            name = entry.get(key)
+            if not name:
+                continue
+            try:
+                storage.delete(name)
+            except Exception as e:
+                logger.warning(f"Erro ao remover derivado {name}: {e}")
+
+
+def variant_url(variants: dict[str, Any] | None, variant: str, image_format: str = "jpeg") -> str:
+    """URL de um derivado ou string vazia se ainda não foi gerado"""
+    name = ((variants or {}).get(variant) or {}).get(image_format)
+    return default_storage.url(name) if name else ""
+
+
+def build_srcset(variants: dict[str, Any] | None, image_format: str = "jpeg") -> str:
+    """Monta o atributo srcset (ex: "a.webp 480w, b.webp 1200w") com os derivados disponíveis"""
+    candidates = []
+    seen_widths = set()
+    for variant in SRCSET_VARIANTS:
+        entry = (variants or {}).get(variant)
+        if not entry or not entry.get(image_format) or entry["width"] in seen_widths:
+            continue
+        # Originais pequenos geram derivados de mesma largura: evita candidatos duplicados
+        seen_widths.add(entry["width"])
+        candidates.append(f"{default_storage.url(entry[image_format])} {entry['width']}w")
+    return ", ".join(candidates)
+
+
+def responsive_attrs(variants: dict[str, Any] | None) -> dict[str, str]:
+    """Atributos responsivos de um slide (vazios enquanto os derivados não existirem)"""
+    if not variants:
+        return {}
+    return {
+        "src": variant_url(variants, "card"),
+        "srcset": build_srcset(variants, "jpeg"),
+        "webp_srcset": build_srcset(variants, "webp"),
+        "og": variant_url(variants, "og"),
+    }
@@ -0,0 +1,786 @@
+"""
+Importação em lote de imóveis: CSV e XML de portais (VivaReal/VRSync e ZAP).
+
+Imobiliárias migrando para o Propzy trazem milhares de imóveis. O arquivo é lido
+em streaming (csv.reader / ElementTree.iterparse, liberando cada anúncio depois
+de processado), então o consumo de memória não depende do tamanho do arquivo.
+
+Cada registro é convertido para os campos do PropertyForm e validado com as
+mesmas regras do cadastro manual. Os registros válidos são gravados em lotes
+(settings.PROPERTY_IMPORT_BATCH_SIZE) com bulk_create/bulk_update: o código
+externo (Property.external_id) identifica imóveis já importados, que são
+atualizados em vez de duplicados. As fotos novas do lote são baixadas em
+paralelo (threads) antes da transação e normalizadas depois na fila "media".
+
+A importação roda em fatias de tempo (apps.properties.tasks.process_property_import):
+o progresso (`processed`) é gravado na mesma transação de cada lote, então uma
+fatia interrompida (timeout, worker reiniciado) continua do último lote gravado.
+
+bulk_create/bulk_update não disparam signals: o snapshot da listagem é
+recalculado e o cache de página invalidado ao fim de cada fatia.
+"""
+
+import copy
+import csv
+import io
+import ipaddress
+import logging
+import os
+import re
+import socket
+import time
+import unicodedata
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, BinaryIO
+from xml.etree import ElementTree
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from PIL import Image
+
+from apps.administration.stats import PROPERTIES, adjust_stat, refresh_site_active_properties
+from apps.core.utils import invalidate_site_onboarding
+from apps.landings.page_cache import bump_site_version
+
+from .forms import PropertyForm
+from .models import Property, PropertyImage, PropertyImport
+from .snapshots import rebuild_site_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Bytes lidos do início do arquivo para detectar formato e codificação
+SAMPLE_SIZE = 64 * 1024
+
+# Máximo de erros guardados na importação (os demais são apenas contados)
+MAX_STORED_ERRORS = 200
+
+# Campos gravados no bulk_update (os mesmos do formulário de cadastro)
+UPDATE_FIELDS = [*PropertyForm.Meta.fields, "updated_at"]
+
+# Colunas aceitas no CSV (cabeçalho normalizado: minúsculas, sem acentos, "_" no lugar de espaços)
+CSV_COLUMNS = {
+    "external_id": ("codigo", "cod", "codigo_imovel", "referencia", "ref", "external_id", "id"),
+    "title": ("titulo", "title", "nome"),
+    "description": ("descricao", "description", "observacao", "observacoes"),
+    "property_type": ("tipo", "tipo_imovel", "tipo_de_imovel", "property_type"),
+    "category": ("categoria", "category"),
+    "transaction_type": ("transacao", "finalidade", "negocio", "transaction_type"),
+    "price": ("preco", "valor", "price"),
+    "sale_price": ("preco_venda", "preco_de_venda", "valor_venda", "valor_de_venda", "sale_price"),
+    "rent_price": ("preco_aluguel", "preco_de_aluguel", "valor_aluguel", "valor_locacao", "aluguel", "rent_price"),
+    "bedrooms": ("quartos", "dormitorios", "bedrooms"),
+    "bathrooms": ("banheiros", "bathrooms"),
+    "garage_spaces": ("vagas", "vagas_garagem", "garagem", "garage_spaces"),
+    "area": ("area", "area_m2", "area_util", "area_privativa", "area_construida", "area_total"),
+    "address": ("endereco", "logradouro", "rua", "address"),
+    "number": ("numero", "number"),
+    "neighborhood": ("bairro", "neighborhood"),
+    "city": ("cidade", "municipio", "city"),
+    "state": ("estado", "uf", "state"),
+    "zipcode": ("cep", "zipcode"),
+    "is_featured": ("destaque", "is_featured"),
+    "is_active": ("ativo", "is_active"),
+    "images": ("imagens", "fotos", "images", "photos"),
+}
+CSV_ALIASES = {alias: key for key, aliases in CSV_COLUMNS.items() for alias in aliases}
+
+# Palavras (normalizadas) que identificam o tipo do imóvel, em ordem de prioridade
+PROPERTY_TYPE_WORDS = (
+    ("farm", {"fazenda", "sitio", "chacara", "rural", "farm", "ranch", "agricultural"}),
+    ("land", {"terreno", "lote", "land", "lot"}),
+    ("apartment", {"apartamento", "apto", "cobertura", "flat", "kitnet", "kitnete", "studio", "loft", "apartment"}),
+    ("house", {"casa", "sobrado", "residencia", "house", "home", "condo", "village"}),
+    ("commercial", {"comercial", "sala", "loja", "galpao", "predio", "consultorio", "commercial", "office"}),
+)
+
+SALE_WORDS = {"venda", "sale", "vende", "compra"}
+RENT_WORDS = {"aluguel", "locacao", "rent", "aluga", "temporada"}
+
+TRUE_VALUES = {"1", "s", "sim", "y", "yes", "true", "x", "verdadeiro"}
+FALSE_VALUES = {"0", "n", "nao", "no", "false", "falso"}
+
+STATES = {
+    "acre": "AC", "alagoas": "AL", "amapa": "AP", "amazonas": "AM", "bahia": "BA", "ceara": "CE",
+    "distrito_federal": "DF", "espirito_santo": "ES", "goias": "GO", "maranhao": "MA", "mato_grosso": "MT",
+    "mato_grosso_do_sul": "MS", "minas_gerais": "MG", "para": "PA", "paraiba": "PB", "parana": "PR",
+    "pernambuco": "PE", "piaui": "PI", "rio_de_janeiro": "RJ", "rio_grande_do_norte": "RN",
+    "rio_grande_do_sul": "RS", "rondonia": "RO", "roraima": "RR", "santa_catarina": "SC", "sao_paulo": "SP",
+    "sergipe": "SE", "tocantins": "TO",
+}  # fmt: skip
+
+
+class ImportFileError(Exception):
+    """Arquivo ilegível ou em formato não suportado (a importação é encerrada com erro)"""
+
+
+@dataclass
+class ImportRecord:
+    """Um imóvel lido do arquivo, já nos campos do PropertyForm"""
+
+    line: int
+    external_id: str
+    data: dict[str, Any]
+    images: list[str] = field(default_factory=list)
+
+
+def get_batch_size() -> int:
+    return getattr(settings, "PROPERTY_IMPORT_BATCH_SIZE", 50)
+
+
+def get_max_images() -> int:
+    return getattr(settings, "PROPERTY_IMPORT_MAX_IMAGES", 20)
+
+
+# ------------------------------------------------------------------
+# Conversão de valores
+# ------------------------------------------------------------------
+
+
+def _normalize_key(value: str) -> str:
+    """'Preço de Venda' -> 'preco_de_venda'"""
+    value = unicodedata.normalize("NFKD", value).encode("ascii", "ignore").decode().lower()
+    return re.sub(r"[^a-z0-9]+", "_", value).strip("_")
+
+
+def _words(value: str) -> set[str]:
+    return set(_normalize_key(value).split("_"))
+
+
+def _parse_decimal(value: str) -> str:
+    """Aceita '350.000,00', 'R$ 1.500', '1234.56'; retorna o número no formato do form ('' se vazio)"""
+    value = re.sub(r"[^0-9,.-]", "", value or "")
+    if not value:
+        return ""
+    if "," in value and "." in value:
+        # O último separador é o decimal
+        if value.rfind(",") > value.rfind("."):
+            value = value.replace(".", "").replace(",", ".")
+        else:
+            value = value.replace(",", "")
+    elif "," in value:
+        value = value.replace(",", ".") if value.count(",") == 1 else value.replace(",", "")
+    elif value.count(".") > 1 or re.search(r"\.\d{3}$", value):
+        # '1.500' e '1.500.000': separador de milhar
+        value = value.replace(".", "")
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        return ""
+    return str(number) if number else ""
+
+
+def _parse_int(value: str) -> str:
+    digits = re.match(r"\d+", (value or "").strip())
+    return digits.group() if digits else ""
+
+
+def _parse_bool(value: str) -> bool | None:
+    value = _normalize_key(value or "")
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    return None
+
+
+def _parse_property_type(value: str) -> str:
+    words = _words(value)
+    for property_type, aliases in PROPERTY_TYPE_WORDS:
+        if words & aliases:
+            return property_type
+    return value.strip()
+
+
+def _parse_transaction_type(value: str) -> str:
+    words = _words(value)
+    sale, rent = bool(words & SALE_WORDS), bool(words & RENT_WORDS)
+    if sale and rent:
+        return "both"
+    if sale:
+        return "sale"
+    if rent:
+        return "rent"
+    return value.strip()
+
+
+def _parse_state(value: str) -> str:
+    value = (value or "").strip()
+    if len(value) == 2:
+        return value.upper()
+    return STATES.get(_normalize_key(value), value)
+
+
+def _parse_zipcode(value: str) -> str:
+    digits = re.sub(r"\D", "", value or "")
+    return f"{digits[:5]}-{digits[5:]}" if len(digits) == 8 else (value or "").strip()
+
+
+def _parse_images(value: str) -> list[str]:
+    return [url for url in re.split(r"[|;,\s]+", value or "") if url.startswith(("http://", "https://"))]
+
+
+def _clean(raw: dict[str, str]) -> tuple[dict[str, Any], list[str]]:
+    """Converte os valores lidos (texto) nos campos do PropertyForm; retorna (dados, imagens)"""
+    raw = {key: (value or "").strip() for key, value in raw.items() if isinstance(value, str)}
+    data: dict[str, Any] = {}
+
+    for key in ("title", "description", "neighborhood", "city"):
+        if raw.get(key):
+            data[key] = raw[key]
+
+    address = raw.get("address", "")
+    if address and raw.get("number"):
+        address = f"{address}, {raw['number']}"
+    if address:
+        data["address"] = address
+
+    if raw.get("state"):
+        data["state"] = _parse_state(raw["state"])
+    if raw.get("zipcode"):
+        data["zipcode"] = _parse_zipcode(raw["zipcode"])
+    if raw.get("property_type"):
+        data["property_type"] = _parse_property_type(raw["property_type"])
+    if raw.get("transaction_type"):
+        data["transaction_type"] = _parse_transaction_type(raw["transaction_type"])
+
+    for key in ("sale_price", "rent_price", "area"):
+        if raw.get(key):
+            data[key] = _parse_decimal(raw[key])
+    for key in ("bedrooms", "bathrooms", "garage_spaces"):
+        if raw.get(key):
+            data[key] = _parse_int(raw[key]) or "0"
+
+    # Coluna genérica de preço: vai para o aluguel quando o imóvel é só para alugar
+    price = _parse_decimal(raw.get("price", ""))
+    if price:
+        target = "rent_price" if data.get("transaction_type") == "rent" else "sale_price"
+        data.setdefault(target, price)
+
+    # Sem transação informada: deduz pelos preços
+    sale, rent = bool(data.get("sale_price")), bool(data.get("rent_price"))
+    if "transaction_type" not in data and (sale or rent):
+        data["transaction_type"] = "both" if sale and rent else "rent" if rent else "sale"
+
+    if data.get("property_type") == "farm" or "rural" in _words(raw.get("category", "")):
+        data["category"] = "rural"
+    elif raw.get("category") or "property_type" in data:
+        data["category"] = "urban"
+
+    for key in ("is_featured", "is_active"):
+        value = _parse_bool(raw.get(key, ""))
+        if value is not None:
+            data[key] = value
+
+    # Título ausente (comum no XML do ZAP): tipo + bairro/cidade
+    if not data.get("title") and data.get("property_type"):
+        label = dict(Property.PROPERTY_TYPES).get(data["property_type"], "")
+        place = data.get("neighborhood") or data.get("city") or ""
+        data["title"] = f"{label} - {place}" if label and place else str(label)
+
+    # Textos maiores que o campo são cortados em vez de rejeitar o imóvel
+    for key in ("title", "address", "neighborhood", "city"):
+        if key in data:
+            data[key] = data[key][: Property._meta.get_field(key).max_length]
+
+    images = raw.get("images", "")
+    return data, _parse_images(images) if images else []
+
+
+# ------------------------------------------------------------------
+# Leitura do arquivo (streaming)
+# ------------------------------------------------------------------
+
+
+class CountingReader(io.RawIOBase):
+    """Envolve o arquivo do storage contando os bytes lidos (progresso da importação)"""
+
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self.raw.read(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+
+
+def detect_format(sample: bytes) -> str:
+    """Formato pelo início do arquivo: XML VivaReal (ListingDataFeed), XML ZAP (Carga) ou CSV"""
+    text = sample.lstrip(b"\xef\xbb\xbf \t\r\n")
+    if not text.startswith(b"<"):
+        return "csv"
+    # Primeira tag que não é declaração (<?xml), comentário ou DOCTYPE
+    match = re.search(rb"<(?![?!])(?:[\w.-]+:)?([\w.-]+)", text)
+    root = match.group(1).decode() if match else ""
+    if root == "ListingDataFeed":
+        return "vivareal"
+    if root == "Carga":
+        return "zap"
+    raise ImportFileError(_("Formato XML não reconhecido (esperado VivaReal/VRSync ou ZAP)."))
+
+
+def _detect_encoding(sample: bytes) -> str:
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Amostra cortada no meio de um caractere UTF-8 não indica outra codificação
+        if e.start < len(sample) - 3:
+            return "cp1252"
+    return "utf-8-sig"
+
+
+def iter_csv(stream: io.RawIOBase, sample: bytes) -> Iterator[ImportRecord]:
+    """Registros de um CSV (separador detectado: vírgula, ponto e vírgula, tab ou barra vertical)"""
+    encoding = _detect_encoding(sample)
+    text = io.TextIOWrapper(io.BufferedReader(stream), encoding=encoding, errors="replace", newline="")
+    first_line = sample.decode(encoding, errors="replace").splitlines()[0] if sample.strip() else ""
+    delimiter = max(",;\t|", key=first_line.count)
+
+    reader = csv.reader(text, delimiter=delimiter)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return
+    columns = [CSV_ALIASES.get(_normalize_key(name)) for name in header]
+    if "title" not in columns and "property_type" not in columns:
+        raise ImportFileError(_("Cabeçalho do CSV sem as colunas de título ou tipo do imóvel."))
+
+    try:
+        for row in reader:
+            if not any(value.strip() for value in row):
+                continue
+            raw = {key: value for key, value in zip(columns, row, strict=False) if key}
+            data, images = _clean(raw)
+            yield ImportRecord(reader.line_num, raw.get("external_id", "").strip()[:100], data, images)
+    except csv.Error as e:
+        raise ImportFileError(
+            _("CSV inválido na linha %(line)s: %(error)s") % {"line": reader.line_num, "error": e}
+        ) from e
+
+
+def _iter_elements(stream: io.RawIOBase, tag: str) -> Iterator[ElementTree.Element]:
+    """
+    Percorre o XML em streaming entregando cada elemento `tag` completo.
+
+    Os namespaces são removidos das tags e cada elemento entregue é retirado da
+    árvore em seguida, mantendo a memória constante em arquivos grandes.
+    """
+    parents: list[ElementTree.Element] = []
+    try:
+        for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                parents.append(element)
+                continue
+            parents.pop()
+            element.tag = element.tag.rpartition("}")[2]
+            if element.tag == tag:
+                yield element
+                if parents:
+                    parents[-1].remove(element)
+    except ElementTree.ParseError as e:
+        raise ImportFileError(_("XML inválido: %(error)s") % {"error": e}) from e
+
+
+def _text(element: ElementTree.Element, path: str) -> str:
+    found = element.find(path)
+    return (found.text or "").strip() if found is not None else ""
+
+
+def iter_vivareal(stream: io.RawIOBase) -> Iterator[ImportRecord]:
+    """Registros do XML VivaReal (VRSync: ListingDataFeed/Listings/Listing)"""
+    for index, listing in enumerate(_iter_elements(stream, "Listing"), start=1):
+        location = listing.find("Location")
+        state = location.find("State") if location is not None else None
+        raw = {
+            "external_id": _text(listing, "ListingID"),
+            "title": _text(listing, "Title"),
+            "transaction_type": _text(listing, "TransactionType"),
+            "property_type": _text(listing, "Details/PropertyType"),
+            "description": _text(listing, "Details/Description"),
+            "sale_price": _text(listing, "Details/ListPrice"),
+            "rent_price": _text(listing, "Details/RentalPrice"),
+            "area": _text(listing, "Details/LivingArea") or _text(listing, "Details/LotArea"),
+            "bedrooms": _text(listing, "Details/Bedrooms"),
+            "bathrooms": _text(listing, "Details/Bathrooms"),
+            "garage_spaces": _text(listing, "Details/Garage"),
+            "address": _text(listing, "Location/Address"),
+            "number": _text(listing, "Location/StreetNumber"),
+            "neighborhood": _text(listing, "Location/Neighborhood"),
+            "city": _text(listing, "Location/City"),
+            "state": (state.get("abbreviation") or state.text or "") if state is not None else "",
+            "zipcode": _text(listing, "Location/PostalCode"),
+        }
+        # "Sale/Rent" não tem palavras em português
+        if raw["transaction_type"].lower() == "sale/rent":
+            raw["transaction_type"] = "venda aluguel"
+
+        media = sorted(
+            (item for item in listing.iterfind("Media/Item") if item.get("medium", "image") == "image"),
+            key=lambda item: item.get("primary") != "true",
+        )
+        raw["images"] = " ".join((item.text or "").strip() for item in media)
+
+        data, images = _clean(raw)
+        yield ImportRecord(index, raw["external_id"][:100], data, images)
+
+
+def iter_zap(stream: io.RawIOBase) -> Iterator[ImportRecord]:
+    """Registros do XML ZAP (Carga/Imoveis/Imovel)"""
+    for index, listing in enumerate(_iter_elements(stream, "Imovel"), start=1):
+        raw = {
+            "external_id": _text(listing, "CodigoImovel"),
+            "title": _text(listing, "TituloImovel"),
+            "property_type": f"{_text(listing, 'TipoImovel')} {_text(listing, 'SubTipoImovel')}",
+            "category": _text(listing, "CategoriaImovel"),
+            "description": _text(listing, "Observacao"),
+            "sale_price": _text(listing, "PrecoVenda"),
+            "rent_price": _text(listing, "PrecoLocacao"),
+            "area": _text(listing, "AreaUtil") or _text(listing, "AreaTotal"),
+            "bedrooms": _text(listing, "QtdDormitorios"),
+            "bathrooms": _text(listing, "QtdBanheiros"),
+            "garage_spaces": _text(listing, "QtdVagas"),
+            "address": _text(listing, "Endereco"),
+            "number": _text(listing, "Numero"),
+            "neighborhood": _text(listing, "Bairro"),
+            "city": _text(listing, "Cidade"),
+            "state": _text(listing, "UF"),
+            "zipcode": _text(listing, "CEP"),
+        }
+        photos = sorted(listing.iterfind("Fotos/Foto"), key=lambda photo: _text(photo, "Principal") != "1")
+        raw["images"] = " ".join(_text(photo, "URLArquivo") for photo in photos)
+
+        data, images = _clean(raw)
+        yield ImportRecord(index, raw["external_id"][:100], data, images)
+
+
+def iter_records(file_format: str, stream: io.RawIOBase, sample: bytes) -> Iterator[ImportRecord]:
+    if file_format == "vivareal":
+        return iter_vivareal(stream)
+    if file_format == "zap":
+        return iter_zap(stream)
+    return iter_csv(stream, sample)
+
+
+# ------------------------------------------------------------------
+# Download das imagens
+# ------------------------------------------------------------------
+
+
+class ImageDownloadError(Exception):
+    """Imagem do feed inacessível ou inválida (o imóvel é importado sem ela)"""
+
+
+def _check_public_host(url: str) -> None:
+    """Bloqueia URLs para a rede interna (o worker não deve acessar serviços privados)"""
+    parsed = urllib.parse.urlsplit(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ImageDownloadError(_("URL inválida"))
+    try:
+        addresses = socket.getaddrinfo(parsed.hostname, parsed.port or 443, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError) as e:
+        raise ImageDownloadError(_("Host não encontrado")) from e
+    for *_info, sockaddr in addresses:
+        if not ipaddress.ip_address(sockaddr[0]).is_global:
+            raise ImageDownloadError(_("Endereço não permitido"))
+
+
+class _PublicRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Aplica a mesma verificação de host aos redirecionamentos"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        _check_public_host(newurl)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+_opener = urllib.request.build_opener(_PublicRedirectHandler)
+
+
+def download_image(url: str) -> str:
+    """Baixa uma imagem do feed e grava no storage; retorna o nome do arquivo"""
+    max_size = getattr(settings, "CHUNKED_UPLOAD_MAX_FILE_SIZE", 10 * 1024 * 1024)
+    timeout = getattr(settings, "PROPERTY_IMPORT_IMAGE_TIMEOUT", 15)
+
+    _check_public_host(url)
+    request = urllib.request.Request(url, headers={"User-Agent": "Propzy-Importer/1.0"})
+    try:
+        with _opener.open(request, timeout=timeout) as response:
+            if not response.headers.get_content_type().startswith("image/"):
+                raise ImageDownloadError(_("Conteúdo não é uma imagem"))
+            content = response.read(max_size + 1)
+    except (urllib.error.URLError, OSError, ValueError) as e:
+        raise ImageDownloadError(str(getattr(e, "reason", e))) from e
+    if len(content) > max_size:
+        raise ImageDownloadError(_("Imagem maior que o limite"))
+
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image.verify()
+            extension = (image.format or "jpeg").lower().replace("jpeg", "jpg")
+    except Exception as e:
+        raise ImageDownloadError(_("Arquivo não é uma imagem válida")) from e
+
+    basename = os.path.splitext(os.path.basename(urllib.parse.urlsplit(url).path))[0][:50] or uuid.uuid4().hex[:12]
+    name = PropertyImage._meta.get_field("image").generate_filename(None, f"{basename}.{extension}")
+    return default_storage.save(name, ContentFile(content))
+
+
+def download_images(urls: list[str]) -> list[str | ImageDownloadError]:
+    """
+    Baixa as imagens em paralelo; retorna, na ordem das URLs, o nome gravado (ou o erro).
+
+    URLs repetidas são baixadas de novo: cada PropertyImage precisa do próprio
+    arquivo, já que a normalização substitui e apaga o original.
+    """
+    workers = getattr(settings, "PROPERTY_IMPORT_IMAGE_WORKERS", 8)
+    if not urls:
+        return []
+
+    def _fetch(url: str) -> str | ImageDownloadError:
+        try:
+            return download_image(url)
+        except ImageDownloadError as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(urls))) as executor:
+        return list(executor.map(_fetch, urls))
+
+
+# ------------------------------------------------------------------
+# Gravação
+# ------------------------------------------------------------------
+
+
+def _form_errors(form: PropertyForm) -> str:
+    messages = []
+    for name, errors in form.errors.items():
+        label = form.fields[name].label if name in form.fields else ""
+        messages.extend(f"{label}: {error}" if label else str(error) for error in errors)
+    return "; ".join(messages)
+
+
+def validate_record(record: ImportRecord, site_id: int, instance: Property | None) -> tuple[Property | None, str]:
+    """
+    Valida o registro com o PropertyForm sobre o imóvel existente (campos ausentes
+    no arquivo mantêm o valor atual). Retorna (imóvel não salvo, erros).
+    """
+    if instance is not None:
+        data = {name: getattr(instance, name) for name in PropertyForm.Meta.fields}
+        # O form altera a instância mesmo quando inválido
+        instance = copy.copy(instance)
+    else:
+        instance = Property(site_id=site_id, external_id=record.external_id)
+        # Contagens ausentes no arquivo (ex: vagas) ficam com o padrão do model (0)
+        data = {name: getattr(instance, name) for name in ("bedrooms", "bathrooms", "garage_spaces", "is_active")}
+    data.update({key: value for key, value in record.data.items() if value != ""})
+
+    form = PropertyForm(data=data, instance=instance)
+    if not form.is_valid():
+        return None, _form_errors(form)
+    return form.save(commit=False), ""
+
+
+def import_batch(job: PropertyImport, records: list[ImportRecord], bytes_read: int) -> None:
+    """
+    Valida e grava um lote de registros (upsert pelo código externo) e as imagens novas.
+
+    O progresso da importação é atualizado na mesma transação, o que torna a
+    importação retomável sem duplicar imóveis.
+    """
+    site_id = job.site_id
+    external_ids = {record.external_id for record in records if record.external_id}
+    existing = {p.external_id: p for p in Property.objects.filter(site_id=site_id, external_id__in=external_ids)}
+
+    # Último registro de cada código vence (códigos repetidos no mesmo lote)
+    planned: dict[str, tuple[Property, ImportRecord]] = {}
+    errors = []
+    for record in records:
+        key = record.external_id or f"#{record.line}"
+        base = planned[key][0] if key in planned else existing.get(record.external_id)
+        property_obj, error = validate_record(record, site_id, base)
+        if property_obj is None:
+            errors.append({"line": record.line, "external_id": record.external_id, "error": error})
+        else:
+            planned[key] = (property_obj, record)
+
+    # Fotos ainda não importadas (URL de origem já gravada no imóvel é ignorada)
+    max_images = get_max_images()
+    existing_ids = [property_obj.pk for property_obj, _record in planned.values() if property_obj.pk]
+    known = set(
+        PropertyImage.objects.filter(property_id__in=existing_ids)
+        .exclude(source_url="")
+        .values_list("property_id", "source_url")
+    )
+    wanted: dict[str, list[str]] = {}
+    for key, (property_obj, record) in planned.items():
+        urls = [url for url in dict.fromkeys(record.images) if (property_obj.pk, url) not in known]
+        wanted[key] = urls[:max_images]
+    pairs = [(key, url) for key, urls in wanted.items() for url in urls]
+    downloaded = download_images([url for _key, url in pairs])
+
+    stored_names = [name for name in downloaded if isinstance(name, str)]
+    new_images: dict[str, list[tuple[str, str]]] = {key: [] for key in wanted}
+    for (key, url), result in zip(pairs, downloaded, strict=True):
+        if isinstance(result, str):
+            new_images[key].append((url, result))
+        else:
+            record = planned[key][1]
+            errors.append({"line": record.line, "external_id": record.external_id, "error": f"{url}: {result}"})
+
+    to_create = [(key, property_obj) for key, (property_obj, _record) in planned.items() if not property_obj.pk]
+    to_update = [property_obj for property_obj, _record in planned.values() if property_obj.pk]
+    for key, property_obj in to_create:
+        if new_images[key]:
+            property_obj.main_image = new_images[key][0][1]
+
+    try:
+        with transaction.atomic():
+            Property.objects.bulk_create([property_obj for _key, property_obj in to_create])
+            now = timezone.now()
+            for property_obj in to_update:
+                property_obj.updated_at = now
+            Property.objects.bulk_update(to_update, UPDATE_FIELDS)
+
+            # Novas imagens continuam a ordem das existentes
+            last_orders = dict(
+                PropertyImage.objects.filter(property_id__in=[p.pk for p in to_update])
+                .values("property_id")
+                .annotate(last_order=Max("order"))
+                .values_list("property_id", "last_order")
+            )
+            images = []
+            for key, (property_obj, _record) in planned.items():
+                last_order = last_orders.get(property_obj.pk) or 0
+                images.extend(
+                    PropertyImage(property_id=property_obj.pk, image=name, source_url=url, order=last_order + index)
+                    for index, (url, name) in enumerate(new_images[key], start=1)
+                )
+            images = PropertyImage.objects.bulk_create(images)
+
+            # Imóveis existentes sem imagem principal recebem a primeira foto nova
+            for property_obj in to_update:
+                key = property_obj.external_id
+                if new_images.get(key) and not property_obj.main_image:
+                    Property.objects.filter(Q(main_image="") | Q(main_image__isnull=True), pk=property_obj.pk).update(
+                        main_image=new_images[key][0][1]
+                    )
+
+            stored_errors = (job.errors + errors)[:MAX_STORED_ERRORS]
+            PropertyImport.objects.filter(pk=job.pk).update(
+                processed=F("processed") + len(records),
+                bytes_read=bytes_read,
+                created_count=F("created_count") + len(to_create),
+                updated_count=F("updated_count") + len(to_update),
+                failed_count=F("failed_count") + len(records) - len(planned),
+                images_count=F("images_count") + len(images),
+                errors=stored_errors,
+                updated_at=timezone.now(),
+            )
+    except BaseException:
+        for name in stored_names:
+            default_storage.delete(name)
+        raise
+
+    job.refresh_from_db()
+
+    # bulk_create/bulk_update não disparam signals: contadores do dashboard administrativo
+    adjust_stat(PROPERTIES, len(to_create))
+    refresh_site_active_properties(job.site_id)
+
+    # Normalização (e derivados) das fotos novas na fila "media"
+    from .tasks import normalize_property_image
+
+    image_ids = [image.pk for image in images]
+    transaction.on_commit(lambda: [normalize_property_image.delay(image_id) for image_id in image_ids])
+
+
+def _refresh_listing(site_id: int) -> None:
+    """bulk_create/bulk_update não disparam signals: recalcula o snapshot e invalida as páginas e o onboarding"""
+    try:
+        rebuild_site_snapshot(site_id)
+    except Exception as e:
+        logger.error(f"Erro ao recalcular snapshot do site {site_id} após importação: {e}")
+    bump_site_version(site_id)
+    invalidate_site_onboarding(site_id)
+
+
+def fail_import(job: PropertyImport, message: str) -> None:
+    job.status = "failed"
+    job.message = message
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "message", "finished_at", "updated_at"])
+    if job.file:
+        job.file.delete(save=False)
+
+
+def run_import(job: PropertyImport, time_budget: float | None = None) -> bool:
+    """
+    Processa a importação a partir do último lote gravado.
+
+    Args:
+        job: Importação (pending ou running)
+        time_budget: Segundos desta execução; ao esgotar, para após o lote atual
+
+    Returns:
+        True se o arquivo foi processado até o fim
+    """
+    deadline = time.monotonic() + time_budget if time_budget else None
+    batch_size = get_batch_size()
+
+    if job.status == "pending":
+        job.status = "running"
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "updated_at"])
+
+    try:
+        with job.file.open("rb") as f:
+            sample = f.read(SAMPLE_SIZE)
+            f.seek(0)
+            if not job.format:
+                job.format = detect_format(sample)
+                job.save(update_fields=["format", "updated_at"])
+
+            stream = CountingReader(f)
+            skip = job.processed
+            batch: list[ImportRecord] = []
+            for record in iter_records(job.format, stream, sample):
+                if skip:
+                    skip -= 1
+                    continue
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    import_batch(job, batch, stream.bytes_read)
+                    batch = []
+                    if deadline and time.monotonic() > deadline:
+                        return False
+            if batch:
+                import_batch(job, batch, stream.bytes_read)
+    finally:
+        _refresh_listing(job.site_id)
+
+    job.status = "completed"
+    job.bytes_read = job.file_size
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "bytes_read", "finished_at", "updated_at"])
+    job.file.delete(save=False)
+    logger.info(
+        f"✅ Importação {job.pk} concluída: {job.created_count} criados, {job.updated_count} atualizados, "
+        f"{job.failed_count} com erro, {job.images_count} imagens"
+    )
+    return True
@@ -0,0 +1,196 @@
+"""
+Comando Django para verificar o plano de execução das consultas mais frequentes de imóveis.
+
+Executa EXPLAIN em cada consulta "quente" (listagem pública, paginação por cursor,
+dashboard, snapshot, relacionados, imagens dos cards, busca textual, importação) exatamente como
+as views a montam e falha se alguma delas fizer leitura sequencial (seq scan) das tabelas de imóveis.
+Consultas que precisam ordenar o resultado em memória (a ordem não vem do índice)
+são apenas sinalizadas.
+
+No PostgreSQL o EXPLAIN roda com enable_seqscan = off: em bancos pequenos o
+planejador prefere seq scan mesmo com índice, então a verificação é se existe um
+índice capaz de atender a consulta. No SQLite usa EXPLAIN QUERY PLAN.
+
+Uso:
+    python manage.py explain_property_queries                  # Usa o primeiro site
+    python manage.py explain_property_queries --site fulano    # Site específico (subdomínio)
+    python manage.py explain_property_queries --verbose        # Exibe os planos completos
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.landings.models import Site
+from apps.properties.facets import facet_queryset
+from apps.properties.models import Property, PropertyImage
+from apps.properties.search import search_properties
+
+# Tabelas que não podem ser lidas sequencialmente nas consultas quentes
+CHECKED_TABLES = (Property._meta.db_table, PropertyImage._meta.db_table)
+
+# Consultas em que a ordenação em memória é esperada: IN (...) de vários imóveis
+# (poucas linhas) e o GROUP BY das facetas
+SORT_EXPECTED = ("cards: imagens da página", "público: contagens das facetas")
+
+
+class Command(BaseCommand):
+    """Comando para verificar o uso de índices nas consultas de imóveis"""
+
+    help = "Executa EXPLAIN nas consultas frequentes de imóveis e falha se alguma fizer seq scan"
+
+    def add_arguments(self, parser):
+        """Adiciona argumentos ao comando"""
+        parser.add_argument(
+            "--site",
+            type=str,
+            help="Subdomínio do site usado nos parâmetros (padrão: primeiro site)",
+        )
+        parser.add_argument(
+            "--verbose",
+            action="store_true",
+            help="Exibe o plano completo de cada consulta",
+        )
+
+    def handle(self, *args, **options):
+        """Executa o comando"""
+        site_id = self._get_site_id(options.get("site"))
+        queries = self._hot_queries(site_id)
+
+        self.stdout.write(self.style.SUCCESS(f"\n🔎 Planos de execução ({connection.vendor})\n"))
+
+        failures = []
+        for name, queryset in queries:
+            sql, params = queryset.query.sql_with_params()
+            plan, scans, sorted_in_memory = self._explain(sql, params)
+            sorted_in_memory = sorted_in_memory and name not in SORT_EXPECTED
+
+            if scans:
+                failures.append(f"{name}: seq scan em {', '.join(sorted(scans))}")
+                self.stdout.write(self.style.ERROR(f"  ❌ {name}"))
+            elif sorted_in_memory:
+                self.stdout.write(self.style.WARNING(f"  ⚠️  {name} (ordenação fora do índice)"))
+            else:
+                self.stdout.write(f"  ✅ {name}")
+
+            if options["verbose"] or scans:
+                for line in plan:
+                    self.stdout.write(f"       {line}")
+
+        if failures:
+            raise CommandError("Consultas sem índice:\n  " + "\n  ".join(failures))
+
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {len(queries)} consultas usam índices\n"))
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _get_site_id(self, subdomain: str | None) -> int:
+        sites = Site.objects.order_by("pk")
+        if subdomain:
+            sites = sites.filter(subdomain=subdomain)
+        site_id = sites.values_list("pk", flat=True).first()
+        if site_id is None:
+            if subdomain:
+                raise CommandError(f"Site não encontrado: {subdomain}")
+            # Sem sites cadastrados: o plano não depende dos dados
+            return 0
+        return site_id
+
+    def _hot_queries(self, site_id: int) -> list[tuple[str, QuerySet]]:
+        """Consultas montadas da mesma forma que nas views (nome, queryset)"""
+        active = Property.objects.filter(site_id=site_id, is_active=True)
+        property_ids = list(active.values_list("pk", flat=True)[:12]) or [0]
+        sample = active.values("property_type", "city").first() or {"property_type": "house", "city": ""}
+
+        public = active.order_by("-is_featured", "order", "-created_at")
+        dashboard = Property.objects.filter(site_id=site_id).order_by("order", "-created_at")
+        related = active.filter(property_type=sample["property_type"], city=sample["city"]).exclude(pk=property_ids[0])
+
+        queries = [
+            ("público: listagem /imoveis/", search_properties(public, "")[:12]),
+            (
+                # Termo mais comum da paginação por cursor (KeysetPaginator._seek)
+                "público: página seguinte (cursor)",
+                public.filter(is_featured=False, order=0, created_at__lt=timezone.now()).order_by(
+                    "-is_featured", "order", "-created_at", "-pk"
+                )[:13],
+            ),
+            ("público: listagem filtrada por cidade", search_properties(public.filter(city=sample["city"]), "")[:12]),
+            ("público: contagens das facetas", facet_queryset(site_id)),
+            ("público: imóveis relacionados", related[:4]),
+            ("snapshot: imóveis ativos do site", active),
+            ("dashboard: lista de imóveis", search_properties(dashboard, "")[:20]),
+            (
+                "cards: imagens da página",
+                PropertyImage.objects.filter(property_id__in=property_ids).order_by("order", "created_at"),
+            ),
+            ("detalhe: galeria do imóvel", PropertyImage.objects.filter(property_id=property_ids[0])),
+            (
+                # Upsert da importação em lote (importers.import_batch)
+                "importação: imóveis existentes por código",
+                Property.objects.filter(site_id=site_id, external_id__in=["REF-1", "REF-2"]),
+            ),
+        ]
+
+        if connection.vendor == "postgresql":
+            from django.contrib.postgres.search import SearchQuery
+
+            from apps.properties.search import SEARCH_CONFIG
+
+            # Mesmo filtro usado por search_properties (sem o exists(), que executaria a consulta)
+            search_query = SearchQuery("apartamento", config=SEARCH_CONFIG, search_type="websearch")
+            queries.append(("busca textual", public.filter(search_vector=search_query)[:12]))
+            queries.append(("busca por trigramas", public.filter(title__trigram_word_similar="apartamneto")[:12]))
+
+        return queries
+
+    # ------------------------------------------------------------------
+    # EXPLAIN
+    # ------------------------------------------------------------------
+
+    def _explain(self, sql: str, params) -> tuple[list[str], set[str], bool]:
+        """Retorna (linhas do plano, tabelas verificadas lidas sequencialmente, se há ordenação em memória)"""
+        if connection.vendor == "postgresql":
+            return self._explain_postgresql(sql, params)
+        if connection.vendor == "sqlite":
+            return self._explain_sqlite(sql, params)
+        raise CommandError(f"Banco não suportado: {connection.vendor}")
+
+    def _explain_postgresql(self, sql: str, params) -> tuple[list[str], set[str], bool]:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            raw = cursor.fetchone()[0]
+            cursor.execute(f"EXPLAIN {sql}", params)
+            lines = [row[0] for row in cursor.fetchall()]
+
+        plan = raw if isinstance(raw, list) else json.loads(raw)
+        scans = set()
+        sorted_in_memory = False
+        nodes = [plan[0]["Plan"]]
+        while nodes:
+            node = nodes.pop()
+            if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in CHECKED_TABLES:
+                scans.add(node["Relation Name"])
+            sorted_in_memory = sorted_in_memory or node.get("Node Type") in ("Sort", "Incremental Sort")
+            nodes.extend(node.get("Plans", []))
+        return lines, scans, sorted_in_memory
+
+    def _explain_sqlite(self, sql: str, params) -> tuple[list[str], set[str], bool]:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            details = [row[-1] for row in cursor.fetchall()]
+
+        scans = set()
+        for detail in details:
+            # "SCAN tabela" sem índice = leitura completa da tabela
+            words = detail.split()
+            if len(words) >= 2 and words[0] == "SCAN" and "INDEX" not in words and words[1] in CHECKED_TABLES:
+                scans.add(words[1])
+        sorted_in_memory = any(detail.startswith("USE TEMP B-TREE") for detail in details)
+        return details, scans, sorted_in_memory
@@ -0,0 +1,79 @@
+"""
+Comando Django para importar imóveis em lote de um arquivo CSV ou XML (VivaReal/ZAP).
+
+Imóveis com o mesmo código (external_id) no site são atualizados; os demais são criados.
+Por padrão a importação é enfileirada no Celery (fila "media"); com --sync roda no
+próprio processo, útil para cargas iniciais e depuração.
+
+Uso:
+    python manage.py import_properties fulano imoveis.csv           # Enfileira a importação
+    python manage.py import_properties fulano carga.xml --sync      # Processa imediatamente
+"""
+
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.landings.models import Site
+from apps.properties.importers import ImportFileError, fail_import, run_import
+from apps.properties.models import PropertyImport
+from apps.properties.tasks import process_property_import
+
+
+class Command(BaseCommand):
+    """Comando para importar imóveis de um arquivo"""
+
+    help = "Importa imóveis de um arquivo CSV ou XML (VivaReal/ZAP) para um site"
+
+    def add_arguments(self, parser):
+        """Adiciona argumentos ao comando"""
+        parser.add_argument("site", type=str, help="Subdomínio do site")
+        parser.add_argument("path", type=str, help="Caminho do arquivo CSV ou XML")
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Processa no próprio processo em vez de enfileirar no Celery",
+        )
+
+    def handle(self, *args, **options):
+        """Executa o comando"""
+        site = Site.objects.filter(subdomain=options["site"]).first()
+        if site is None:
+            raise CommandError(f"Site não encontrado: {options['site']}")
+
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"Arquivo não encontrado: {path}")
+
+        file_name = os.path.basename(path)
+        with open(path, "rb") as f:
+            job = PropertyImport.objects.create(
+                site=site,
+                created_by=site.owner,
+                file=File(f, name=file_name),
+                file_name=file_name[:255],
+                file_size=os.path.getsize(path),
+            )
+
+        if not options["sync"]:
+            transaction.on_commit(lambda: process_property_import.delay(job.pk))
+            self.stdout.write(self.style.SUCCESS(f"\n✅ Importação {job.pk} enfileirada\n"))
+            return
+
+        try:
+            run_import(job)
+        except ImportFileError as e:
+            fail_import(job, str(e))
+            raise CommandError(str(e)) from e
+
+        for error in job.errors[:20]:
+            self.stdout.write(self.style.WARNING(f"  • Linha {error['line']}: {error['error']}"))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✅ Importação {job.pk} concluída: {job.created_count} criados, {job.updated_count} atualizados, "
+                f"{job.failed_count} com erro, {job.images_count} imagens\n"
+            )
+        )
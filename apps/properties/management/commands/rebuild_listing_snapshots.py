@@ -0,0 +1,44 @@
+"""
+Comando Django para recalcular o snapshot da listagem de imóveis dos sites.
+
+Útil após alterações em massa feitas sem signals (ex: QuerySet.update()).
+
+Uso:
+    python manage.py rebuild_listing_snapshots                 # Todos os sites
+    python manage.py rebuild_listing_snapshots --site fulano   # Apenas um site (subdomínio)
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.landings.models import Site
+from apps.landings.page_cache import bump_site_version
+from apps.properties.snapshots import rebuild_site_snapshot
+
+
+class Command(BaseCommand):
+    """Comando para recalcular os snapshots das listagens"""
+
+    help = "Recalcula o snapshot da listagem de imóveis dos sites"
+
+    def add_arguments(self, parser):
+        """Adiciona argumentos ao comando"""
+        parser.add_argument(
+            "--site",
+            type=str,
+            help="Subdomínio do site (deixe vazio para todos)",
+        )
+
+    def handle(self, *args, **options):
+        """Executa o comando"""
+        sites = Site.objects.all()
+        if options.get("site"):
+            sites = sites.filter(subdomain=options["site"])
+
+        total = 0
+        for site_id in sites.values_list("pk", flat=True).iterator():
+            snapshot = rebuild_site_snapshot(site_id)
+            bump_site_version(site_id)
+            total += 1
+            self.stdout.write(f"  • Site {site_id}: {len(snapshot.cards)} imóveis")
+
+        self.stdout.write(self.style.SUCCESS(f"\n✅ {total} snapshot(s) recalculado(s)\n"))
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landings', '0001_initial'),
+        ('properties', '0002_make_main_image_nullable'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteListingSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cards', models.JSONField(blank=True, default=list, verbose_name='Cards')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('site', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='listing_snapshot', to='landings.site', verbose_name='Site')),
+            ],
+            options={
+                'verbose_name': 'Snapshot da Listagem',
+                'verbose_name_plural': 'Snapshots das Listagens',
+            },
+        ),
+    ]
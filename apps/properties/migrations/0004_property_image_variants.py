@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_site_listing_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertyimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Derivados'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Configuração de busca em português sem acentos ("imóvel" encontra "imovel" e vice-versa)
+CREATE_SEARCH_CONFIG = """
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+        CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+        ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+            ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+    END IF;
+END
+$$;
+"""
+
+# Pesos: título (A), bairro/cidade (B), endereço (C), descrição (D)
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION properties_property_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.neighborhood, '') || ' ' || coalesce(NEW.city, '')), 'B') ||
+        setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.address, '')), 'C') ||
+        setweight(to_tsvector('portuguese_unaccent', coalesce(NEW.description, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS properties_property_search_vector_trigger ON properties_property;
+CREATE TRIGGER properties_property_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, address, neighborhood, city ON properties_property
+    FOR EACH ROW EXECUTE FUNCTION properties_property_search_vector_update();
+
+-- Preenche o índice dos imóveis existentes
+UPDATE properties_property SET title = title;
+
+CREATE INDEX IF NOT EXISTS properties_property_search_vector_gin
+    ON properties_property USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS properties_property_title_trgm
+    ON properties_property USING gin (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS properties_property_neighborhood_trgm
+    ON properties_property USING gin (neighborhood gin_trgm_ops);
+"""
+
+DROP_TRIGGER = """
+DROP INDEX IF EXISTS properties_property_neighborhood_trgm;
+DROP INDEX IF EXISTS properties_property_title_trgm;
+DROP INDEX IF EXISTS properties_property_search_vector_gin;
+DROP TRIGGER IF EXISTS properties_property_search_vector_trigger ON properties_property;
+DROP FUNCTION IF EXISTS properties_property_search_vector_update();
+"""
+
+
+def create_search_index(apps, schema_editor):
+    """Trigger e índices GIN existem apenas no PostgreSQL (outros bancos usam icontains)"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(CREATE_SEARCH_CONFIG)
+    schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0004_property_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True, verbose_name='Índice de busca'
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('landings', '0001_initial'),
+        ('properties', '0005_property_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['site', '-is_featured', 'order', '-created_at', '-id'], name='property_site_listing_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['site', 'order', '-created_at', '-id'], name='property_site_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['site', 'property_type', 'city', 'order', '-created_at'], name='property_site_related_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['site', 'city'], name='property_site_city_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyimage',
+            index=models.Index(fields=['property', 'order', 'created_at'], name='propertyimage_order_idx'),
+        ),
+    ]
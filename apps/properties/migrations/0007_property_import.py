@@ -0,0 +1,114 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+import apps.properties.models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("landings", "0001_initial"),
+        ("properties", "0006_property_query_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PropertyImport",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True,
+                        max_length=255,
+                        upload_to=apps.properties.models.property_import_upload_to,
+                        verbose_name="Arquivo",
+                    ),
+                ),
+                ("file_name", models.CharField(max_length=255, verbose_name="Nome do arquivo")),
+                ("file_size", models.PositiveBigIntegerField(default=0, verbose_name="Tamanho")),
+                (
+                    "format",
+                    models.CharField(
+                        blank=True,
+                        choices=[("csv", "CSV"), ("vivareal", "XML VivaReal (VRSync)"), ("zap", "XML ZAP")],
+                        max_length=10,
+                        verbose_name="Formato",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Aguardando"),
+                            ("running", "Processando"),
+                            ("completed", "Concluída"),
+                            ("failed", "Falhou"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Status",
+                    ),
+                ),
+                ("processed", models.PositiveIntegerField(default=0, verbose_name="Registros processados")),
+                ("bytes_read", models.PositiveBigIntegerField(default=0, verbose_name="Bytes lidos")),
+                ("created_count", models.PositiveIntegerField(default=0, verbose_name="Criados")),
+                ("updated_count", models.PositiveIntegerField(default=0, verbose_name="Atualizados")),
+                ("failed_count", models.PositiveIntegerField(default=0, verbose_name="Com erro")),
+                ("images_count", models.PositiveIntegerField(default=0, verbose_name="Imagens baixadas")),
+                ("errors", models.JSONField(blank=True, default=list, verbose_name="Erros")),
+                ("message", models.TextField(blank=True, verbose_name="Mensagem")),
+                ("started_at", models.DateTimeField(blank=True, null=True, verbose_name="Iniciada em")),
+                ("finished_at", models.DateTimeField(blank=True, null=True, verbose_name="Concluída em")),
+                ("created_at", models.DateTimeField(auto_now_add=True, verbose_name="Criado em")),
+                ("updated_at", models.DateTimeField(auto_now=True, verbose_name="Atualizado em")),
+            ],
+            options={
+                "verbose_name": "Importação de Imóveis",
+                "verbose_name_plural": "Importações de Imóveis",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="property",
+            name="external_id",
+            field=models.CharField(blank=True, default="", max_length=100, verbose_name="Código externo"),
+        ),
+        migrations.AddField(
+            model_name="propertyimage",
+            name="source_url",
+            field=models.URLField(blank=True, default="", max_length=500, verbose_name="URL de origem"),
+        ),
+        migrations.AddConstraint(
+            model_name="property",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("external_id", ""), _negated=True),
+                fields=("site", "external_id"),
+                name="property_site_external_id_uniq",
+            ),
+        ),
+        migrations.AddField(
+            model_name="propertyimport",
+            name="created_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Enviado por",
+            ),
+        ),
+        migrations.AddField(
+            model_name="propertyimport",
+            name="site",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="property_imports",
+                to="landings.site",
+                verbose_name="Site",
+            ),
+        ),
+    ]
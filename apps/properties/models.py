@@ -2,6 +2,10 @@
 Models do app Properties - Imóveis e suas imagens
 """
 
+import os
+import uuid
+
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -83,14 +87,48 @@ class Property(models.Model):
     # Ordem de exibição
     order = models.PositiveIntegerField(_("Ordem"), default=0)
 
+    # Código do imóvel no sistema de origem (importação CSV/XML): permite atualizar em vez de duplicar
+    external_id = models.CharField(_("Código externo"), max_length=100, blank=True, default="")
+
     # Metadados
     created_at = models.DateTimeField(_("Criado em"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Atualizado em"), auto_now=True)
 
+    # Busca textual (PostgreSQL): mantido por trigger no banco, ver apps.properties.search
+    # Os índices GIN (tsvector e trigramas) são criados na migration 0005 apenas no PostgreSQL
+    search_vector = SearchVectorField(_("Índice de busca"), null=True, editable=False)
+
     class Meta:
         verbose_name = _("Imóvel")
         verbose_name_plural = _("Imóveis")
         ordering = ["order", "-created_at"]
+        # Índices alinhados às consultas por site (verificados com `manage.py explain_property_queries`)
+        indexes = [
+            # Listagem pública /imoveis/: ativos do site, destaques primeiro (desempate por pk)
+            models.Index(
+                fields=["site", "-is_featured", "order", "-created_at", "-id"],
+                condition=models.Q(is_active=True),
+                name="property_site_listing_idx",
+            ),
+            # Dashboard e snapshot da listagem: imóveis do site na ordem padrão
+            models.Index(fields=["site", "order", "-created_at", "-id"], name="property_site_order_idx"),
+            # Imóveis relacionados (mesmo tipo e cidade) na página de detalhe
+            models.Index(
+                fields=["site", "property_type", "city", "order", "-created_at"],
+                condition=models.Q(is_active=True),
+                name="property_site_related_idx",
+            ),
+            # Filtro e lista de cidades da página pública
+            models.Index(fields=["site", "city"], condition=models.Q(is_active=True), name="property_site_city_idx"),
+        ]
+        constraints = [
+            # Upsert da importação: um imóvel por código externo em cada site
+            models.UniqueConstraint(
+                fields=["site", "external_id"],
+                condition=~models.Q(external_id=""),
+                name="property_site_external_id_uniq",
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -142,12 +180,120 @@ class PropertyImage(models.Model):
     image = models.ImageField(_("Imagem"), upload_to="properties/")
     caption = models.CharField(_("Legenda"), max_length=200, blank=True)
     order = models.PositiveIntegerField(_("Ordem"), default=0)
+    # Derivados responsivos (card, gallery, hero, og) gerados em background - ver apps.properties.images
+    variants = models.JSONField(_("Derivados"), default=dict, blank=True)
+    # URL de origem (importação): evita baixar a mesma foto de novo ao reimportar
+    source_url = models.URLField(_("URL de origem"), max_length=500, blank=True, default="")
     created_at = models.DateTimeField(_("Criado em"), auto_now_add=True)
 
     class Meta:
         verbose_name = _("Imagem do Imóvel")
         verbose_name_plural = _("Imagens dos Imóveis")
         ordering = ["order", "created_at"]
+        indexes = [
+            # Galeria e slides dos cards: imagens do imóvel na ordem de exibição
+            models.Index(fields=["property", "order", "created_at"], name="propertyimage_order_idx"),
+        ]
 
     def __str__(self):
         return f"Imagem {self.order} - {self.property.title}"
+
+
+class SiteListingSnapshot(models.Model):
+    """
+    Listagem desnormalizada dos imóveis ativos de um site.
+
+    Guarda os cards prontos (campos + URLs das imagens) para que as páginas
+    públicas leiam uma única linha em vez de consultar imóveis e imagens.
+    Mantido por apps.properties.snapshots (atualização incremental via signals).
+    """
+
+    site = models.OneToOneField(
+        "landings.Site", on_delete=models.CASCADE, related_name="listing_snapshot", verbose_name=_("Site")
+    )
+    cards = models.JSONField(_("Cards"), default=list, blank=True)
+    updated_at = models.DateTimeField(_("Atualizado em"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Snapshot da Listagem")
+        verbose_name_plural = _("Snapshots das Listagens")
+
+    def __str__(self):
+        return f"Snapshot - {self.site}"
+
+
+def property_import_upload_to(instance: "PropertyImport", filename: str) -> str:
+    """Nome aleatório: o arquivo fica no storage de mídia apenas durante a importação"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"imports/{instance.site_id}/{uuid.uuid4().hex}{extension}"
+
+
+class PropertyImport(models.Model):
+    """
+    Importação em lote de imóveis (CSV ou XML de portais VivaReal/ZAP).
+
+    Processada em background (apps.properties.importers) em fatias retomáveis:
+    `processed` é o número de registros do arquivo já gravados, atualizado na
+    mesma transação de cada lote.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", _("Aguardando")),
+        ("running", _("Processando")),
+        ("completed", _("Concluída")),
+        ("failed", _("Falhou")),
+    ]
+
+    FORMAT_CHOICES = [
+        ("csv", _("CSV")),
+        ("vivareal", _("XML VivaReal (VRSync)")),
+        ("zap", _("XML ZAP")),
+    ]
+
+    site = models.ForeignKey(
+        "landings.Site", on_delete=models.CASCADE, related_name="property_imports", verbose_name=_("Site")
+    )
+    created_by = models.ForeignKey(
+        "core.User", on_delete=models.SET_NULL, null=True, blank=True, verbose_name=_("Enviado por")
+    )
+    file = models.FileField(_("Arquivo"), upload_to=property_import_upload_to, max_length=255, blank=True)
+    file_name = models.CharField(_("Nome do arquivo"), max_length=255)
+    file_size = models.PositiveBigIntegerField(_("Tamanho"), default=0)
+    format = models.CharField(_("Formato"), max_length=10, choices=FORMAT_CHOICES, blank=True)
+    status = models.CharField(_("Status"), max_length=10, choices=STATUS_CHOICES, default="pending")
+
+    # Progresso
+    processed = models.PositiveIntegerField(_("Registros processados"), default=0)
+    bytes_read = models.PositiveBigIntegerField(_("Bytes lidos"), default=0)
+    created_count = models.PositiveIntegerField(_("Criados"), default=0)
+    updated_count = models.PositiveIntegerField(_("Atualizados"), default=0)
+    failed_count = models.PositiveIntegerField(_("Com erro"), default=0)
+    images_count = models.PositiveIntegerField(_("Imagens baixadas"), default=0)
+    errors = models.JSONField(_("Erros"), default=list, blank=True)
+    message = models.TextField(_("Mensagem"), blank=True)
+
+    started_at = models.DateTimeField(_("Iniciada em"), null=True, blank=True)
+    finished_at = models.DateTimeField(_("Concluída em"), null=True, blank=True)
+    created_at = models.DateTimeField(_("Criado em"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Atualizado em"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Importação de Imóveis")
+        verbose_name_plural = _("Importações de Imóveis")
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.file_name} - {self.site}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def progress(self) -> int:
+        """Percentual aproximado (bytes do arquivo já lidos)"""
+        if self.status == "completed":
+            return 100
+        if not self.file_size:
+            return 0
+        return min(int(self.bytes_read * 100 / self.file_size), 99)
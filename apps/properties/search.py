@@ -0,0 +1,71 @@
+"""
+Busca textual de imóveis (página pública /imoveis/ e dashboard).
+
+No PostgreSQL a busca usa a coluna Property.search_vector, mantida por um
+trigger (migration 0005) com a configuração "portuguese_unaccent": radicais
+em português e sem diferenciar acentos ("apartamentos" encontra
+"Apartamento", "imovel" encontra "imóvel"). A consulta usa o índice GIN e os
+resultados são ordenados por relevância (SearchRank). A relevância é convertida
+para double precision: o valor real (float4) não volta idêntico do Python, e a
+paginação por cursor compara exatamente o valor da última linha exibida.
+
+Se a busca textual não encontrar nada (ex: erro de digitação), cai para a
+similaridade de trigramas em título e bairro, também indexada (gin_trgm_ops).
+
+Em outros bancos (SQLite local) a busca usa icontains nos mesmos campos.
+"""
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, FloatField, Q, QuerySet
+from django.db.models.functions import Cast, Greatest
+
+# Configuração de texto criada na migration 0005_property_search_vector
+SEARCH_CONFIG = "portuguese_unaccent"
+
+# Campos usados no fallback sem PostgreSQL (mesmos do search_vector)
+SEARCH_FIELDS = ("title", "description", "address", "neighborhood", "city")
+
+# Campos com índice de trigramas (tolerância a erros de digitação)
+TRIGRAM_FIELDS = ("title", "neighborhood")
+
+
+def _ordering(queryset: QuerySet) -> list:
+    """Ordenação atual do queryset com desempate por pk (paginação estável)"""
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if "pk" not in ordering and "-pk" not in ordering:
+        ordering.append("-pk")
+    return ordering
+
+
+def search_properties(queryset: QuerySet, query: str) -> QuerySet:
+    """
+    Filtra o queryset de imóveis pelo termo buscado, ordenando por relevância.
+
+    A ordenação original do queryset é usada como desempate (ex: destaque,
+    ordem manual), seguida do pk, para que a paginação seja determinística.
+    """
+    query = query.strip()
+    if not query:
+        return queryset.order_by(*_ordering(queryset))
+
+    ordering = _ordering(queryset)
+
+    if connection.vendor != "postgresql":
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f"{field}__icontains": query})
+        return queryset.filter(condition).order_by(*ordering)
+
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+    matches = queryset.filter(search_vector=search_query)
+    if matches.exists():
+        rank = Cast(SearchRank(F("search_vector"), search_query), FloatField())
+        return matches.annotate(search_rank=rank).order_by("-search_rank", *ordering)
+
+    # Sem resultados: tolera erros de digitação com trigramas (operador %> usa o índice GIN)
+    condition = Q()
+    for field in TRIGRAM_FIELDS:
+        condition |= Q(**{f"{field}__trigram_word_similar": query})
+    similarity = Cast(Greatest(*(TrigramWordSimilarity(query, field) for field in TRIGRAM_FIELDS)), FloatField())
+    return queryset.filter(condition).annotate(search_rank=similarity).order_by("-search_rank", *ordering)
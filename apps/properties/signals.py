@@ -0,0 +1,103 @@
+"""
+Signals para Properties
+Mantém o snapshot da listagem de imóveis (SiteListingSnapshot) atualizado
+quando imóveis ou imagens são criados, alterados ou removidos e agenda a
+normalização das imagens e a geração dos derivados responsivos
+"""
+
+import logging
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.landings.page_cache import bump_site_version
+
+from .images import delete_variants
+from .models import Property, PropertyImage
+from .snapshots import update_property_snapshot
+from .tasks import normalize_property_image
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SnapshotUpdate:
+    """Recálculo do card de um imóvel; instâncias iguais representam o mesmo trabalho pendente"""
+
+    site_id: int
+    property_id: int
+
+    def __call__(self) -> None:
+        try:
+            update_property_snapshot(self.site_id, self.property_id)
+        except Exception as e:
+            logger.error(f"Erro ao atualizar snapshot do site {self.site_id} (imóvel {self.property_id}): {e}")
+        # As páginas podem ter sido cacheadas antes do snapshot ser atualizado
+        bump_site_version(self.site_id)
+
+
+def schedule_snapshot_update(site_id: int | None, property_id: int) -> None:
+    """Atualiza o card do imóvel após o commit da transação atual (uma vez por imóvel e transação)"""
+    if not site_id:
+        return
+
+    update = SnapshotUpdate(site_id, property_id)
+    connection = transaction.get_connection()
+    # Várias imagens do mesmo imóvel salvas/removidas na transação: um único recálculo.
+    # Callbacks de savepoints desfeitos saem de run_on_commit, então não bloqueiam um novo agendamento.
+    if connection.in_atomic_block and any(func == update for _sids, func, _robust in connection.run_on_commit):
+        return
+    transaction.on_commit(update)
+
+
+def _image_site_id(image: PropertyImage) -> int | None:
+    """Site do imóvel dono da imagem (sem query quando o imóvel já está carregado na instância)"""
+    if PropertyImage.property.is_cached(image):
+        return image.property.site_id
+    return Property.objects.filter(pk=image.property_id).values_list("site_id", flat=True).first()
+
+
+def _is_cascade_delete(origin) -> bool:
+    """Remoção iniciada em outro model (imóvel, site...): o post_delete do imóvel já retira o card"""
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is not PropertyImage
+
+
+@receiver([post_save, post_delete], sender=Property)
+def update_snapshot_on_property_change(sender, instance, **kwargs):
+    """Recalcula o card do imóvel no snapshot do site"""
+    schedule_snapshot_update(instance.site_id, instance.pk)
+
+
+@receiver([post_save, post_delete], sender=PropertyImage)
+def update_snapshot_on_property_image_change(sender, instance, origin=None, **kwargs):
+    """Recalcula o card do imóvel dono da imagem"""
+    if _is_cascade_delete(origin):
+        return
+    schedule_snapshot_update(_image_site_id(instance), instance.property_id)
+
+
+@receiver(post_save, sender=PropertyImage)
+def schedule_image_normalization(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Agenda a normalização (e depois os derivados) quando o arquivo da imagem é criado ou trocado
+    """
+    if not created and update_fields is not None and "image" not in update_fields:
+        return
+    if not instance.image:
+        return
+    image_id = instance.pk
+    transaction.on_commit(lambda: normalize_property_image.delay(image_id))
+
+
+@receiver(post_delete, sender=PropertyImage)
+def delete_image_variants(sender, instance, **kwargs):
+    """Remove os derivados do storage junto com a imagem"""
+    variants = instance.variants
+    if variants:
+        transaction.on_commit(lambda: delete_variants(variants))
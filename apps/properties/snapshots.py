@@ -0,0 +1,241 @@
+"""
+Snapshot desnormalizado da listagem de imóveis de cada site.
+
+As páginas públicas exibem sempre os mesmos cards (imóveis ativos + imagens).
+Em vez de consultar imóveis e imagens a cada renderização, cada site mantém
+uma única linha (SiteListingSnapshot) com os campos dos cards já prontos,
+incluindo as URLs das imagens (slides do carrossel).
+
+O snapshot é atualizado de forma incremental pelos signals de Property e
+PropertyImage: apenas o card do imóvel alterado é recalculado.
+
+Páginas que ainda listam imóveis do banco (listagem paginada, relacionados)
+usam attach_card_slides para resolver os slides em lote, com uma única query.
+"""
+
+import logging
+from collections.abc import Iterable
+from decimal import Decimal
+from typing import Any
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .images import responsive_attrs
+from .models import Property, PropertyImage, SiteListingSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Campos do imóvel copiados para o card
+CARD_FIELDS = (
+    "title",
+    "description",
+    "property_type",
+    "category",
+    "transaction_type",
+    "bedrooms",
+    "bathrooms",
+    "garage_spaces",
+    "neighborhood",
+    "city",
+    "state",
+    "is_featured",
+    "order",
+)
+
+# Campos decimais (armazenados como string para não perder precisão no JSON)
+DECIMAL_FIELDS = (
+    "sale_price",
+    "rent_price",
+    "original_sale_price",
+    "original_rent_price",
+    "area",
+)
+
+
+def _is_valid_main_image(property_obj: Property) -> bool:
+    """Imagem principal existe e não é um placeholder"""
+    image = property_obj.main_image
+    return bool(image and image.name and "placeholder" not in image.name)
+
+
+def build_slides(property_obj: Property, images: Iterable[PropertyImage]) -> list[dict[str, str]]:
+    """
+    Monta os slides do carrossel do card: imagem principal primeiro e depois
+    as imagens adicionais, sem repetir arquivos.
+
+    Cada slide tem url/alt e, quando os derivados já existem, src/srcset/webp_srcset/og.
+    Uma lista vazia significa que o template deve exibir a imagem padrão.
+    """
+    images = list(images)
+    # A imagem principal é um dos arquivos das imagens adicionais: reaproveita seus derivados
+    variants_by_name = {image.image.name: image.variants for image in images if image.image}
+
+    slides = []
+    seen = set()
+
+    if _is_valid_main_image(property_obj):
+        name = property_obj.main_image.name
+        seen.add(name)
+        slides.append(
+            {
+                "url": property_obj.main_image.url,
+                "alt": property_obj.title,
+                **responsive_attrs(variants_by_name.get(name)),
+            }
+        )
+
+    for image in images:
+        if not image.image or image.image.name in seen:
+            continue
+        seen.add(image.image.name)
+        slides.append(
+            {
+                "url": image.image.url,
+                "alt": image.caption or property_obj.title,
+                **responsive_attrs(image.variants),
+            }
+        )
+
+    return slides
+
+
+def attach_card_slides(properties: Iterable[Property]) -> list[Property]:
+    """
+    Resolve os slides de vários imóveis com uma única query de imagens.
+
+    Evita o N+1 de `property.images.all` por card quando o queryset foi
+    fatiado ou refiltrado (o que descarta o prefetch_related). Cada imóvel
+    recebe o atributo `slides`, lido pelo filtro `card_slides`.
+    """
+    properties = list(properties)
+    if not properties:
+        return properties
+
+    images_by_property: dict[int, list[PropertyImage]] = {p.pk: [] for p in properties}
+    images = PropertyImage.objects.filter(property_id__in=images_by_property).order_by("order", "created_at")
+    for image in images:
+        images_by_property[image.property_id].append(image)
+
+    for property_obj in properties:
+        property_obj.slides = build_slides(property_obj, images_by_property[property_obj.pk])
+    return properties
+
+
+def build_card(property_obj: Property, images: Iterable[PropertyImage]) -> dict[str, Any]:
+    """Converte um imóvel (e suas imagens) no dicionário armazenado no snapshot"""
+    card = {field: getattr(property_obj, field) for field in CARD_FIELDS}
+    for field in DECIMAL_FIELDS:
+        value = getattr(property_obj, field)
+        card[field] = str(value) if value is not None else None
+    card["id"] = property_obj.pk
+    card["site_id"] = property_obj.site_id
+    card["created_at"] = property_obj.created_at.isoformat()
+    card["slides"] = build_slides(property_obj, images)
+    return card
+
+
+def card_to_property(card: dict[str, Any]) -> Property:
+    """
+    Reconstrói uma instância de Property (não salva) a partir do card.
+
+    Assim os templates continuam usando os mesmos atributos e métodos
+    (get_price_display, has_promotion...). Os slides ficam em `property.slides`.
+    """
+    data = {field: card[field] for field in CARD_FIELDS}
+    for field in DECIMAL_FIELDS:
+        value = card.get(field)
+        data[field] = Decimal(value) if value is not None else None
+
+    property_obj = Property(
+        id=card["id"],
+        site_id=card["site_id"],
+        is_active=True,
+        created_at=parse_datetime(card["created_at"]),
+        **data,
+    )
+    property_obj.slides = card["slides"]
+    return property_obj
+
+
+def _sort_cards(cards: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Mesma ordem do Meta.ordering de Property: order, -created_at"""
+    cards = sorted(cards, key=lambda card: card["created_at"], reverse=True)
+    return sorted(cards, key=lambda card: card["order"])
+
+
+def _build_site_cards(site_id: int) -> list[dict[str, Any]]:
+    properties = Property.objects.filter(site_id=site_id, is_active=True).prefetch_related("images")
+    return [build_card(property_obj, property_obj.images.all()) for property_obj in properties]
+
+
+def rebuild_site_snapshot(site_id: int) -> SiteListingSnapshot:
+    """Recalcula o snapshot completo do site (2 queries: imóveis + imagens)"""
+    snapshot, _ = SiteListingSnapshot.objects.update_or_create(
+        site_id=site_id, defaults={"cards": _sort_cards(_build_site_cards(site_id))}
+    )
+    return snapshot
+
+
+def update_property_snapshot(site_id: int, property_id: int) -> None:
+    """
+    Atualiza apenas o card de um imóvel no snapshot do site.
+
+    Se o imóvel foi removido ou desativado, o card é retirado da listagem.
+    Sem snapshot existente, nada é feito (ele será montado na próxima leitura).
+    """
+    with transaction.atomic():
+        snapshot = SiteListingSnapshot.objects.select_for_update().filter(site_id=site_id).first()
+        if snapshot is None:
+            return
+
+        cards = [card for card in snapshot.cards if card["id"] != property_id]
+
+        property_obj = (
+            Property.objects.filter(pk=property_id, site_id=site_id, is_active=True).prefetch_related("images").first()
+        )
+        if property_obj is not None:
+            cards.append(build_card(property_obj, property_obj.images.all()))
+
+        snapshot.cards = _sort_cards(cards)
+        snapshot.save(update_fields=["cards", "updated_at"])
+
+
+def get_site_cards(site: Any) -> list[Property]:
+    """
+    Retorna os imóveis ativos do site prontos para os cards (1 query).
+
+    O snapshot é criado na primeira leitura caso ainda não exista.
+    """
+    cards = SiteListingSnapshot.objects.filter(site_id=site.pk).values_list("cards", flat=True).first()
+    if cards is None:
+        cards = rebuild_site_snapshot(site.pk).cards
+    return [card_to_property(card) for card in cards]
+
+
+def filter_cards(properties: list[Property], section_config: dict[str, Any]) -> list[Property]:
+    """
+    Aplica em memória os filtros da seção de imóveis (ThemeSectionConfig).
+
+    Equivalente aos filtros de queryset usados antes: destaque, transação,
+    tipo, cidade (contém, sem diferenciar maiúsculas) e limite.
+    """
+    if section_config.get("show_featured_only"):
+        properties = [p for p in properties if p.is_featured]
+
+    transaction_filter = section_config.get("filter_transaction")
+    if transaction_filter in ["sale", "rent"]:
+        properties = [p for p in properties if p.transaction_type == transaction_filter]
+
+    if section_config.get("filter_type"):
+        properties = [p for p in properties if p.property_type == section_config["filter_type"]]
+
+    if section_config.get("filter_city"):
+        city = section_config["filter_city"].casefold()
+        properties = [p for p in properties if city in p.city.casefold()]
+
+    limit = section_config.get("limit", 0)
+    if limit and limit > 0:
+        properties = properties[:limit]
+
+    return properties
@@ -0,0 +1,202 @@
+"""
+Tarefas assíncronas do Celery para Properties
+"""
+
+import logging
+
+from celery import shared_task
+from celery.exceptions import SoftTimeLimitExceeded
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from PIL import UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def normalize_property_image(self, image_id: int):
+    """
+    Normaliza o arquivo de uma imagem de imóvel (orientação, dimensões, metadados, compressão)
+    e em seguida agenda a geração dos derivados responsivos
+
+    Args:
+        image_id: ID da PropertyImage
+    """
+    from apps.core.images import delete_file, normalize_image
+    from apps.properties.models import Property, PropertyImage
+    from apps.properties.signals import schedule_snapshot_update
+
+    property_image = PropertyImage.objects.select_related("property").filter(pk=image_id).first()
+    if property_image is None:
+        logger.warning(f"Imagem {image_id} não encontrada para normalizar")
+        return {"success": False, "message": "Imagem não encontrada"}
+
+    original_name = property_image.image.name
+    if not original_name:
+        return {"success": False, "message": "Imagem sem arquivo"}
+
+    try:
+        result = normalize_image(original_name)
+    except UnidentifiedImageError:
+        logger.error(f"Arquivo não é uma imagem válida: {original_name}")
+        return {"success": False, "message": "Imagem inválida"}
+    except OSError as e:
+        logger.error(f"Erro ao normalizar {original_name}: {e}")
+        raise self.retry(exc=e, countdown=60) from e
+
+    if result is not None:
+        # Troca atômica: só aplica se o arquivo não foi trocado durante o processamento
+        with transaction.atomic():
+            swapped = PropertyImage.objects.filter(pk=image_id, image=original_name).update(image=result.name)
+            if swapped:
+                Property.objects.filter(pk=property_image.property_id, main_image=original_name).update(
+                    main_image=result.name
+                )
+
+        if not swapped:
+            delete_file(result.name)
+            return {"success": False, "message": "Imagem alterada durante o processamento"}
+
+        delete_file(original_name)
+        # update() não dispara signals: atualiza o card (nova URL) e o cache de página
+        schedule_snapshot_update(property_image.property.site_id, property_image.property_id)
+        logger.info(f"✅ Imagem normalizada: {original_name} ({result.original_size} -> {result.size} bytes)")
+
+    generate_property_image_variants.delay(image_id)
+    return {"success": True, "normalized": result is not None}
+
+
+@shared_task(bind=True, max_retries=3)
+def generate_property_image_variants(self, image_id: int):
+    """
+    Gera os derivados responsivos (WebP/JPEG) de uma imagem de imóvel
+
+    Args:
+        image_id: ID da PropertyImage
+    """
+    from apps.properties.images import delete_variants, generate_variants
+    from apps.properties.models import PropertyImage
+
+    try:
+        property_image = PropertyImage.objects.get(pk=image_id)
+    except PropertyImage.DoesNotExist:
+        logger.warning(f"Imagem {image_id} não encontrada para gerar derivados")
+        return {"success": False, "message": "Imagem não encontrada"}
+
+    original_name = property_image.image.name
+    if not original_name:
+        return {"success": False, "message": "Imagem sem arquivo"}
+
+    try:
+        variants = generate_variants(original_name)
+    except UnidentifiedImageError:
+        logger.error(f"Arquivo não é uma imagem válida: {original_name}")
+        return {"success": False, "message": "Imagem inválida"}
+    except OSError as e:
+        logger.error(f"Erro ao gerar derivados de {original_name}: {e}")
+        raise self.retry(exc=e, countdown=60) from e
+
+    # A imagem pode ter sido trocada ou removida enquanto os derivados eram gerados
+    current_name = PropertyImage.objects.filter(pk=image_id).values_list("image", flat=True).first()
+    if current_name != original_name:
+        delete_variants(variants)
+        return {"success": False, "message": "Imagem alterada durante o processamento"}
+
+    # Remove derivados antigos que não foram sobrescritos (original com outro nome)
+    new_names = {entry.get(key) for entry in variants.values() for key in ("webp", "jpeg")}
+    stale = {
+        name: {key: path for key, path in entry.items() if key in ("webp", "jpeg") and path not in new_names}
+        for name, entry in (property_image.variants or {}).items()
+    }
+    delete_variants(stale)
+
+    # save() dispara os signals que atualizam o snapshot da listagem e o cache de página
+    property_image.variants = variants
+    property_image.save(update_fields=["variants"])
+
+    logger.info(f"✅ Derivados gerados para {original_name}")
+    return {"success": True, "variants": list(variants)}
+
+
+@shared_task
+def cleanup_stale_uploads():
+    """
+    Remove partes de uploads em lote abandonados (mais antigos que CHUNKED_UPLOAD_TTL)
+
+    Agendada de hora em hora no Celery Beat (CELERY_BEAT_SCHEDULE).
+    """
+    from apps.properties.uploads import cleanup_stale_uploads as cleanup
+
+    removed = cleanup()
+    if removed:
+        logger.info(f"🧹 {removed} upload(s) temporário(s) removido(s)")
+    return {"removed": removed}
+
+
+@shared_task(bind=True, max_retries=3)
+def process_property_import(self, import_id: int):
+    """
+    Processa uma importação em lote de imóveis (CSV/XML) por até PROPERTY_IMPORT_TIME_BUDGET
+    segundos e agenda a continuação até o fim do arquivo
+
+    Args:
+        import_id: ID da PropertyImport
+    """
+    from apps.properties.importers import ImportFileError, fail_import, run_import
+    from apps.properties.models import PropertyImport
+
+    job = PropertyImport.objects.select_related("site").filter(pk=import_id).first()
+    if job is None or job.is_finished:
+        return {"success": False, "message": "Importação não encontrada ou já concluída"}
+
+    # Uma única execução por importação (ex: tarefa reentregue após queda do worker)
+    lock_key = f"property-import:lock:{import_id}"
+    if not cache.add(lock_key, 1, getattr(settings, "CELERY_TASK_TIME_LIMIT", 300)):
+        return {"success": False, "message": "Importação já em andamento"}
+
+    try:
+        finished = run_import(job, time_budget=getattr(settings, "PROPERTY_IMPORT_TIME_BUDGET", 150))
+    except SoftTimeLimitExceeded:
+        # O lote interrompido foi desfeito; continua do último lote gravado
+        finished = False
+    except ImportFileError as e:
+        fail_import(job, str(e))
+        return {"success": False, "message": str(e)}
+    except (OSError, DatabaseError) as e:
+        logger.error(f"Erro na importação {import_id}: {e}")
+        if self.request.retries >= self.max_retries:
+            fail_import(job, str(e))
+            return {"success": False, "message": str(e)}
+        raise self.retry(exc=e, countdown=60) from e
+    finally:
+        cache.delete(lock_key)
+
+    if not finished:
+        process_property_import.delay(import_id)
+    return {"success": True, "finished": finished}
+
+
+@shared_task(bind=True, max_retries=3)
+def build_property_feed(self, site_id: int, feed_format: str):
+    """
+    Gera o arquivo do feed de imóveis (XML/JSON) da versão atual do site
+
+    Args:
+        site_id: ID do Site
+        feed_format: Formato do feed (chave de FEED_FORMATS)
+    """
+    from apps.landings.models import Site
+    from apps.properties.feeds import build_feed, release_feed_build
+
+    try:
+        site = Site.objects.filter(pk=site_id).first()
+        if site is None:
+            return {"success": False, "message": "Site não encontrado"}
+        feed = build_feed(site, feed_format)
+    except (OSError, DatabaseError) as e:
+        logger.error(f"Erro ao gerar feed {feed_format} do site {site_id}: {e}")
+        raise self.retry(exc=e, countdown=60) from e
+    finally:
+        release_feed_build(site_id, feed_format)
+    return {"success": True, "name": feed.name, "version": feed.version}
@@ -24,3 +24,43 @@ def format_price(value):
 
 
 
+
+
+@register.filter
+def card_slides(property_obj):
+    """
+    Retorna os slides (url/alt) do carrossel do card de um imóvel.
+
+    Usa os slides já resolvidos (snapshot da listagem) quando disponíveis;
+    caso contrário, monta a partir da imagem principal e das imagens do imóvel.
+    """
+    slides = getattr(property_obj, "slides", None)
+    if slides is None:
+        from apps.properties.snapshots import build_slides
+
+        slides = build_slides(property_obj, property_obj.images.all())
+    return slides
+
+
+@register.filter
+def srcset(variants, image_format="jpeg"):
+    """
+    Monta o srcset a partir dos derivados de uma imagem.
+
+    Uso: <img srcset="{{ image.variants|srcset }}"> ou {{ image.variants|srcset:"webp" }}
+    """
+    from apps.properties.images import build_srcset
+
+    return build_srcset(variants, image_format)
+
+
+@register.simple_tag
+def variant_url(variants, variant, image_format="jpeg"):
+    """
+    Retorna a URL de um derivado (card, gallery, hero, og) ou string vazia.
+
+    Uso: {% variant_url image.variants "og" %}
+    """
+    from apps.properties.images import variant_url as get_variant_url
+
+    return get_variant_url(variants, variant, image_format)
@@ -0,0 +1,102 @@
+"""
+Número de queries dos cards de imóveis: não pode crescer com o tamanho do site.
+
+Os slides de todos os cards são resolvidos em lote (attach_card_slides e o
+snapshot da listagem); um N+1 no template ou na view faz os sites grandes
+executarem mais queries que os pequenos.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from apps.core.models import User
+from apps.landings.models import Site
+from apps.landings.tenant_cache import tenant_cache
+from apps.properties.models import Property, PropertyImage
+from apps.properties.snapshots import attach_card_slides
+
+IMAGES_PER_PROPERTY = 3
+
+# Queries por rota, iguais para um site com 5 e com 50 imóveis (a listagem exibe 5 e 12 cards)
+HOME_QUERIES = 4
+LISTING_QUERIES = 5
+
+
+def create_site(name: str, properties: int) -> Site:
+    """Site publicado com `properties` imóveis ativos, cada um com IMAGES_PER_PROPERTY imagens"""
+    owner = User.objects.create_user(f"{name}@propzy.local", "test")
+    site = Site.objects.create(owner=owner, subdomain=name, business_name=name, email=owner.email, is_published=True)
+
+    # bulk_create não grava arquivos nem dispara signals (o snapshot é montado na primeira leitura)
+    property_objs = Property.objects.bulk_create(
+        [
+            Property(
+                site=site,
+                title=f"Imóvel {number}",
+                property_type="house",
+                transaction_type="sale",
+                sale_price=100000 + number,
+                area=80,
+                address="Rua Teste, 1",
+                neighborhood="Centro",
+                city="Curitiba",
+                state="PR",
+                is_featured=number < 6,
+                order=number,
+                main_image=f"properties/{name}-{number}-0.jpg",
+            )
+            for number in range(properties)
+        ]
+    )
+    PropertyImage.objects.bulk_create(
+        [
+            PropertyImage(property=property_obj, image=f"properties/{name}-{number}-{i}.jpg", order=i)
+            for number, property_obj in enumerate(property_objs)
+            for i in range(IMAGES_PER_PROPERTY)
+        ]
+    )
+    return site
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class CardQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sites = {5: create_site("pequeno", 5), 50: create_site("grande", 50)}
+
+    def setUp(self):
+        cache.clear()
+        tenant_cache.local.clear()
+
+    def assert_page_queries(self, site: Site, path: str, queries: int):
+        """GET anônimo no host do site, com os caches vazios, executa exatamente `queries` queries"""
+        client = Client(HTTP_HOST=f"{site.subdomain}.{settings.BASE_DOMAIN}")
+        # Aquecimento: monta o snapshot da listagem (persistido, não se repete em produção)
+        client.get(path)
+        cache.clear()
+        tenant_cache.local.clear()
+
+        with self.assertNumQueries(queries):
+            response = client.get(path)
+        self.assertEqual(response.status_code, 200)
+
+    def test_attach_card_slides_uses_one_image_query(self):
+        for size, site in self.sites.items():
+            with self.subTest(properties=size):
+                queryset = site.properties.filter(is_active=True).order_by("order")
+                # Uma query dos imóveis e uma das imagens de todos eles
+                with self.assertNumQueries(2):
+                    properties = attach_card_slides(queryset)
+                self.assertEqual(len(properties), size)
+                self.assertTrue(all(len(p.slides) == IMAGES_PER_PROPERTY for p in properties))
+
+    def test_listing_query_count_does_not_grow_with_site(self):
+        for size, site in self.sites.items():
+            with self.subTest(properties=size):
+                self.assert_page_queries(site, "/imoveis/", LISTING_QUERIES)
+
+    def test_home_query_count_does_not_grow_with_site(self):
+        for size, site in self.sites.items():
+            with self.subTest(properties=size):
+                self.assert_page_queries(site, "/", HOME_QUERIES)
@@ -0,0 +1,58 @@
+"""
+Signals do snapshot da listagem: um recálculo por imóvel e transação, e nenhum
+trabalho por imagem quando o imóvel inteiro é removido.
+"""
+
+from django.test import TestCase
+
+from apps.core.models import User
+from apps.landings.models import Site
+from apps.properties.models import Property, PropertyImage
+from apps.properties.signals import SnapshotUpdate
+
+
+class SnapshotSignalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user("snapshot@propzy.local", "test")
+        cls.site = Site.objects.create(owner=owner, subdomain="snapshot", business_name="Snapshot", email=owner.email)
+        # bulk_create não dispara signals: nenhum recálculo pendente antes dos testes
+        [cls.property] = Property.objects.bulk_create(
+            [
+                Property(
+                    site=cls.site,
+                    title="Imóvel",
+                    property_type="house",
+                    transaction_type="sale",
+                    area=80,
+                    address="Rua Teste, 1",
+                    neighborhood="Centro",
+                    city="Curitiba",
+                    state="PR",
+                )
+            ]
+        )
+        PropertyImage.objects.bulk_create(
+            [PropertyImage(property=cls.property, image=f"properties/snapshot-{i}.jpg", order=i) for i in range(5)]
+        )
+
+    def _snapshot_updates(self, callbacks) -> list[SnapshotUpdate]:
+        return [callback for callback in callbacks if isinstance(callback, SnapshotUpdate)]
+
+    def test_image_changes_schedule_one_update_per_property(self):
+        images = list(PropertyImage.objects.filter(property=self.property).select_related("property"))
+        # O imóvel já está carregado nas imagens: nenhuma query para descobrir o site
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(5):
+            for image in images:
+                image.caption = "Legenda"
+                image.save(update_fields=["caption"])
+
+        self.assertEqual(self._snapshot_updates(callbacks), [SnapshotUpdate(self.site.pk, self.property.pk)])
+
+    def test_property_delete_skips_image_handlers(self):
+        property_id = self.property.pk
+        # Coleta das imagens, duas remoções e o dono do site (onboarding); nenhuma consulta por imagem
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(4):
+            self.property.delete()
+
+        self.assertEqual(self._snapshot_updates(callbacks), [SnapshotUpdate(self.site.pk, property_id)])
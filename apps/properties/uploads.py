@@ -0,0 +1,302 @@
+"""
+Upload em lote, em partes (chunks) e retomável de imagens de imóveis.
+
+Fluxo da API (ver views.property_image_batch_*):
+1. O cliente cria um lote informando nome, tamanho e tipo de cada arquivo
+2. Cada arquivo é enviado em partes (PATCH com o cabeçalho Upload-Offset);
+   as partes são gravadas em streaming num arquivo temporário, sem carregar
+   o arquivo inteiro em memória
+3. Se a conexão cair, o cliente consulta o lote e continua do offset recebido
+4. Ao concluir, todas as imagens são gravadas no storage e criadas de uma vez
+   (uma query para a ordem + um bulk_create)
+
+Os metadados do lote ficam no cache (Redis) e o conteúdo em
+settings.CHUNKED_UPLOAD_DIR. O progresso de cada arquivo é o tamanho do
+arquivo temporário, então sobrevive a reinícios do worker.
+"""
+
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils.translation import gettext as _
+from PIL import Image
+
+from .models import Property, PropertyImage
+
+logger = logging.getLogger(__name__)
+
+# Tamanho dos blocos lidos do corpo da requisição
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    """Erro de validação do upload (mensagem exibida ao cliente)"""
+
+    def __init__(self, message: str, status: int = 400, offset: int | None = None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+@dataclass
+class UploadFile:
+    """Um arquivo do lote"""
+
+    id: str
+    name: str
+    size: int
+    content_type: str
+
+
+@dataclass
+class UploadBatch:
+    """Lote de upload de um imóvel (armazenado no cache)"""
+
+    id: str
+    user_id: int
+    property_id: int
+    files: list[UploadFile]
+    created_at: float
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cache_key(batch_id: str) -> str:
+        return f"upload:batch:{batch_id}"
+
+    def save(self) -> None:
+        cache.set(self.cache_key(self.id), asdict(self), get_upload_ttl())
+
+    def delete(self) -> None:
+        for upload in self.files:
+            self.temp_path(upload).unlink(missing_ok=True)
+        cache.delete(self.cache_key(self.id))
+
+    @classmethod
+    def load(cls, batch_id: str, user_id: int, property_id: int) -> "UploadBatch":
+        """Carrega o lote garantindo que pertence ao usuário e ao imóvel"""
+        data = cache.get(cls.cache_key(batch_id))
+        if not data or data["user_id"] != user_id or data["property_id"] != property_id:
+            raise UploadError(_("Lote de upload não encontrado ou expirado."), status=404)
+        data["files"] = [UploadFile(**upload) for upload in data["files"]]
+        return cls(**data)
+
+    # ------------------------------------------------------------------
+    # Arquivos
+    # ------------------------------------------------------------------
+
+    def get_file(self, upload_id: str) -> UploadFile:
+        for upload in self.files:
+            if upload.id == upload_id:
+                return upload
+        raise UploadError(_("Arquivo não pertence ao lote."), status=404)
+
+    def temp_path(self, upload: UploadFile) -> Path:
+        return get_upload_dir() / f"{self.id}-{upload.id}.part"
+
+    def offset(self, upload: UploadFile) -> int:
+        """Bytes já recebidos do arquivo"""
+        try:
+            return self.temp_path(upload).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def to_dict(self) -> dict[str, Any]:
+        """Estado do lote para o cliente (usado também para retomar uploads)"""
+        files = []
+        for upload in self.files:
+            offset = self.offset(upload)
+            files.append(
+                {
+                    "id": upload.id,
+                    "name": upload.name,
+                    "size": upload.size,
+                    "offset": offset,
+                    "complete": offset == upload.size,
+                }
+            )
+        return {
+            "batch_id": self.id,
+            "chunk_size": get_chunk_size(),
+            "expires_in": get_upload_ttl(),
+            "files": files,
+        }
+
+
+def get_upload_dir() -> Path:
+    path = Path(getattr(settings, "CHUNKED_UPLOAD_DIR", "/tmp/propzy-uploads"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def get_upload_ttl() -> int:
+    return getattr(settings, "CHUNKED_UPLOAD_TTL", 86400)
+
+
+def get_chunk_size() -> int:
+    return getattr(settings, "CHUNKED_UPLOAD_CHUNK_SIZE", 2 * 1024 * 1024)
+
+
+def create_batch(user_id: int, property_id: int, files: list[dict[str, Any]]) -> UploadBatch:
+    """Valida a lista de arquivos e cria um novo lote"""
+    max_files = getattr(settings, "CHUNKED_UPLOAD_MAX_FILES", 50)
+    max_size = getattr(settings, "CHUNKED_UPLOAD_MAX_FILE_SIZE", 10 * 1024 * 1024)
+
+    if not files:
+        raise UploadError(_("Nenhum arquivo informado."))
+    if len(files) > max_files:
+        raise UploadError(_("Máximo de %(max)s arquivos por lote.") % {"max": max_files})
+
+    uploads = []
+    for item in files:
+        try:
+            name = os.path.basename(str(item["name"]))[:200]
+            size = int(item["size"])
+            content_type = str(item.get("content_type", ""))
+        except (KeyError, TypeError, ValueError):
+            raise UploadError(_("Cada arquivo deve informar nome e tamanho.")) from None
+
+        if not content_type.startswith("image/"):
+            raise UploadError(_("%(name)s: apenas arquivos de imagem são permitidos.") % {"name": name})
+        if size <= 0 or size > max_size:
+            raise UploadError(
+                _("%(name)s: tamanho inválido (máximo %(max)sMB).") % {"name": name, "max": max_size // (1024 * 1024)}
+            )
+
+        uploads.append(UploadFile(id=uuid.uuid4().hex, name=name, size=size, content_type=content_type))
+
+    batch = UploadBatch(
+        id=uuid.uuid4().hex, user_id=user_id, property_id=property_id, files=uploads, created_at=time.time()
+    )
+    batch.save()
+    return batch
+
+
+def append_chunk(batch: UploadBatch, upload: UploadFile, offset: int, stream, length: int) -> int:
+    """
+    Grava uma parte do arquivo a partir de `offset`, lendo o corpo em streaming.
+
+    O offset deve ser exatamente o número de bytes já recebidos; caso contrário
+    retorna 409 com o offset correto para o cliente retomar.
+
+    Returns:
+        Novo offset (bytes recebidos)
+    """
+    lock_key = f"upload:lock:{batch.id}:{upload.id}"
+    # Impede duas requisições gravando o mesmo arquivo ao mesmo tempo
+    if not cache.add(lock_key, 1, 60):
+        raise UploadError(_("Upload deste arquivo já está em andamento."), status=409, offset=batch.offset(upload))
+
+    try:
+        current = batch.offset(upload)
+        if offset != current:
+            raise UploadError(_("Offset inválido."), status=409, offset=current)
+        if length <= 0 or current + length > upload.size:
+            raise UploadError(_("Parte excede o tamanho do arquivo."), offset=current)
+
+        remaining = length
+        with open(batch.temp_path(upload), "ab") as f:
+            while remaining > 0:
+                block = stream.read(min(STREAM_BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                f.write(block)
+                remaining -= len(block)
+
+        # Mantém o lote vivo enquanto houver atividade
+        batch.save()
+        return batch.offset(upload)
+    finally:
+        cache.delete(lock_key)
+
+
+def _validate_image(path: Path, name: str) -> None:
+    """Confere o cabeçalho da imagem com o Pillow (sem decodificar a imagem inteira)"""
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception:
+        raise UploadError(_("%(name)s: arquivo não é uma imagem válida.") % {"name": name}) from None
+
+
+def finalize_batch(batch: UploadBatch, property_obj: Property) -> list[PropertyImage]:
+    """
+    Grava os arquivos completos no storage e cria as PropertyImage de uma vez.
+
+    A ordem das novas imagens é alocada com uma única consulta (MAX(order)) sob
+    lock do imóvel, e as imagens são inseridas com bulk_create. Como bulk_create
+    não dispara signals, snapshot e normalização são agendados explicitamente.
+    """
+    from .signals import schedule_snapshot_update
+    from .tasks import normalize_property_image
+
+    pending = [upload for upload in batch.files if batch.offset(upload) != upload.size]
+    if pending:
+        raise UploadError(
+            _("Há arquivos incompletos no lote: %(names)s") % {"names": ", ".join(upload.name for upload in pending)},
+            status=409,
+        )
+
+    for upload in batch.files:
+        _validate_image(batch.temp_path(upload), upload.name)
+
+    # Grava no storage em streaming (File lê o arquivo temporário em blocos)
+    image_field = PropertyImage._meta.get_field("image")
+    stored_names = []
+    for upload in batch.files:
+        name = image_field.generate_filename(None, upload.name)
+        with open(batch.temp_path(upload), "rb") as f:
+            stored_names.append(default_storage.save(name, File(f, name=upload.name)))
+
+    try:
+        with transaction.atomic():
+            locked = Property.objects.select_for_update().only("pk", "main_image").get(pk=property_obj.pk)
+            last_order = locked.images.aggregate(max_order=Max("order"))["max_order"] or 0
+
+            images = PropertyImage.objects.bulk_create(
+                [
+                    PropertyImage(property_id=locked.pk, image=name, order=last_order + index)
+                    for index, name in enumerate(stored_names, start=1)
+                ]
+            )
+
+            if not locked.main_image:
+                Property.objects.filter(pk=locked.pk).update(main_image=images[0].image.name)
+    except Exception:
+        for name in stored_names:
+            default_storage.delete(name)
+        raise
+
+    image_ids = [image.pk for image in images]
+    schedule_snapshot_update(property_obj.site_id, property_obj.pk)
+    transaction.on_commit(lambda: [normalize_property_image.delay(image_id) for image_id in image_ids])
+
+    batch.delete()
+    return images
+
+
+def cleanup_stale_uploads() -> int:
+    """Remove arquivos temporários de lotes expirados (mais antigos que o TTL)"""
+    limit = time.time() - get_upload_ttl()
+    removed = 0
+    for path in get_upload_dir().glob("*.part"):
+        try:
+            if path.stat().st_mtime < limit:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
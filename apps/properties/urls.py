@@ -11,12 +11,30 @@ app_name = "properties"
 urlpatterns = [
     path("imoveis/", views.property_list, name="property_list"),
     path("imoveis/novo/", views.property_create, name="property_create"),
+    path("imoveis/importar/", views.property_import, name="property_import"),
+    path("imoveis/importar/<int:import_id>/", views.property_import_status, name="property_import_status"),
     path("imoveis/<int:pk>/editar/", views.property_update, name="property_update"),
     path("imoveis/<int:pk>/", views.property_detail, name="property_detail"),
     path("imoveis/<int:pk>/ativar/", views.property_toggle_active, name="property_toggle_active"),
     path("imoveis/<int:pk>/excluir/", views.property_delete, name="property_delete"),
     path("imoveis/<int:pk>/imagens/", views.property_images_list, name="property_images_list"),
     path("imoveis/<int:pk>/imagens/upload/", views.property_image_upload, name="property_image_upload"),
+    path("imoveis/<int:pk>/imagens/lote/", views.property_image_batch_create, name="property_image_batch_create"),
+    path(
+        "imoveis/<int:pk>/imagens/lote/<str:batch_id>/",
+        views.property_image_batch_status,
+        name="property_image_batch_status",
+    ),
+    path(
+        "imoveis/<int:pk>/imagens/lote/<str:batch_id>/concluir/",
+        views.property_image_batch_finalize,
+        name="property_image_batch_finalize",
+    ),
+    path(
+        "imoveis/<int:pk>/imagens/lote/<str:batch_id>/<str:upload_id>/",
+        views.property_image_batch_upload,
+        name="property_image_batch_upload",
+    ),
     path("imoveis/<int:pk>/imagens/<int:image_id>/deletar/", views.property_image_delete, name="property_image_delete"),
     path(
         "imoveis/<int:pk>/imagens/<int:image_id>/principal/",
@@ -2,21 +2,32 @@
 Views do app Properties - CRUD de imóveis para o dashboard do corretor
 """
 
+import json
 from typing import Any
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
-from django.db.models import Max, Q
+from django.db import transaction
+from django.db.models import Max
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils.translation import gettext_lazy as _
 from django.views.decorators.http import require_http_methods, require_POST
 
+from apps.core.pagination import CURSOR_PARAM, PAGE_PARAM, KeysetPaginator
 from apps.landings.models import Site
 
-from .forms import PropertyForm
-from .models import Property, PropertyImage
+from .forms import PropertyForm, PropertyImportForm
+from .images import variant_url
+from .models import Property, PropertyImage, PropertyImport
+from .search import search_properties
+from .tasks import process_property_import
+from .uploads import UploadBatch, UploadError, append_chunk, create_batch, finalize_batch
+
+
+def _thumbnail_url(image: PropertyImage) -> str | None:
+    """Miniatura da grade de imagens: derivado "card" (None até a normalização gerar os derivados)"""
+    return variant_url(image.variants, "card") or None
 
 
 @login_required
@@ -38,14 +49,6 @@ def property_list(request):
     properties = Property.objects.filter(site=site).order_by("order", "-created_at")
 
     # Filtros
-    if search_query:
-        query = (
-            Q(title__icontains=search_query)
-            | Q(description__icontains=search_query)
-            | Q(address__icontains=search_query)
-        )
-        properties = properties.filter(query)
-
     if property_type_filter:
         properties = properties.filter(property_type=property_type_filter)
 
@@ -59,10 +62,12 @@ def property_list(request):
     elif status_filter == "featured":
         properties = properties.filter(is_featured=True)
 
-    # Paginação
-    paginator = Paginator(properties, 20)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
+    # Busca textual indexada, ordenada por relevância (sem busca, apenas desempata a ordem por pk)
+    properties = search_properties(properties, search_query)
+
+    # Paginação por cursor (sem OFFSET), com total aproximado
+    paginator = KeysetPaginator(properties, 20)
+    page_obj = paginator.get_page(request.GET.get(CURSOR_PARAM), request.GET.get(PAGE_PARAM))
 
     context: dict[str, Any] = {
         "page_obj": page_obj,
@@ -284,7 +289,7 @@ def property_image_upload(request, pk):
                 "success": True,
                 "id": property_image.id,
                 "url": property_image.image.url,
-                "thumbnail": property_image.image.url,
+                "thumbnail": _thumbnail_url(property_image),
                 "order": property_image.order,
                 "is_main": is_main,
             },
@@ -353,10 +358,10 @@ def property_images_list(request, pk):
         {
             "id": img.id,
             "url": img.image.url,
-            "thumbnail": img.image.url,
+            "thumbnail": _thumbnail_url(img),
             "caption": img.caption,
             "order": img.order,
-            "is_main": main_image and img.image.name == main_image.name,
+            "is_main": bool(main_image) and img.image.name == main_image.name,
         }
         for img in images
     ]
@@ -391,3 +396,186 @@ def property_set_main_image(request, pk, image_id):
         )
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+# ==============================================================================
+# UPLOAD EM LOTE (partes/chunks, retomável)
+# ==============================================================================
+
+
+def _upload_error_response(error: UploadError) -> JsonResponse:
+    data = {"error": str(error)}
+    if error.offset is not None:
+        data["offset"] = error.offset
+    return JsonResponse(data, status=error.status)
+
+
+def _get_upload_batch(request, pk, batch_id):
+    """Busca o imóvel do usuário e o lote de upload (UploadError se não existir)"""
+    try:
+        site = Site.objects.get(owner=request.user)
+    except Site.DoesNotExist:
+        raise UploadError(_("Site não encontrado."), status=404) from None
+
+    property_obj = get_object_or_404(Property, pk=pk, site=site)
+    return property_obj, UploadBatch.load(batch_id, request.user.pk, property_obj.pk)
+
+
+@login_required
+@require_POST
+def property_image_batch_create(request, pk):
+    """
+    Cria um lote de upload de imagens via AJAX.
+
+    Corpo JSON: {"files": [{"name": "foto.jpg", "size": 123456, "content_type": "image/jpeg"}, ...]}
+    Retorna o id do lote, o id de cada arquivo e o tamanho recomendado das partes.
+    """
+    # Busca o site do usuário
+    try:
+        site = Site.objects.get(owner=request.user)
+    except Site.DoesNotExist:
+        return JsonResponse({"error": _("Site não encontrado.")}, status=404)
+
+    property_obj = get_object_or_404(Property, pk=pk, site=site)
+
+    try:
+        payload = json.loads(request.body or b"{}")
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return JsonResponse({"error": _("JSON inválido.")}, status=400)
+
+    try:
+        batch = create_batch(request.user.pk, property_obj.pk, payload.get("files") or [])
+    except UploadError as e:
+        return _upload_error_response(e)
+
+    return JsonResponse(batch.to_dict(), status=201)
+
+
+@login_required
+@require_http_methods(["GET"])
+def property_image_batch_status(request, pk, batch_id):
+    """Estado do lote (offset de cada arquivo), usado para retomar uploads interrompidos."""
+    try:
+        _property_obj, batch = _get_upload_batch(request, pk, batch_id)
+    except UploadError as e:
+        return _upload_error_response(e)
+
+    return JsonResponse(batch.to_dict(), status=200)
+
+
+@login_required
+@require_http_methods(["PATCH"])
+def property_image_batch_upload(request, pk, batch_id, upload_id):
+    """
+    Recebe uma parte de um arquivo do lote via AJAX.
+
+    O corpo é o conteúdo binário da parte e o cabeçalho Upload-Offset indica a
+    posição inicial. O corpo é gravado em streaming (sem carregar em memória).
+    """
+    try:
+        _property_obj, batch = _get_upload_batch(request, pk, batch_id)
+        upload = batch.get_file(upload_id)
+
+        try:
+            offset = int(request.headers.get("Upload-Offset", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return JsonResponse({"error": _("Cabeçalho Upload-Offset inválido.")}, status=400)
+
+        new_offset = append_chunk(batch, upload, offset, request, length)
+    except UploadError as e:
+        return _upload_error_response(e)
+
+    return JsonResponse({"offset": new_offset, "complete": new_offset == upload.size}, status=200)
+
+
+@login_required
+@require_POST
+def property_image_batch_finalize(request, pk, batch_id):
+    """Conclui o lote: grava as imagens recebidas e as adiciona ao imóvel via AJAX."""
+    try:
+        property_obj, batch = _get_upload_batch(request, pk, batch_id)
+        images = finalize_batch(batch, property_obj)
+    except UploadError as e:
+        return _upload_error_response(e)
+
+    # Imagem principal pode ter sido definida pelo lote
+    property_obj.refresh_from_db(fields=["main_image"])
+    main_image_name = property_obj.main_image.name if property_obj.main_image else None
+
+    return JsonResponse(
+        {
+            "success": True,
+            "images": [
+                {
+                    "id": image.id,
+                    "url": image.image.url,
+                    "thumbnail": _thumbnail_url(image),
+                    "order": image.order,
+                    "is_main": image.image.name == main_image_name,
+                }
+                for image in images
+            ],
+        },
+        status=201,
+    )
+
+
+# ------------------------------------------------------------------
+# Importação em lote (CSV / XML VivaReal e ZAP)
+# ------------------------------------------------------------------
+
+
+def _import_status(job: PropertyImport) -> dict[str, Any]:
+    return {
+        "id": job.pk,
+        "status": job.status,
+        "status_display": str(job.get_status_display()),
+        "progress": job.progress,
+        "processed": job.processed,
+        "created": job.created_count,
+        "updated": job.updated_count,
+        "failed": job.failed_count,
+        "images": job.images_count,
+        "message": job.message,
+        "errors": job.errors[:20],
+        "finished": job.is_finished,
+    }
+
+
+@login_required
+@require_http_methods(["GET", "POST"])
+def property_import(request):
+    """Envio de arquivo CSV/XML para importação em lote e acompanhamento das importações."""
+    try:
+        site = Site.objects.get(owner=request.user)
+    except Site.DoesNotExist:
+        messages.warning(request, _("Crie seu site primeiro para gerenciar imóveis."))
+        return redirect("landings:dashboard_config")
+
+    if request.method == "POST":
+        form = PropertyImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            file = form.cleaned_data["file"]
+            job = PropertyImport.objects.create(
+                site=site, created_by=request.user, file=file, file_name=file.name[:255], file_size=file.size
+            )
+            transaction.on_commit(lambda: process_property_import.delay(job.pk))
+            messages.success(request, _("Arquivo recebido. A importação será processada em segundo plano."))
+            return redirect("properties:property_import")
+    else:
+        form = PropertyImportForm()
+
+    context: dict[str, Any] = {
+        "form": form,
+        "imports": PropertyImport.objects.filter(site=site)[:10],
+    }
+    return render(request, "properties/property_import.html", context)
+
+
+@login_required
+@require_http_methods(["GET"])
+def property_import_status(request, import_id):
+    """Progresso de uma importação (JSON, consultado periodicamente pela página)."""
+    job = get_object_or_404(PropertyImport, pk=import_id, site__owner=request.user)
+    return JsonResponse(_import_status(job))
@@ -0,0 +1,29 @@
+"""
+Loader de templates com cache que permite descartar os templates de um único tema.
+
+Substitui o django.template.loaders.cached.Loader no TEMPLATES: os templates
+continuam compilados em memória, e os nomes em landings/themes/<slug>/ verificam
+periodicamente se o tema foi atualizado (ver apps.themes.template_cache).
+"""
+
+from django.template.loaders import cached
+
+from .template_cache import THEMES_TEMPLATE_PREFIX, check_theme_updates, register_theme_template
+
+
+class Loader(cached.Loader):
+    """cached.Loader com descarte por prefixo do nome do template"""
+
+    def get_template(self, template_name, skip=None):
+        if template_name.startswith(THEMES_TEMPLATE_PREFIX):
+            register_theme_template(template_name)
+            check_theme_updates()
+        return super().get_template(template_name, skip)
+
+    def evict_prefix(self, prefix: str) -> int:
+        """Remove do cache os templates (e as ausências) cujo nome começa com o prefixo"""
+        # As chaves são "<nome>" ou "<nome>-<hash das origens ignoradas>"
+        keys = [key for key in list(self.get_template_cache) if key.startswith(prefix)]
+        for key in keys:
+            self.get_template_cache.pop(key, None)
+        return len(keys)
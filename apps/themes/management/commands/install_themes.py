@@ -62,19 +62,17 @@ class Command(BaseCommand):
         if themes:
             self.stdout.write(self.style.SUCCESS(f"\n📦 Encontrados {len(themes)} tema(s):\n"))
             for theme in themes:
-                category = theme.get("category", "?")
-                version = theme.get("version", "?")
-                premium = " [PREMIUM]" if theme.get("premium", False) else ""
-                self.stdout.write(f"  • {theme['name']} ({theme['slug']}) - v{version} - {category}{premium}")
-                if theme.get("description"):
-                    self.stdout.write(f"    {theme['description']}")
+                premium = " [PREMIUM]" if theme.premium else ""
+                self.stdout.write(f"  • {theme.name} ({theme.slug}) - v{theme.version} - {theme.category}{premium}")
+                if theme.description:
+                    self.stdout.write(f"    {theme.description}")
             self.stdout.write("")
         else:
             self.stdout.write(self.style.WARNING("\n❌ Nenhum tema encontrado\n"))
 
     def _validate_themes(self, manager: ThemeManager, theme_slugs: list):
         """Valida a estrutura dos temas"""
-        themes_to_validate = theme_slugs if theme_slugs else [t["slug"] for t in manager.scan_themes()]
+        themes_to_validate = theme_slugs if theme_slugs else [t.slug for t in manager.scan_themes()]
 
         if not themes_to_validate:
             self.stdout.write(self.style.WARNING("\n❌ Nenhum tema para validar\n"))
@@ -4,13 +4,11 @@ Utilitário para gerenciar temas de landing pages.
 Permite escanear, instalar e atualizar temas automaticamente
 a partir das pastas em templates/landings/themes/
 """
-import json
-from pathlib import Path
-
-from django.conf import settings
 from django.core.files import File
 
+from .manifests import ThemeManifest, ThemeManifestError, get_manifest, load_manifest, scan_manifests, themes_dir
 from .models import Theme
+from .template_cache import publish_theme_templates
 
 
 class ThemeManager:
@@ -18,32 +16,19 @@ class ThemeManager:
 
     def __init__(self):
         """Inicializa o gerenciador"""
-        self.themes_dir = Path(settings.BASE_DIR) / "templates" / "landings" / "themes"
+        self.themes_dir = themes_dir()
 
-    def scan_themes(self) -> list[dict]:
+    def scan_themes(self) -> list[ThemeManifest]:
         """
         Escaneia a pasta de temas e retorna lista de temas encontrados.
 
         Returns:
-            Lista de dicionários com configurações dos temas (theme.json)
+            Lista de manifestos validados (theme.json)
         """
-        if not self.themes_dir.exists():
-            return []
-
-        themes = []
-        for theme_dir in self.themes_dir.iterdir():
-            if theme_dir.is_dir():
-                config_file = theme_dir / "theme.json"
-                if config_file.exists():
-                    try:
-                        with open(config_file, encoding="utf-8") as f:
-                            config = json.load(f)
-                            config["path"] = str(theme_dir)
-                            themes.append(config)
-                    except (OSError, json.JSONDecodeError) as e:
-                        print(f"⚠️  Erro ao ler {config_file}: {e}")
-
-        return themes
+        manifests, errors = scan_manifests()
+        for slug, error in errors.items():
+            print(f"⚠️  Erro ao ler theme.json do tema '{slug}': {error}")
+        return manifests
 
     def install_theme(self, slug: str, force_update: bool = False) -> Theme | None:
         """
@@ -57,43 +42,35 @@ class ThemeManager:
             Instância de Theme criada/atualizada ou None em caso de erro
         """
         theme_dir = self.themes_dir / slug
-        config_file = theme_dir / "theme.json"
-
-        if not config_file.exists():
-            raise FileNotFoundError(f"Tema '{slug}' não encontrado em {theme_dir}")
 
         try:
-            with open(config_file, encoding="utf-8") as f:
-                config = json.load(f)
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Arquivo theme.json inválido para tema '{slug}': {e}")
-
-        # Valida campos obrigatórios
-        if "name" not in config:
-            raise ValueError(f"Campo 'name' obrigatório no theme.json do tema '{slug}'")
+            manifest = load_manifest(slug)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Tema '{slug}' não encontrado em {theme_dir}") from None
+        except ThemeManifestError as e:
+            raise ValueError(f"Arquivo theme.json inválido para tema '{slug}': {e}") from e
 
         # Cria ou atualiza o tema
         defaults = {
-            "name": config.get("name", slug),
-            "description": config.get("description", ""),
-            "author": config.get("author", ""),
-            "version": config.get("version", "1.0.0"),
-            "category": config.get("category", "modern"),
-            "default_primary_color": config.get("colors", {}).get("primary", "#007bff"),
-            "default_secondary_color": config.get("colors", {}).get("secondary", "#6c757d"),
-            "features": config.get("features", []),
+            "name": manifest.name,
+            "description": manifest.description,
+            "author": manifest.author,
+            "version": manifest.version,
+            "category": manifest.category,
+            "default_primary_color": manifest.primary_color,
+            "default_secondary_color": manifest.secondary_color,
+            "features": list(manifest.features),
             "is_active": True,
         }
 
         # Se premium está definido no JSON, usa o valor
-        if "premium" in config:
-            defaults["is_premium"] = config["premium"]
+        if manifest.premium is not None:
+            defaults["is_premium"] = manifest.premium
 
         theme, created = Theme.objects.update_or_create(slug=slug, defaults=defaults)
 
         # Atualiza screenshot se existir e ainda não tiver sido definido
-        screenshot_filename = config.get("screenshot", "preview.jpg")
-        screenshot_file = theme_dir / screenshot_filename
+        screenshot_file = theme_dir / manifest.screenshot
 
         if screenshot_file.exists() and (not theme.screenshot or force_update):
             try:
@@ -102,11 +79,31 @@ class ThemeManager:
             except OSError as e:
                 print(f"⚠️  Erro ao salvar screenshot do tema '{slug}': {e}")
 
+        # Workers descartam os templates compilados do tema se os arquivos ou a versão mudaram
+        if publish_theme_templates(slug, manifest.version) and not created:
+            sites = self._bump_theme_sites(slug)
+            print(f"🔄 Templates do tema '{slug}' serão recarregados nos workers ({sites} site(s) atualizado(s))")
+
         action = "instalado" if created else "atualizado"
-        print(f"✅ Tema '{config['name']}' ({slug}) {action} com sucesso!")
+        print(f"✅ Tema '{manifest.name}' ({slug}) {action} com sucesso!")
 
         return theme
 
+    @staticmethod
+    def _bump_theme_sites(slug: str) -> int:
+        """
+        Invalida as páginas cacheadas dos sites que usam o tema. O tema padrão
+        também é o fallback das páginas que os outros temas não têm: afeta todos.
+        """
+        from apps.landings.models import Site
+        from apps.landings.page_cache import bump_site_version
+
+        sites = Site.objects.all() if slug == "default" else Site.objects.filter(theme__slug=slug)
+        site_ids = list(sites.values_list("pk", flat=True))
+        for site_id in site_ids:
+            bump_site_version(site_id)
+        return len(site_ids)
+
     def install_all_themes(self, force_update: bool = False) -> int:
         """
         Instala todos os temas encontrados na pasta de temas.
@@ -126,16 +123,16 @@ class ThemeManager:
         print(f"📦 Encontrados {len(themes)} tema(s)")
 
         installed_count = 0
-        for theme_config in themes:
+        for manifest in themes:
             try:
-                self.install_theme(theme_config["slug"], force_update=force_update)
+                self.install_theme(manifest.slug, force_update=force_update)
                 installed_count += 1
             except Exception as e:
-                print(f"❌ Erro ao instalar tema '{theme_config.get('slug', '?')}': {e}")
+                print(f"❌ Erro ao instalar tema '{manifest.slug}': {e}")
 
         return installed_count
 
-    def get_theme_info(self, slug: str) -> dict:
+    def get_theme_info(self, slug: str) -> ThemeManifest | None:
         """
         Retorna informações do tema a partir do theme.json.
 
@@ -143,19 +140,9 @@ class ThemeManager:
             slug: Slug do tema
 
         Returns:
-            Dicionário com configurações do tema ou {} se não encontrado
+            Manifesto validado do tema ou None se não encontrado/inválido
         """
-        theme_dir = self.themes_dir / slug
-        config_file = theme_dir / "theme.json"
-
-        if not config_file.exists():
-            return {}
-
-        try:
-            with open(config_file, encoding="utf-8") as f:
-                return json.load(f)
-        except (OSError, json.JSONDecodeError):
-            return {}
+        return get_manifest(slug)
 
     def validate_theme(self, slug: str) -> tuple[bool, list[str]]:
         """
@@ -180,19 +167,11 @@ class ThemeManager:
         if not config_file.exists():
             errors.append("Arquivo theme.json não encontrado")
         else:
-            # Valida o JSON
+            # Valida o JSON e o esquema do manifesto
             try:
-                with open(config_file, encoding="utf-8") as f:
-                    config = json.load(f)
-
-                # Valida campos obrigatórios
-                required_fields = ["name", "slug"]
-                for field in required_fields:
-                    if field not in config:
-                        errors.append(f"Campo obrigatório ausente no theme.json: {field}")
-
-            except json.JSONDecodeError:
-                errors.append("Arquivo theme.json com formato inválido")
+                load_manifest(slug)
+            except ThemeManifestError as e:
+                errors.extend(e.errors)
 
         # Verifica se index.html existe
         index_file = theme_dir / "index.html"
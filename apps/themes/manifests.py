@@ -0,0 +1,249 @@
+"""
+Registro dos manifestos dos temas (theme.json).
+
+Cada theme.json é lido e validado uma única vez por processo e guardado em
+memória junto com o mtime e o tamanho do arquivo: as consultas seguintes fazem
+apenas um stat() e só relêem o arquivo se ele mudou (ex: install_themes ou
+deploy de um tema novo). Theme, ThemeManager e o dashboard usam o mesmo
+registro e recebem um ThemeManifest validado em vez do dicionário cru.
+"""
+
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "theme.json"
+
+# Mesmo formato dos campos de cor do Theme (max_length=7)
+COLOR_RE = re.compile(r"^#[0-9a-fA-F]{6}$")
+
+DEFAULT_PRIMARY_COLOR = "#007bff"
+DEFAULT_SECONDARY_COLOR = "#6c757d"
+
+
+class ThemeManifestError(ValueError):
+    """theme.json com JSON inválido ou fora do esquema"""
+
+    def __init__(self, errors: str | list[str]):
+        self.errors = [errors] if isinstance(errors, str) else list(errors)
+        super().__init__("; ".join(self.errors))
+
+
+@dataclass(frozen=True)
+class ThemeSection:
+    """Seção configurável do tema exibida no editor do dashboard"""
+
+    key: str
+    name: str
+    icon: str = "fa-puzzle-piece"
+    description: str = ""
+
+
+# Seções usadas quando o theme.json não declara "sections"
+DEFAULT_SECTIONS = (
+    ThemeSection("hero", _("Banner Principal"), "fa-image", _("Banner principal do site")),
+    ThemeSection("about", _("Sobre"), "fa-user", _("Seção sobre você/empresa")),
+    ThemeSection("services", _("Serviços"), "fa-briefcase", _("Lista de serviços oferecidos")),
+    ThemeSection("properties", _("Imóveis"), "fa-home", _("Galeria de imóveis")),
+    ThemeSection("contact", _("Contato"), "fa-envelope", _("Formulário e informações de contato")),
+)
+
+
+@dataclass(frozen=True)
+class ThemeManifest:
+    """Conteúdo validado do theme.json de um tema"""
+
+    slug: str
+    name: str
+    path: Path
+    version: str = "1.0.0"
+    author: str = ""
+    description: str = ""
+    screenshot: str = "preview.jpg"
+    category: str = "modern"
+    premium: bool | None = None
+    tags: tuple[str, ...] = ()
+    features: tuple[str, ...] = ()
+    colors: dict[str, str] = field(default_factory=dict)
+    sections: tuple[ThemeSection, ...] = ()
+
+    @property
+    def primary_color(self) -> str:
+        return self.colors.get("primary", DEFAULT_PRIMARY_COLOR)
+
+    @property
+    def secondary_color(self) -> str:
+        return self.colors.get("secondary", DEFAULT_SECONDARY_COLOR)
+
+    @classmethod
+    def from_dict(cls, data: Any, path: Path) -> "ThemeManifest":
+        """
+        Valida o conteúdo do theme.json.
+
+        Raises:
+            ThemeManifestError: com todos os problemas encontrados
+        """
+        if not isinstance(data, dict):
+            raise ThemeManifestError("theme.json deve conter um objeto JSON")
+
+        errors = []
+
+        def text(key: str, default: str = "", required: bool = False) -> str:
+            value = data.get(key, default)
+            if required and key not in data:
+                errors.append(f"Campo obrigatório ausente no theme.json: {key}")
+            elif not isinstance(value, str | int | float) or isinstance(value, bool):
+                errors.append(f"Campo '{key}' deve ser texto")
+                return default
+            return str(value)
+
+        def strings(key: str) -> tuple[str, ...]:
+            value = data.get(key, [])
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                errors.append(f"Campo '{key}' deve ser uma lista de textos")
+                return ()
+            return tuple(value)
+
+        slug = text("slug", required=True)
+        if slug and slug != path.name:
+            errors.append(f"Campo 'slug' ({slug}) diferente do nome da pasta do tema ({path.name})")
+
+        colors = data.get("colors", {})
+        if not isinstance(colors, dict):
+            errors.append("Campo 'colors' deve ser um objeto")
+            colors = {}
+        for key, value in colors.items():
+            if not isinstance(value, str) or not COLOR_RE.match(value):
+                errors.append(f"Cor '{key}' inválida (use #RRGGBB): {value}")
+
+        premium = data.get("premium")
+        if premium is not None and not isinstance(premium, bool):
+            errors.append("Campo 'premium' deve ser true ou false")
+
+        sections = []
+        raw_sections = data.get("sections", [])
+        if not isinstance(raw_sections, list):
+            errors.append("Campo 'sections' deve ser uma lista")
+            raw_sections = []
+        for index, section in enumerate(raw_sections):
+            if not isinstance(section, dict) or not isinstance(section.get("key"), str) or not section["key"]:
+                errors.append(f"Seção {index} sem 'key'")
+                continue
+            sections.append(
+                ThemeSection(
+                    key=section["key"],
+                    name=str(section.get("name", section["key"])),
+                    icon=str(section.get("icon", ThemeSection.icon)),
+                    description=str(section.get("description", "")),
+                )
+            )
+
+        manifest = cls(
+            slug=slug,
+            name=text("name", required=True),
+            path=path,
+            version=text("version", "1.0.0"),
+            author=text("author"),
+            description=text("description"),
+            screenshot=text("screenshot", "preview.jpg"),
+            category=text("category", "modern"),
+            premium=premium if isinstance(premium, bool) else None,
+            tags=strings("tags"),
+            features=strings("features"),
+            colors=dict(colors),
+            sections=tuple(sections),
+        )
+        if errors:
+            raise ThemeManifestError(errors)
+        return manifest
+
+
+def themes_dir() -> Path:
+    """Pasta dos temas (templates/landings/themes/)"""
+    return Path(settings.BASE_DIR) / "templates" / "landings" / "themes"
+
+
+_lock = threading.Lock()
+# slug -> ((mtime_ns, tamanho), manifesto ou erro de validação)
+_registry: dict[str, tuple[tuple[int, int], ThemeManifest | ThemeManifestError]] = {}
+
+
+def load_manifest(slug: str) -> ThemeManifest:
+    """
+    Manifesto validado do tema, relido apenas se o theme.json mudou.
+
+    Raises:
+        FileNotFoundError: tema sem theme.json
+        ThemeManifestError: theme.json inválido
+    """
+    theme_dir = themes_dir() / slug
+    config_file = theme_dir / MANIFEST_FILENAME
+    stat = config_file.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    entry = _registry.get(slug)
+    if entry is None or entry[0] != stamp:
+        try:
+            with open(config_file, encoding="utf-8") as f:
+                data = json.load(f)
+            result = ThemeManifest.from_dict(data, theme_dir)
+        except (OSError, json.JSONDecodeError) as e:
+            result = ThemeManifestError(f"Arquivo {MANIFEST_FILENAME} com formato inválido: {e}")
+        except ThemeManifestError as e:
+            result = e
+        entry = (stamp, result)
+        with _lock:
+            _registry[slug] = entry
+
+    if isinstance(entry[1], ThemeManifestError):
+        raise entry[1]
+    return entry[1]
+
+
+def get_manifest(slug: str) -> ThemeManifest | None:
+    """Manifesto do tema ou None se não existir ou for inválido"""
+    try:
+        return load_manifest(slug)
+    except FileNotFoundError:
+        return None
+    except ThemeManifestError as e:
+        logger.warning(f"theme.json inválido no tema {slug}: {e}")
+        return None
+
+
+def scan_manifests() -> tuple[list[ThemeManifest], dict[str, ThemeManifestError]]:
+    """
+    Manifestos de todas as pastas de temas.
+
+    Returns:
+        Tupla (manifestos válidos ordenados por slug, erros por slug)
+    """
+    base_dir = themes_dir()
+    if not base_dir.exists():
+        return [], {}
+
+    manifests = []
+    errors = {}
+    for theme_dir in sorted(path for path in base_dir.iterdir() if path.is_dir()):
+        try:
+            manifests.append(load_manifest(theme_dir.name))
+        except FileNotFoundError:
+            continue
+        except ThemeManifestError as e:
+            errors[theme_dir.name] = e
+    return manifests, errors
+
+
+def clear_manifests() -> None:
+    """Esquece os manifestos carregados neste processo"""
+    with _lock:
+        _registry.clear()
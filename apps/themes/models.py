@@ -1,7 +1,6 @@
 """
 Models do app Themes - Sistema de temas para landing pages
 """
-import json
 from pathlib import Path
 
 from django.conf import settings
@@ -9,6 +8,8 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from .manifests import ThemeManifest, get_manifest
+
 
 class Theme(models.Model):
     """
@@ -76,15 +77,9 @@ class Theme(models.Model):
         base_template_dir = Path(settings.BASE_DIR) / "templates"
         return base_template_dir / "landings" / "themes" / self.slug
 
-    def get_theme_config(self) -> dict:
-        """Lê o arquivo theme.json do tema"""
-        theme_dir = self.get_theme_dir()
-        config_file = theme_dir / "theme.json"
-
-        if config_file.exists():
-            with open(config_file, encoding="utf-8") as f:
-                return json.load(f)
-        return {}
+    def get_manifest(self) -> ThemeManifest | None:
+        """Manifesto validado do theme.json (lido uma vez por processo)"""
+        return get_manifest(self.slug)
 
     def validate_theme_exists(self):
         """Valida se a pasta do tema existe"""
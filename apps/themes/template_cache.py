@@ -0,0 +1,183 @@
+"""
+Cache dos templates compilados dos temas, com atualização sem reiniciar os workers.
+
+Os templates ficam compilados em memória no loader apps.themes.loaders.Loader
+(um cached.Loader do Django). Na inicialização do gunicorn (wsgi.py, com
+preload_app) todos os templates das landing pages são compilados no processo
+principal, e os workers já nascem com eles (memória compartilhada pelo fork).
+
+Quando o install_themes atualiza um tema, ele publica no Redis a impressão
+digital do tema (conteúdo dos arquivos + versão do theme.json). Cada worker
+compara as impressões publicadas com as que conhece, no máximo a cada
+THEME_TEMPLATE_CHECK_INTERVAL segundos, e descarta apenas os templates do tema
+alterado - os demais temas continuam compilados.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+from .manifests import get_manifest, themes_dir
+
+logger = logging.getLogger(__name__)
+
+# Prefixo dos nomes de template dos temas (landings/themes/<slug>/...)
+THEMES_TEMPLATE_PREFIX = "landings/themes/"
+
+# Templates compilados na inicialização (temas e componentes compartilhados das landing pages)
+WARM_TEMPLATE_PATTERNS = ("landings/themes/**/*.html", "landings/_components/*.html", "landings/*.html")
+
+_lock = threading.Lock()
+_known: dict[str, str | None] = {}
+_last_check = 0.0
+
+
+def _fingerprint_key(slug: str) -> str:
+    return f"theme:templates:{slug}"
+
+
+def theme_fingerprint(slug: str, version: str = "") -> str:
+    """Hash do conteúdo de todos os arquivos do tema e da versão (igual entre servidores com os mesmos arquivos)"""
+    digest = hashlib.sha256(version.encode())
+    theme_dir = themes_dir() / slug
+    for path in sorted(p for p in theme_dir.rglob("*") if p.is_file()):
+        digest.update(str(path.relative_to(theme_dir)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _cached_loaders() -> list:
+    from .loaders import Loader
+
+    loaders = []
+    for engine in engines.all():
+        if isinstance(engine, DjangoTemplates):
+            loaders.extend(loader for loader in engine.engine.template_loaders if isinstance(loader, Loader))
+    return loaders
+
+
+def evict_theme_templates(slug: str) -> int:
+    """Descarta os templates compilados do tema neste processo; retorna quantos foram removidos"""
+    return sum(loader.evict_prefix(f"{THEMES_TEMPLATE_PREFIX}{slug}/") for loader in _cached_loaders())
+
+
+def publish_theme_templates(slug: str, version: str = "") -> bool:
+    """
+    Publica a impressão digital do tema para os workers (chamado pelo install_themes).
+
+    Returns:
+        True se o tema mudou em relação à impressão publicada anteriormente
+    """
+    fingerprint = theme_fingerprint(slug, version)
+    key = _fingerprint_key(slug)
+    try:
+        changed = cache.get(key) != fingerprint
+        cache.set(key, fingerprint, timeout=None)
+    except Exception as e:
+        logger.warning(f"Erro ao publicar templates do tema {slug}: {e}")
+        changed = True
+
+    if changed:
+        evict_theme_templates(slug)
+    with _lock:
+        _known[slug] = fingerprint
+    return changed
+
+
+def register_theme_template(template_name: str) -> None:
+    """Passa a acompanhar o tema do template (temas instalados depois da inicialização)"""
+    slug = template_name[len(THEMES_TEMPLATE_PREFIX) :].partition("/")[0]
+    if slug and slug not in _known:
+        with _lock:
+            _known.setdefault(slug, None)
+
+
+def check_theme_updates(force: bool = False) -> list[str]:
+    """
+    Descarta os templates dos temas cuja impressão publicada mudou (no máximo a
+    cada THEME_TEMPLATE_CHECK_INTERVAL segundos). Retorna os slugs atualizados.
+    """
+    global _last_check
+
+    interval = getattr(settings, "THEME_TEMPLATE_CHECK_INTERVAL", 5)
+    now = time.monotonic()
+    with _lock:
+        if not _known or (not force and now - _last_check < interval):
+            return []
+        _last_check = now
+        known = dict(_known)
+
+    try:
+        published = cache.get_many([_fingerprint_key(slug) for slug in known])
+    except Exception as e:
+        logger.warning(f"Erro ao verificar atualização de temas: {e}")
+        return []
+
+    updated = []
+    for slug, fingerprint in known.items():
+        current = published.get(_fingerprint_key(slug))
+        if current is not None and current != fingerprint:
+            evict_theme_templates(slug)
+            updated.append(slug)
+            with _lock:
+                _known[slug] = current
+    if updated:
+        logger.info(f"🔄 Templates recarregados dos temas: {', '.join(updated)}")
+    return updated
+
+
+def warm_theme_templates() -> int:
+    """
+    Compila os templates das landing pages (temas e componentes) em todos os
+    loaders com cache. Não acessa o Redis (roda antes do fork dos workers).
+
+    Returns:
+        Quantidade de templates compilados
+    """
+    global _last_check
+
+    # Impressões locais: o primeiro check só descarta temas alterados depois da inicialização
+    base_dir = themes_dir()
+    slugs = [path.name for path in base_dir.iterdir() if path.is_dir()] if base_dir.exists() else []
+    fingerprints = {slug: theme_fingerprint(slug, _theme_version(slug)) for slug in slugs}
+    with _lock:
+        _known.update(fingerprints)
+        # Sem consulta ao Redis durante a compilação
+        _last_check = float("inf")
+
+    templates_dir = Path(settings.BASE_DIR) / "templates"
+    names = [
+        str(path.relative_to(templates_dir))
+        for pattern in WARM_TEMPLATE_PATTERNS
+        for path in sorted(templates_dir.glob(pattern))
+    ]
+
+    compiled = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        for name in names:
+            try:
+                engine.get_template(name)
+                compiled += 1
+            except TemplateSyntaxError as e:
+                logger.error(f"Erro ao compilar template {name}: {e}")
+
+    with _lock:
+        _last_check = time.monotonic()
+
+    logger.info(f"✅ {compiled} templates de temas compilados ({len(slugs)} temas)")
+    return compiled
+
+
+def _theme_version(slug: str) -> str:
+    """Versão do theme.json (a mesma usada pelo install_themes)"""
+    manifest = get_manifest(slug)
+    return manifest.version if manifest else "1.0.0"
@@ -47,6 +47,7 @@ BASE_APPS = [
     "django.contrib.messages",  # Framework de mensagens
     "django.contrib.staticfiles",  # Gestão de arquivos estáticos
     "django.contrib.sites",  # Framework de sites (requerido pelo allauth)
+    "django.contrib.postgres",  # Busca textual e lookups de trigramas (busca de imóveis)
 ]
 
 # Bibliotecas de terceiros
@@ -98,8 +99,18 @@ TEMPLATES = [
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         # CUSTOMIZADO: Templates centralizados em /templates (não dentro de cada app)
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,  # Também busca em templates/ dentro de cada app instalado (Precisa para o crispy)
         "OPTIONS": {
+            # CUSTOMIZADO: Templates compilados em cache, com recarga por tema (apps.themes.template_cache)
+            # O app_directories busca em templates/ dentro de cada app instalado (Precisa para o crispy)
+            "loaders": [
+                (
+                    "apps.themes.loaders.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",  # Necessário para allauth e crispy-forms
@@ -117,6 +128,8 @@ TEMPLATES = [
 # ============================================================================
 
 ROOT_URLCONF = "config.urls"
+# CUSTOMIZADO: URLs usadas nas requisições de sites (tenants) - definidas pelo TenantMiddleware
+TENANT_URLCONF = "config.urls_tenant"
 WSGI_APPLICATION = "config.wsgi.application"
 
 
@@ -170,20 +183,23 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 # BANCO DE DADOS
 # ============================================================================
 
+DB_ENGINE = config("DB_ENGINE", default="django.db.backends.postgresql")
+
 DATABASES = {
     "default": {
-        "ENGINE": config("DB_ENGINE", default="django.db.backends.postgresql"),
+        "ENGINE": DB_ENGINE,
         "NAME": config("DB_NAME", default="propzy"),
         "USER": config("DB_USER", default="propzy"),
         "PASSWORD": config("DB_PASSWORD", default="propzy123"),
         "HOST": config("DB_HOST", default="localhost"),
         "PORT": config("DB_PORT", default="5432"),
         "CONN_MAX_AGE": 600,  # CUSTOMIZADO: Mantém conexões por 10min (pool de conexões)
-        "OPTIONS": {
-            "connect_timeout": 10,  # Timeout de conexão de 10 segundos
-        },
+        "OPTIONS": {},
     }
 }
+# CUSTOMIZADO: Opção exclusiva do PostgreSQL (o SQLite, usado no benchmark_queries offline, a rejeita)
+if DB_ENGINE == "django.db.backends.postgresql":
+    DATABASES["default"]["OPTIONS"]["connect_timeout"] = 10  # Timeout de conexão de 10 segundos
 
 
 # ============================================================================
@@ -311,9 +327,39 @@ CELERY_TASK_DEFAULT_QUEUE = "default"
 CELERY_TASK_DEFAULT_EXCHANGE = "default"
 CELERY_TASK_DEFAULT_ROUTING_KEY = "default"
 
+# CUSTOMIZADO: Processamento de imagens em fila dedicada (não atrasa emails, DNS, SSL...)
+# Em produção roda em um worker próprio: celery -A config worker -Q media
+CELERY_TASK_ROUTES = {
+    "apps.properties.tasks.normalize_property_image": {"queue": "media"},
+    "apps.properties.tasks.generate_property_image_variants": {"queue": "media"},
+    "apps.landings.tasks.normalize_site_image": {"queue": "media"},
+    "apps.landings.tasks.normalize_section_image": {"queue": "media"},
+    # Importação em lote: baixa as fotos dos feeds (I/O), fora da fila padrão
+    "apps.properties.tasks.process_property_import": {"queue": "media"},
+}
+
 # Configurações de beat (para tarefas agendadas)
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
+# CUSTOMIZADO: Tarefas periódicas (o DatabaseScheduler as grava nas Periodic Tasks ao iniciar o Beat)
+CELERY_BEAT_SCHEDULE = {
+    # Domínios personalizados: verificação DNS, emissão e renovação dos certificados SSL
+    "provision-custom-domains": {
+        "task": "apps.infrastructure.tasks.provision_custom_domains",
+        "schedule": 60.0,
+    },
+    # Upload de fotos em lote: remove as partes dos uploads abandonados (CHUNKED_UPLOAD_TTL)
+    "cleanup-stale-uploads": {
+        "task": "apps.properties.tasks.cleanup_stale_uploads",
+        "schedule": 3600.0,
+    },
+    # Dashboard administrativo: reconta os contadores do Redis e corrige desvios
+    "reconcile-dashboard-stats": {
+        "task": "apps.administration.tasks.reconcile_dashboard_stats",
+        "schedule": 3600.0,
+    },
+}
+
 
 # ============================================================================
 # ARQUIVOS ESTÁTICOS (CSS, JavaScript, Images)
@@ -329,6 +375,27 @@ STATICFILES_DIRS = [
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# CUSTOMIZADO: Upload em lote/partes (chunks) de imagens de imóveis
+# Diretório temporário compartilhado pelos workers web (partes recebidas ainda não concluídas)
+CHUNKED_UPLOAD_DIR = config("CHUNKED_UPLOAD_DIR", default=str(BASE_DIR / "tmp" / "uploads"))
+CHUNKED_UPLOAD_CHUNK_SIZE = config("CHUNKED_UPLOAD_CHUNK_SIZE", default=2 * 1024 * 1024, cast=int)  # 2MB por parte
+CHUNKED_UPLOAD_MAX_FILE_SIZE = config("CHUNKED_UPLOAD_MAX_FILE_SIZE", default=10 * 1024 * 1024, cast=int)  # 10MB
+CHUNKED_UPLOAD_MAX_FILES = config("CHUNKED_UPLOAD_MAX_FILES", default=50, cast=int)  # Arquivos por lote
+CHUNKED_UPLOAD_TTL = config("CHUNKED_UPLOAD_TTL", default=86400, cast=int)  # Lote expira em 24h sem atividade
+
+# CUSTOMIZADO: Normalização das imagens enviadas (orientação, dimensões, metadados, recompressão)
+MEDIA_NORMALIZE_MAX_DIMENSION = config("MEDIA_NORMALIZE_MAX_DIMENSION", default=2560, cast=int)  # Maior lado (px)
+MEDIA_NORMALIZE_QUALITY = config("MEDIA_NORMALIZE_QUALITY", default=82, cast=int)  # Qualidade JPEG
+
+# CUSTOMIZADO: Importação em lote de imóveis (CSV e XML VivaReal/ZAP)
+PROPERTY_IMPORT_MAX_FILE_SIZE = config("PROPERTY_IMPORT_MAX_FILE_SIZE", default=50 * 1024 * 1024, cast=int)  # 50MB
+PROPERTY_IMPORT_BATCH_SIZE = config("PROPERTY_IMPORT_BATCH_SIZE", default=50, cast=int)  # Imóveis por transação
+# Segundos por execução da tarefa (abaixo do CELERY_TASK_SOFT_TIME_LIMIT); depois continua em uma nova tarefa
+PROPERTY_IMPORT_TIME_BUDGET = config("PROPERTY_IMPORT_TIME_BUDGET", default=150, cast=int)
+PROPERTY_IMPORT_IMAGE_WORKERS = config("PROPERTY_IMPORT_IMAGE_WORKERS", default=8, cast=int)  # Downloads simultâneos
+PROPERTY_IMPORT_IMAGE_TIMEOUT = config("PROPERTY_IMPORT_IMAGE_TIMEOUT", default=15, cast=int)  # Segundos por foto
+PROPERTY_IMPORT_MAX_IMAGES = config("PROPERTY_IMPORT_MAX_IMAGES", default=20, cast=int)  # Fotos por imóvel
+
 
 # ============================================================================
 # AWS S3 (Armazenamento em Nuvem - Opcional)
@@ -485,3 +552,42 @@ BASE_DOMAIN = config("BASE_DOMAIN", default="propzy.com.br")
 # ALLOWED_HOSTS deve incluir o domínio base e seus subdomínios (wildcard)
 # Em produção, configure: ALLOWED_HOSTS=.propzy.com.br,propzy.com.br
 # O ponto antes do domínio permite todos os subdomínios
+
+# CUSTOMIZADO: Verificação do DNS dos domínios personalizados (ver apps.infrastructure.dns_check)
+# Destino esperado: CNAME para o domínio base ou registro A para um dos IPs abaixo
+# (vazio = IPs do próprio domínio base, resolvidos a cada varredura)
+CUSTOM_DOMAIN_CNAME_TARGET = config("CUSTOM_DOMAIN_CNAME_TARGET", default=BASE_DOMAIN)
+CUSTOM_DOMAIN_EXPECTED_IPS = config("CUSTOM_DOMAIN_EXPECTED_IPS", default="", cast=Csv())
+DNS_CHECK_TIMEOUT = config("DNS_CHECK_TIMEOUT", default=5, cast=float)  # Segundos por domínio
+DNS_CHECK_CONCURRENCY = config("DNS_CHECK_CONCURRENCY", default=32, cast=int)  # Consultas simultâneas
+DNS_CHECK_BATCH_SIZE = config("DNS_CHECK_BATCH_SIZE", default=500, cast=int)  # Domínios por varredura
+# Backoff exponencial entre verificações de um domínio ainda não configurado: 5 min, 10 min, 20 min... até 6h
+DNS_CHECK_BACKOFF_BASE = config("DNS_CHECK_BACKOFF_BASE", default=300, cast=int)  # segundos
+DNS_CHECK_BACKOFF_MAX = config("DNS_CHECK_BACKOFF_MAX", default=21600, cast=int)  # segundos
+
+# CUSTOMIZADO: Certificados SSL dos domínios personalizados (ver apps.infrastructure.provisioning)
+# Backoff entre tentativas de emissão que falharam: 15 min, 30 min, 1h... até 1 dia (limites do Let's Encrypt)
+SSL_ISSUE_BACKOFF_BASE = config("SSL_ISSUE_BACKOFF_BASE", default=900, cast=int)  # segundos
+SSL_ISSUE_BACKOFF_MAX = config("SSL_ISSUE_BACKOFF_MAX", default=86400, cast=int)  # segundos
+SSL_RENEW_BEFORE_DAYS = config("SSL_RENEW_BEFORE_DAYS", default=30, cast=int)  # Renova N dias antes de vencer
+# Emissão/renovação sem resposta após este tempo (worker reiniciado, mensagem perdida) volta para a fila
+SSL_TASK_TIMEOUT = config("SSL_TASK_TIMEOUT", default=900, cast=int)  # segundos
+
+# CUSTOMIZADO: Cache de resolução host -> Site do TenantMiddleware (ver apps.landings.tenant_cache)
+# Camada local (LRU por worker) com TTL curto: mudanças de domínio aparecem em poucos segundos em todos os workers
+TENANT_CACHE_LOCAL_MAXSIZE = config("TENANT_CACHE_LOCAL_MAXSIZE", default=1024, cast=int)
+TENANT_CACHE_LOCAL_TTL = config("TENANT_CACHE_LOCAL_TTL", default=5, cast=int)  # segundos
+# Camada compartilhada (Redis), invalidada pelos signals de Site
+TENANT_CACHE_TTL = config("TENANT_CACHE_TTL", default=300, cast=int)  # 5 minutos
+TENANT_CACHE_NEGATIVE_TTL = config("TENANT_CACHE_NEGATIVE_TTL", default=60, cast=int)  # hosts não registrados
+
+# CUSTOMIZADO: Cache de página inteira das páginas públicas dos sites (ver apps.landings.page_cache)
+# Invalidação por versão de conteúdo do site (signals); o TTL apenas limita o tempo de vida no Redis
+PAGE_CACHE_TTL = config("PAGE_CACHE_TTL", default=600, cast=int)  # 10 minutos
+
+# CUSTOMIZADO: Intervalo (segundos) para os workers verificarem temas atualizados pelo install_themes
+THEME_TEMPLATE_CHECK_INTERVAL = config("THEME_TEMPLATE_CHECK_INTERVAL", default=5, cast=int)
+
+# CUSTOMIZADO: Cache do resumo de onboarding por usuário (ver apps.core.utils.get_onboarding_summary)
+# Invalidado pelos signals de Site, Property e OnboardingStatus; o TTL apenas limita o tempo de vida no Redis
+ONBOARDING_CACHE_TTL = config("ONBOARDING_CACHE_TTL", default=3600, cast=int)  # 1 hora
@@ -25,12 +25,15 @@ urlpatterns += i18n_patterns(
 # Não tem prefixo de idioma para funcionar com domínios/subdomínios personalizados
 # O middleware TenantMiddleware detecta se é um site válido
 from apps.core.views import root_view
-from apps.landings.views import properties_list, property_detail
+from apps.landings.views import properties_list, property_detail, property_feed, robots_txt, sitemap_xml
 
 urlpatterns += [
     # Páginas públicas do site (acessadas diretamente no domínio do site)
     path("imoveis/", properties_list, name="landings_properties_list"),
     path("imovel/<int:pk>/", property_detail, name="landings_property_detail"),
+    path("feed/imoveis.<str:feed_format>", property_feed, name="landings_property_feed"),
+    path("sitemap.xml", sitemap_xml, name="landings_sitemap"),
+    path("robots.txt", robots_txt, name="landings_robots"),
     # View raiz que decide: mostra site se válido, senão mostra página inicial
     path("", root_view, name="root"),
 ]
@@ -0,0 +1,21 @@
+"""
+URLs dos sites públicos (tenants).
+
+O TenantMiddleware usa este módulo (settings.TENANT_URLCONF) como request.urlconf
+quando o host corresponde a um site. As páginas públicas vêm primeiro, para que
+a raiz "/" mostre o site em vez do painel administrativo; as demais URLs do
+projeto continuam disponíveis para o {% url %} dos templates.
+"""
+
+from django.urls import path
+
+from apps.core.views import root_view
+from apps.landings.views import properties_list, property_detail
+from config.urls import urlpatterns as project_urlpatterns
+
+urlpatterns = [
+    path("", root_view, name="root"),
+    path("imoveis/", properties_list, name="landings_properties_list"),
+    path("imovel/<int:pk>/", property_detail, name="landings_property_detail"),
+    *project_urlpatterns,
+]
@@ -15,3 +15,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ["DJANGO_SETTINGS_MODULE"] = "config.settings"
 
 application = get_wsgi_application()
+
+# Compila os templates dos temas antes do fork dos workers (gunicorn com preload_app)
+from apps.themes.template_cache import warm_theme_templates  # noqa: E402
+
+warm_theme_templates()
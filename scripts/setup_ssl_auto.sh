@@ -48,38 +48,19 @@ fi
 
 echo -e "${GREEN}✅ NGINX configurado${NC}\n"
 
-# 4. Configurar Celery Beat para renovação automática
-echo -e "${CYAN}4/5 - Configurando renovação automática (Celery Beat)...${NC}"
+# 4. Celery Beat: o agendamento já vem no projeto (CELERY_BEAT_SCHEDULE em config/settings.py)
+echo -e "${CYAN}4/5 - Verificando agendamento (Celery Beat)...${NC}"
+echo -e "${GREEN}✅ Tarefa provision-custom-domains (DNS, emissão e renovação) registrada ao iniciar o Celery Beat${NC}"
+echo -e "${YELLOW}📝 Reinicie o Celery Beat após o deploy: docker restart propzy-celery-beat${NC}\n"
 
-cat > /tmp/celery_beat_config.py << 'EOF'
-# Adicionar ao config/celery.py
+# 5. Remover o cron antigo de renovação: renovações rodam por domínio, pelo provision-custom-domains
+echo -e "${CYAN}5/5 - Removendo cron antigo de renovação...${NC}"
 
-from celery.schedules import crontab
-
-# Configuração do Celery Beat
-app.conf.beat_schedule = {
-    'renew-ssl-certificates-daily': {
-        'task': 'apps.landings.tasks.renew_ssl_certificates',
-        'schedule': crontab(hour=3, minute=0),  # Todo dia às 3h
-    },
-}
-EOF
-
-echo -e "${GREEN}✅ Configuração Celery Beat criada em /tmp/celery_beat_config.py${NC}"
-echo -e "${YELLOW}📝 Adicione o conteúdo ao arquivo config/celery.py${NC}\n"
-
-# 5. Criar cron alternativo (caso Celery não esteja rodando)
-echo -e "${CYAN}5/5 - Configurando cron alternativo...${NC}"
-
-# Adicionar ao crontab
-CRON_JOB="0 3 * * * docker exec propzy-app python manage.py manage_ssl renew-all >> /var/log/ssl-renew.log 2>&1"
-
-# Verificar se já existe
-if ! crontab -l 2>/dev/null | grep -q "manage_ssl renew-all"; then
-    (crontab -l 2>/dev/null; echo "$CRON_JOB") | crontab -
-    echo -e "${GREEN}✅ Cron job adicionado${NC}"
+if crontab -l 2>/dev/null | grep -q "manage_ssl renew-all"; then
+    crontab -l 2>/dev/null | grep -v "manage_ssl renew-all" | crontab -
+    echo -e "${GREEN}✅ Cron job removido${NC}"
 else
-    echo -e "${GREEN}✅ Cron job já existe${NC}"
+    echo -e "${GREEN}✅ Nenhum cron job antigo${NC}"
 fi
 
 echo ""
@@ -99,16 +80,16 @@ echo ""
 echo -e "3. ${YELLOW}Listar certificados:${NC}"
 echo -e "   ${CYAN}docker exec propzy-app python manage.py manage_ssl list${NC}"
 echo ""
-echo -e "4. ${YELLOW}Renovar todos os certificados:${NC}"
+echo -e "4. ${YELLOW}Antecipar a renovação dos certificados próximos do vencimento:${NC}"
 echo -e "   ${CYAN}docker exec propzy-app python manage.py manage_ssl renew-all${NC}"
 echo ""
 
 echo -e "${CYAN}📚 Como funciona:${NC}"
 echo ""
 echo -e "  • Quando um cliente adiciona domínio personalizado no Admin"
-echo -e "  • Sistema verifica DNS automaticamente (2 min)"
+echo -e "  • Sistema verifica DNS automaticamente (1 min)"
 echo -e "  • Gera certificado SSL automaticamente (Let's Encrypt)"
-echo -e "  • Renova certificados automaticamente todo dia às 3h"
+echo -e "  • Renova cada certificado automaticamente antes do vencimento"
 echo -e "  • Cliente só precisa apontar CNAME para propzy.com.br"
 echo ""
 